@@ -0,0 +1,40 @@
+"""Per-user contact indexes and contacts.user_id foreign key
+
+Revision ID: 332372de7c8d
+Revises: 1f014fc3d375
+Create Date: 2026-10-18 11:04:19.552731
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '332372de7c8d'
+down_revision: Union[str, None] = '1f014fc3d375'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=False)
+    op.create_index('ix_contacts_user_id_birthday', 'contacts', ['user_id', 'birthday'], unique=False)
+    # Контакти без власника не дадуть створити зовнішній ключ. Міграція їх не видаляє:
+    # що робити з такими даними, вирішує оператор
+    orphans = op.get_bind().scalar(sa.text(
+        'SELECT count(*) FROM contacts WHERE user_id IS NOT NULL AND user_id NOT IN (SELECT id FROM users)'))
+    if orphans:
+        raise RuntimeError(f'{orphans} contacts reference missing users; '
+                           'reassign or delete them before adding fk_contacts_user_id_users')
+    op.create_foreign_key('fk_contacts_user_id_users', 'contacts', 'users', ['user_id'], ['id'],
+                          ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_contacts_user_id_users', 'contacts', type_='foreignkey')
+    op.drop_index('ix_contacts_user_id_birthday', table_name='contacts')
+    op.drop_index('ix_contacts_user_id_email', table_name='contacts')
@@ -0,0 +1,37 @@
+"""Contacts search_text column with trigram GIN index
+
+Revision ID: 3767ad58f7d6
+Revises: 332372de7c8d
+Create Date: 2026-10-18 12:21:07.904316
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3767ad58f7d6'
+down_revision: Union[str, None] = '332372de7c8d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gin')
+    op.add_column('contacts', sa.Column(
+        'search_text', sa.String(),
+        sa.Computed("lower(first_name || ' ' || last_name || ' ' || email)", persisted=True),
+        nullable=True,
+    ))
+    op.create_index('ix_contacts_user_id_search_text_trgm', 'contacts', ['user_id', 'search_text'],
+                    unique=False, postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_search_text_trgm', table_name='contacts')
+    op.drop_column('contacts', 'search_text')
@@ -0,0 +1,28 @@
+"""Contacts version column for ETags and optimistic concurrency
+
+Revision ID: 5e8f0c2d7a19
+Revises: a3c91e5d2b47
+Create Date: 2026-10-18 19:48:03.771254
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e8f0c2d7a19'
+down_revision: Union[str, None] = 'a3c91e5d2b47'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('contacts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('contacts', 'version')
@@ -0,0 +1,41 @@
+"""Contacts birthday as DATE with indexed MMDD ordinal
+
+Revision ID: 762ce4ce32c1
+Revises: 3767ad58f7d6
+Create Date: 2026-10-18 13:38:52.160447
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '762ce4ce32c1'
+down_revision: Union[str, None] = '3767ad58f7d6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BIRTHDAY_ORDINAL = ("CAST(EXTRACT(MONTH FROM birthday) AS INTEGER) * 100 "
+                    "+ CAST(EXTRACT(DAY FROM birthday) AS INTEGER)")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_contacts_user_id_birthday', table_name='contacts')
+    op.alter_column('contacts', 'birthday', type_=sa.Date(), existing_type=sa.String(),
+                    existing_nullable=False, postgresql_using='birthday::date')
+    op.add_column('contacts', sa.Column('birthday_ordinal', sa.Integer(),
+                                        sa.Computed(BIRTHDAY_ORDINAL, persisted=True), nullable=True))
+    op.create_index('ix_contacts_user_id_birthday_ordinal', 'contacts', ['user_id', 'birthday_ordinal'],
+                    unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_birthday_ordinal', table_name='contacts')
+    op.drop_column('contacts', 'birthday_ordinal')
+    op.alter_column('contacts', 'birthday', type_=sa.String(), existing_type=sa.Date(),
+                    existing_nullable=False, postgresql_using='birthday::varchar')
+    op.create_index('ix_contacts_user_id_birthday', 'contacts', ['user_id', 'birthday'], unique=False)
@@ -0,0 +1,32 @@
+"""Contacts email unique per user instead of globally
+
+Revision ID: a3c91e5d2b47
+Revises: 762ce4ce32c1
+Create Date: 2026-10-18 19:12:40.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a3c91e5d2b47'
+down_revision: Union[str, None] = '762ce4ce32c1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint('uq_contacts_user_id_email', 'contacts', ['user_id', 'email'])
+    op.drop_index('ix_contacts_user_id_email', table_name='contacts')
+    op.drop_index('ix_contacts_email', table_name='contacts')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index('ix_contacts_email', 'contacts', ['email'], unique=True)
+    op.create_index('ix_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=False)
+    op.drop_constraint('uq_contacts_user_id_email', 'contacts', type_='unique')
@@ -0,0 +1,31 @@
+"""Cover contacts version in the per-user list index
+
+Revision ID: c47d2e9b815a
+Revises: 5e8f0c2d7a19
+Create Date: 2026-10-18 20:21:36.094418
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c47d2e9b815a'
+down_revision: Union[str, None] = '5e8f0c2d7a19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'], unique=False,
+                    postgresql_include=['version'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'], unique=False)
@@ -0,0 +1,67 @@
+"""Contacts change sequence, updated_at and soft-delete tombstones
+
+Revision ID: d6e1f0a3b924
+Revises: c47d2e9b815a
+Create Date: 2026-10-18 21:04:52.615830
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd6e1f0a3b924'
+down_revision: Union[str, None] = 'c47d2e9b815a'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+LIVE = sa.text('deleted_at IS NULL')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('contacts', sa.Column('change_seq', sa.BigInteger(), server_default='0', nullable=False))
+    op.add_column('contacts', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(),
+                                        nullable=False))
+    op.add_column('contacts', sa.Column('deleted_at', sa.DateTime(timezone=True), nullable=True))
+    op.create_index('ix_contacts_user_id_change_seq', 'contacts', ['user_id', 'change_seq', 'id'], unique=False)
+
+    # Надгробки не займають email і не потрапляють в індекси записника
+    op.drop_constraint('uq_contacts_user_id_email', 'contacts', type_='unique')
+    op.create_index('uq_contacts_user_id_email', 'contacts', ['user_id', 'email'], unique=True,
+                    postgresql_where=LIVE)
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'], unique=False,
+                    postgresql_include=['version'], postgresql_where=LIVE)
+    op.drop_index('ix_contacts_user_id_birthday_ordinal', table_name='contacts')
+    op.create_index('ix_contacts_user_id_birthday_ordinal', 'contacts', ['user_id', 'birthday_ordinal'],
+                    unique=False, postgresql_where=LIVE)
+    op.drop_index('ix_contacts_user_id_search_text_trgm', table_name='contacts')
+    op.create_index('ix_contacts_user_id_search_text_trgm', 'contacts', ['user_id', 'search_text'],
+                    unique=False, postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'},
+                    postgresql_where=LIVE)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DELETE FROM contacts WHERE deleted_at IS NOT NULL')
+    op.drop_index('ix_contacts_user_id_search_text_trgm', table_name='contacts')
+    op.create_index('ix_contacts_user_id_search_text_trgm', 'contacts', ['user_id', 'search_text'],
+                    unique=False, postgresql_using='gin', postgresql_ops={'search_text': 'gin_trgm_ops'})
+    op.drop_index('ix_contacts_user_id_birthday_ordinal', table_name='contacts')
+    op.create_index('ix_contacts_user_id_birthday_ordinal', 'contacts', ['user_id', 'birthday_ordinal'],
+                    unique=False)
+    op.drop_index('ix_contacts_user_id_id', table_name='contacts')
+    op.create_index('ix_contacts_user_id_id', 'contacts', ['user_id', 'id'], unique=False,
+                    postgresql_include=['version'])
+    op.drop_index('uq_contacts_user_id_email', table_name='contacts')
+    op.create_unique_constraint('uq_contacts_user_id_email', 'contacts', ['user_id', 'email'])
+
+    op.drop_index('ix_contacts_user_id_change_seq', table_name='contacts')
+    op.drop_column('contacts', 'deleted_at')
+    op.drop_column('contacts', 'updated_at')
+    op.drop_column('contacts', 'change_seq')
+    op.drop_column('users', 'change_seq')
@@ -0,0 +1,42 @@
+"""Content-addressed avatar assets with reference counts
+
+Revision ID: e2b8c4f61d07
+Revises: d6e1f0a3b924
+Create Date: 2026-10-18 23:12:40.184512
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2b8c4f61d07'
+down_revision: Union[str, None] = 'd6e1f0a3b924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('avatar_assets',
+                    sa.Column('digest', sa.String(length=64), nullable=False),
+                    sa.Column('url', sa.String(), nullable=True),
+                    sa.Column('renditions', sa.JSON(), nullable=True),
+                    sa.Column('refcount', sa.Integer(), server_default='0', nullable=False),
+                    sa.Column('released_at', sa.DateTime(timezone=True), nullable=True),
+                    sa.PrimaryKeyConstraint('digest'))
+    op.create_index('ix_avatar_assets_released_at', 'avatar_assets', ['released_at'], unique=False,
+                    postgresql_where=sa.text('refcount = 0'))
+    op.add_column('users', sa.Column('avatar_digest', sa.String(length=64), nullable=True))
+    op.create_foreign_key('fk_users_avatar_digest_avatar_assets', 'users', 'avatar_assets',
+                          ['avatar_digest'], ['digest'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('fk_users_avatar_digest_avatar_assets', 'users', type_='foreignkey')
+    op.drop_column('users', 'avatar_digest')
+    op.drop_index('ix_avatar_assets_released_at', table_name='avatar_assets')
+    op.drop_table('avatar_assets')
@@ -0,0 +1,54 @@
+from fastapi import HTTPException, status
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import Headers
+
+
+def too_large(max_bytes: int) -> HTTPException:
+    """Помилка 413 для тіла запиту, більшого за max_bytes."""
+    return HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                         detail=f"Request body must not exceed {max_bytes} bytes")
+
+
+class BodySizeLimitMiddleware:
+    """
+    ASGI middleware: обмежує розмір тіла запиту до вибраних шляхів ще до його розбору.
+
+    FastAPI повністю читає multipart-форму до виклику обробника й залежностей, тож
+    перевіряти розмір там уже пізно. Запит із завеликим Content-Length одразу отримує
+    413, а тіло без нього (chunked) рахується під час читання, і перевищення
+    перериває розбір з тією ж помилкою.
+    """
+
+    def __init__(self, app, limits: dict):
+        """
+        :param app: ASGI-застосунок
+        :param limits: Шлях запиту → найбільший розмір тіла в байтах
+        """
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send):
+        max_bytes = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if max_bytes is None:
+            await self.app(scope, receive, send)
+            return
+        content_length = Headers(scope=scope).get("content-length", "")
+        if content_length.isdigit() and int(content_length) > max_bytes:
+            error = too_large(max_bytes)
+            response = ORJSONResponse({"detail": error.detail}, status_code=error.status_code)
+            await response(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > max_bytes:
+                    # Виняток виникає всередині розбору тіла в обробнику, і FastAPI перетворює його на відповідь
+                    raise too_large(max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,176 @@
+import os
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from app.core.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # Без пакета Brotli відповіді стискаються лише gzip
+    brotli = None
+
+# Відповіді, менші за поріг, не стискаються: заголовки й CPU коштують більше, ніж економія
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+# Рівні стиснення: gzip 1-9, brotli 0-11 (вищі рівні brotli надто повільні для динамічних відповідей)
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 4))
+
+# Кодування в порядку переваги сервера за однакового q
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+# Текстові типи, які варто стискати; зображення, архіви тощо вже стиснені
+COMPRESSIBLE_TYPES = {"application/json", "application/x-ndjson", "application/javascript", "application/xml",
+                      "image/svg+xml"}
+
+
+def negotiate(accept_encoding: str) -> Optional[str]:
+    """
+    Вибирає кодування відповіді за заголовком Accept-Encoding.
+
+    :param accept_encoding: Значення заголовка, наприклад "gzip, br;q=0.8"
+    :return: "br", "gzip" або None, якщо клієнт не приймає жодного з них
+    """
+    weights = {}
+    for item in accept_encoding.split(","):
+        name, *params = item.split(";")
+        weight = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    weight = float(value)
+                except ValueError:
+                    weight = 0.0
+        weights[name.strip().lower()] = weight
+    default = weights.get("*", 0.0)
+    accepted = [encoding for encoding in ENCODINGS if weights.get(encoding, default) > 0]
+    return max(accepted, key=lambda encoding: weights.get(encoding, default), default=None)
+
+
+def is_compressible(headers: Headers) -> bool:
+    """Чи варто стискати відповідь з такими заголовками."""
+    if headers.get("content-encoding", "identity") != "identity":
+        return False
+    media_type = headers.get("content-type", "").partition(";")[0].strip().lower()
+    return (media_type.startswith("text/") or media_type in COMPRESSIBLE_TYPES
+            or media_type.endswith(("+json", "+xml")))
+
+
+def not_modified_start(message: dict, if_none_match: str, encoding: str) -> dict:
+    """
+    Заголовки відповіді 304 у формі, яку бачив клієнт.
+
+    Ресурс порівнює теги без суфікса кодування (див. app.core.etag), тож 304 несе
+    голий ETag. Якщо клієнт перевіряв тег стиснутої відповіді, йому повертається
+    саме він, щоб валідатор у кеші не змінювався.
+
+    :param message: Повідомлення http.response.start зі статусом 304
+    :param if_none_match: Значення заголовка If-None-Match запиту
+    :param encoding: Кодування, узгоджене для цього запиту
+    :return: Повідомлення з виправленими заголовками
+    """
+    headers = MutableHeaders(raw=list(message["headers"]))
+    etag = headers.get("etag")
+    if etag is None:
+        return message
+    encoded = encoded_etag(etag, encoding)
+    if encoded != etag and encoded in (tag.strip().removeprefix("W/") for tag in if_none_match.split(",")):
+        headers["ETag"] = encoded
+        headers.add_vary_header("Accept-Encoding")
+    return {**message, "headers": headers.raw}
+
+
+class Compressor:
+    """Потоковий компресор: кожен compress() повертає все, що вже можна надіслати."""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        if encoding == "br":
+            self._brotli = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._brotli = None
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+
+    def compress(self, data: bytes) -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self._brotli is not None:
+            return self._brotli.process(data) + self._brotli.finish()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """
+    ASGI middleware: стискає відповіді brotli або gzip залежно від Accept-Encoding.
+
+    Відповідь з одним тілом стискається цілком, якщо вона не менша за minimum_size.
+    Потокові відповіді (StreamingResponse) стискаються частинами з flush після
+    кожної, тож клієнт отримує дані одразу, а не після завершення потоку.
+    Уже закодовані відповіді й нетекстові типи (аватари WebP тощо) не чіпаються.
+    Сильний ETag стиснутої відповіді отримує суфікс кодування (див. app.core.etag),
+    і 304 на перевірку такого тега повертає його ж.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESSION_MIN_SIZE, gzip_level: int = COMPRESSION_GZIP_LEVEL,
+                 brotli_quality: int = COMPRESSION_BROTLI_QUALITY):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        request_headers = Headers(scope=scope)
+        encoding = negotiate(request_headers.get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+        compressor = None
+
+        async def compressing_send(message):
+            nonlocal start, compressor
+            if message["type"] == "http.response.start":
+                if message["status"] == 304:
+                    await send(not_modified_start(message, request_headers.get("if-none-match", ""), encoding))
+                    return
+                # Рішення залежить від першої частини тіла, тож заголовки притримуються до неї
+                start = message
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if start is not None:
+                message_start, start = start, None
+                headers = MutableHeaders(raw=list(message_start["headers"]))
+                if not is_compressible(headers) or (not more_body and len(body) < self.minimum_size):
+                    await send(message_start)
+                    await send(message)
+                    return
+                compressor = Compressor(encoding, self.gzip_level, self.brotli_quality)
+                headers["Content-Encoding"] = encoding
+                headers.add_vary_header("Accept-Encoding")
+                if "etag" in headers:
+                    headers["ETag"] = encoded_etag(headers["etag"], encoding)
+                if "content-length" in headers:
+                    del headers["content-length"]
+                body = compressor.compress(body) if more_body else compressor.finish(body)
+                if not more_body:
+                    headers["Content-Length"] = str(len(body))
+                await send({**message_start, "headers": headers.raw})
+            elif compressor is None:
+                await send(message)
+                return
+            else:
+                body = compressor.compress(body) if more_body else compressor.finish(body)
+            await send({"type": "http.response.body", "body": body, "more_body": more_body})
+
+        await self.app(scope, receive, compressing_send)
@@ -0,0 +1,99 @@
+import hashlib
+from typing import Optional
+
+# Суфікси, які CompressionMiddleware додає до ETag стиснутої відповіді: за RFC 9110 різні
+# кодування - різні представлення, тож сильний ETag не може бути спільним
+ENCODING_SUFFIXES = ("-br", "-gzip")
+
+
+def contact_etag(contact) -> str:
+    """
+    Сильний ETag контакту: змінюється з кожним оновленням.
+
+    :param contact: Контакт з атрибутами id та version
+    :return: ETag у лапках, наприклад "42-3"
+    """
+    return f'"{contact.id}-{contact.version}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag стиснутого представлення: до сильного тега додається суфікс кодування.
+
+    :param etag: ETag нестиснутої відповіді
+    :param encoding: Кодування з Content-Encoding ("br" або "gzip")
+    :return: Наприклад, "42-3-br"; слабкий ETag (W/"...") повертається без змін
+    """
+    if not (etag.startswith('"') and etag.endswith('"')):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_encoding(tag: str) -> str:
+    """Прибирає суфікс кодування з ETag у лапках, щоб порівнювати його з тегом ресурсу."""
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return f'{tag[:-len(suffix) - 1]}"'
+    return tag
+
+
+def if_match_version(if_match: Optional[str], contact_id: int) -> Optional[int]:
+    """
+    Визначає версію контакту, яку очікує клієнт у заголовку If-Match.
+
+    Слабкі ETag (W/"...") для If-Match не підходять, тож ігноруються. Тег стиснутої
+    відповіді (з суфіксом кодування) позначає ту саму версію контакту.
+
+    :param if_match: Значення заголовка If-Match
+    :param contact_id: ID контакту з шляху запиту
+    :return: None, якщо заголовка немає або він "*"; 0, якщо жоден ETag не стосується
+             цього контакту (версії починаються з 1, тож умова не виконається); інакше версію
+    """
+    if if_match is None or if_match.strip() == "*":
+        return None
+    for tag in if_match.split(","):
+        tag = _strip_encoding(tag.strip())
+        if tag.startswith('"') and tag.endswith('"'):
+            tag_id, _, version = tag[1:-1].partition("-")
+            if tag_id == str(contact_id) and version.isdigit():
+                return int(version)
+    return 0
+
+
+def list_etag(user_id: int, count: int, first_id: Optional[int], last_id: Optional[int], version_sum: int) -> str:
+    """
+    Сильний ETag сторінки списку контактів з її відбитка (див. crud.get_contacts_fingerprint).
+
+    :return: ETag у лапках
+    """
+    digest = hashlib.sha256(f"{user_id}:{count}:{first_id}:{last_id}:{version_sum}".encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def contacts_list_etag(user_id: int, contacts) -> str:
+    """
+    ETag уже завантаженої сторінки; збігається з list_etag для того ж відбитка.
+
+    :param user_id: ID користувача
+    :param contacts: Контакти сторінки в порядку id
+    :return: ETag у лапках
+    """
+    if not contacts:
+        return list_etag(user_id, 0, None, None, 0)
+    return list_etag(user_id, len(contacts), contacts[0].id, contacts[-1].id,
+                     sum(contact.version for contact in contacts))
+
+
+def not_modified(header: Optional[str], etag: str) -> bool:
+    """
+    Перевіряє, чи має клієнт актуальну версію ресурсу (слабке порівняння, RFC 9110).
+
+    :param header: Значення заголовка If-None-Match
+    :param etag: Поточний ETag ресурсу
+    :return: True, якщо можна відповісти 304 Not Modified
+    """
+    if header is None:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(_strip_encoding(tag.strip().removeprefix("W/")) == etag for tag in header.split(","))
@@ -0,0 +1,82 @@
+import time
+from contextvars import ContextVar
+
+from prometheus_client import Counter, Gauge, Histogram
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+POOL_WAIT_SECONDS = Histogram(
+    "db_pool_wait_seconds",
+    "Час очікування на з'єднання з пулу",
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+POOL_TIMEOUTS = Counter("db_pool_timeouts", "Запити, що не дочекались з'єднання (QueuePool limit)")
+POOL_SIZE = Gauge("db_pool_size", "Постійний розмір пулу з'єднань")
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "З'єднання, видані запитам")
+POOL_CHECKED_IN = Gauge("db_pool_checked_in", "Вільні з'єднання в пулі")
+POOL_OVERFLOW = Gauge("db_pool_overflow", "З'єднання понад pool_size (від'ємне значення - ще не відкриті)")
+DB_QUERIES = Counter("db_queries", "SQL-запити до бази даних за маршрутом", ["route"])
+
+# Лічильник запитів поточного HTTP-запиту; встановлюється в QueryCountMiddleware
+_query_counter: ContextVar = ContextVar("query_counter", default=None)
+
+
+class InstrumentedAsyncQueuePool(AsyncAdaptedQueuePool):
+    """
+    Пул з'єднань, що вимірює час очікування на вільне з'єднання.
+    """
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
+
+
+def instrument_engine(async_engine):
+    """
+    Підключає метрики пулу та лічильник SQL-запитів до рушія.
+
+    :param async_engine: Асинхронний рушій SQLAlchemy
+    """
+    pool = async_engine.sync_engine.pool
+    if isinstance(pool, QueuePool):
+        POOL_SIZE.set_function(pool.size)
+        POOL_CHECKED_OUT.set_function(pool.checkedout)
+        POOL_CHECKED_IN.set_function(pool.checkedin)
+        POOL_OVERFLOW.set_function(pool.overflow)
+
+    @event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+    def count_query(conn, cursor, statement, parameters, context, executemany):
+        counter = _query_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+
+class QueryCountMiddleware:
+    """
+    ASGI middleware: рахує SQL-запити кожного HTTP-запиту та додає їх до db_queries_total.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        counter = [0]
+        token = _query_counter.set(counter)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            _query_counter.reset(token)
+            if counter[0]:
+                # Шаблон маршруту, а не фактичний шлях, щоб не роздувати кількість міток
+                route = scope.get("route")
+                DB_QUERIES.labels(route=getattr(route, "path", "unmatched")).inc(counter[0])
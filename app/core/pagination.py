@@ -0,0 +1,35 @@
+import base64
+import json
+
+
+class InvalidCursor(ValueError):
+    """Курсор пагінації пошкоджений або створений не цим API."""
+
+
+def encode_cursor(**position) -> str:
+    """
+    Кодує позицію сторінки в непрозорий рядок курсора.
+
+    :param position: Значення ключа сортування останнього рядка сторінки
+    :return: base64url-рядок без вирівнювання
+    """
+    raw = json.dumps(position, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *keys: str) -> dict:
+    """
+    Розкодовує курсор і перевіряє наявність потрібних цілочисельних ключів.
+
+    :param cursor: Рядок, отриманий від encode_cursor
+    :param keys: Обов'язкові ключі позиції
+    :return: Словник позиції
+    :raises InvalidCursor: Якщо курсор неможливо розібрати
+    """
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError as exc:
+        raise InvalidCursor(str(exc)) from exc
+    if not isinstance(position, dict) or any(not isinstance(position.get(key), int) for key in keys):
+        raise InvalidCursor("cursor is missing required keys")
+    return position
@@ -0,0 +1,68 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+
+class PoolFull(Exception):
+    """Пул зайнятий: усі процеси працюють і черга очікування заповнена."""
+
+
+class BoundedProcessPool:
+    """
+    Пул процесів для CPU-важких операцій з обмеженою чергою.
+
+    Операція, якій не вистачило місця в черзі, одразу отримує PoolFull замість
+    того, щоб чекати. Процеси запускаються при першому виклику методом spawn:
+    fork процесу з працюючим циклом подій і потоками небезпечний.
+    """
+
+    def __init__(self, workers: int, queue_size: int, nice: int = 0):
+        """
+        :param workers: Кількість процесів
+        :param queue_size: Скільки операцій може чекати на вільний процес
+        :param nice: Зниження пріоритету процесів, щоб ОС віддавала процесор спершу обробці запитів
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.nice = nice
+        self.pending = 0
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def full(self) -> bool:
+        return self.pending >= self.workers + self.queue_size
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=os.nice, initargs=(self.nice,))
+            return self._executor
+
+    async def submit(self, function, *args):
+        """
+        Виконує function(*args) в одному з процесів пулу.
+
+        :param function: Функція рівня модуля (передається в процес через pickle)
+        :return: Результат функції
+        :raises PoolFull: Якщо черга пулу заповнена
+        """
+        with self._lock:
+            if self.full:
+                raise PoolFull()
+            self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._get_executor(), function, *args)
+        finally:
+            with self._lock:
+                self.pending -= 1
+
+    def shutdown(self):
+        """Зупиняє процеси пулу під час завершення застосунку."""
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
@@ -1,8 +1,173 @@
-import redis
+import asyncio
+import logging
 import os
+import time
+import weakref
+
+import redis
+import redis.asyncio
+from redis import RedisError
+from redis.asyncio.retry import Retry as AsyncRetry
+from redis.backoff import ExponentialBackoff
+from redis.commands.core import AsyncScript
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from redis.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+REDIS_HOST = os.getenv("REDIS_HOST", "localhost")
+REDIS_PORT = int(os.getenv("REDIS_PORT", 6379))
+# Найбільша кількість з'єднань пулу на процес (і на цикл подій); запит, якому не
+# вистачило з'єднання, чекає REDIS_POOL_TIMEOUT секунд
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", 50))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", 1))
+# Redis — кеш, тож довго чекати на нього не варто: база відповість швидше
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", 0.5))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", 0.5))
+REDIS_HEALTH_CHECK_INTERVAL = int(os.getenv("REDIS_HEALTH_CHECK_INTERVAL", 30))
+# Повтори команди після обриву з'єднання чи тайм-ауту з експоненційною затримкою
+REDIS_RETRIES = int(os.getenv("REDIS_RETRIES", 2))
+REDIS_BACKOFF_BASE = float(os.getenv("REDIS_BACKOFF_BASE", 0.01))
+REDIS_BACKOFF_CAP = float(os.getenv("REDIS_BACKOFF_CAP", 0.1))
+# Після стількох помилок поспіль Redis вважається недоступним на REDIS_BREAKER_RESET секунд
+REDIS_BREAKER_FAILURES = int(os.getenv("REDIS_BREAKER_FAILURES", 5))
+REDIS_BREAKER_RESET = float(os.getenv("REDIS_BREAKER_RESET", 30))
+
+
+def connection_options(retry_class) -> dict:
+    """
+    Спільні параметри з'єднань синхронного й асинхронного клієнтів.
+
+    :param retry_class: Retry з redis.retry або redis.asyncio.retry
+    :return: Аргументи для ConnectionPool
+    """
+    return {
+        "host": REDIS_HOST,
+        "port": REDIS_PORT,
+        "decode_responses": True,
+        "max_connections": REDIS_MAX_CONNECTIONS,
+        "timeout": REDIS_POOL_TIMEOUT,
+        "socket_timeout": REDIS_SOCKET_TIMEOUT,
+        "socket_connect_timeout": REDIS_CONNECT_TIMEOUT,
+        "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+        "retry": retry_class(ExponentialBackoff(cap=REDIS_BACKOFF_CAP, base=REDIS_BACKOFF_BASE), REDIS_RETRIES),
+        "retry_on_error": [RedisConnectionError, RedisTimeoutError],
+    }
+
+
+# Синхронний клієнт для коду поза циклом подій: тести, бенчмарки, скрипти
+redis_client = redis.Redis(connection_pool=redis.BlockingConnectionPool(**connection_options(Retry)))
+
+def script(source: str) -> AsyncScript:
+    """
+    Lua-скрипт для асинхронних клієнтів; SHA1 тексту обчислюється один раз.
+
+    Викликайте з client=<клієнт>: скрипт виконується через EVALSHA, а якщо
+    Redis його ще не знає (наприклад, після перезапуску) — завантажується й повторюється.
+
+    :param source: Текст скрипту
+    :return: Скрипт, спільний для всіх клієнтів і циклів подій
+    """
+    # Клієнт при реєстрації потрібен лише для кодування тексту; команди йдуть через client=
+    return AsyncScript(redis_client, source)
+
+
+# З'єднання redis.asyncio прив'язані до циклу подій, а TestClient запускає кожен
+# запит у новому циклі, тому пул створюється на кожен цикл (у застосунку він один)
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def get_async_redis() -> redis.asyncio.Redis:
+    """
+    Повертає спільний асинхронний клієнт Redis поточного циклу подій.
+
+    :return: Клієнт redis.asyncio з обмеженим пулом з'єднань
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        pool = redis.asyncio.BlockingConnectionPool(**connection_options(AsyncRetry))
+        client = _async_clients[loop] = redis.asyncio.Redis(connection_pool=pool)
+    return client
+
+
+class CircuitBreaker:
+    """
+    Запобіжник: після failure_threshold помилок поспіль припиняє звернення до Redis
+    на reset_timeout секунд, щоб запити не чекали тайм-аутів і одразу йшли до бази.
+    Після паузи пропускає одну пробну команду: успіх закриває запобіжник.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+
+    @property
+    def is_open(self) -> bool:
+        return self.opened_at is not None and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def allow(self) -> bool:
+        """Чи можна зараз звертатися до Redis."""
+        if self.opened_at is None:
+            return True
+        if time.monotonic() - self.opened_at < self.reset_timeout:
+            return False
+        # Пробна команда; решта запитів чекає її результату ще один період
+        self.opened_at = time.monotonic()
+        return True
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("Redis circuit opened after %s failures", self.failures)
+            self.opened_at = time.monotonic()
+
+
+breaker = CircuitBreaker(REDIS_BREAKER_FAILURES, REDIS_BREAKER_RESET)
+
+
+async def execute(operation, default=None):
+    """
+    Виконує операцію над асинхронним клієнтом Redis через запобіжник.
+
+    Помилка Redis не виходить назовні: повертається default, і викликач
+    працює без кешу (зазвичай читає з бази даних).
+
+    :param operation: Функція, що приймає клієнт і повертає awaitable
+    :param default: Результат, якщо Redis недоступний
+    :return: Результат операції або default
+    """
+    if not breaker.allow():
+        return default
+    try:
+        result = await operation(get_async_redis())
+    except RedisError:
+        logger.warning("Redis operation failed", exc_info=True)
+        breaker.record_failure()
+        return default
+    breaker.record_success()
+    return result
+
+
+async def pipeline(build, default=None, transaction: bool = False):
+    """
+    Відправляє кілька команд одним зверненням до Redis.
+
+    :param build: Функція, що додає команди до переданого pipeline
+    :param default: Результат, якщо Redis недоступний
+    :param transaction: Обгорнути команди в MULTI/EXEC
+    :return: Список результатів команд у порядку додавання або default
+    """
+    async def run(client):
+        async with client.pipeline(transaction=transaction) as pipe:
+            build(pipe)
+            return await pipe.execute()
 
-redis_client = redis.Redis(
-    host=os.getenv("REDIS_HOST", "localhost"),
-    port=int(os.getenv("REDIS_PORT", 6379)),
-    decode_responses=True
-)
+    return await execute(run, default)
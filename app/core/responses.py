@@ -0,0 +1,18 @@
+import orjson
+from fastapi import Response
+
+
+def json_response(content, headers: dict = None) -> Response:
+    """
+    JSON-відповідь, що оминає response_model маршруту.
+
+    FastAPI не перевіряє й не перекодовує повернутий Response, тож маршрут сам
+    відповідає за формат; response_model лишається лише для схеми OpenAPI.
+
+    :param content: Уже закодований JSON (str або bytes) або дані для orjson
+    :param headers: Додаткові заголовки відповіді
+    :return: Response з типом application/json
+    """
+    if not isinstance(content, (bytes, str)):
+        content = orjson.dumps(content)
+    return Response(content, media_type="application/json", headers=headers)
@@ -1,119 +1,568 @@
-from datetime import timedelta
+from calendar import isleap
+from datetime import date, datetime, timedelta, timezone
 
-from sqlalchemy.orm import Session
+import orjson
+from sqlalchemy import Integer, bindparam, case, column, delete, func, or_, select, tuple_, update, values
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.models import Contact
+from app.models import AvatarAsset, Contact, User
+from app.schemas import ContactCreate, ContactResponse, ContactUpdate
+from app.services import birthday_cache
 
+# Стовпці в порядку полів ContactResponse: контакти вибираються кортежами й кодуються
+# в JSON без ORM-об'єктів і перевірки Pydantic (див. contact_dicts). Новий стовпець
+# відповіді досить додати до схеми
+CONTACT_RESPONSE_FIELDS = tuple(ContactResponse.model_fields)
+CONTACT_RESPONSE_COLUMNS = tuple(getattr(Contact, name) for name in CONTACT_RESPONSE_FIELDS)
 
-def create_contact(db: Session, contact_data, user_id: int):
+# Видалений контакт лишається в таблиці надгробком для GET /contacts/changes;
+# усі інші запити до записника його не бачать
+NOT_DELETED = Contact.deleted_at.is_(None)
+
+# Ціль ON CONFLICT: частковий унікальний індекс uq_contacts_user_id_email
+EMAIL_CONFLICT = {"index_elements": [Contact.user_id, Contact.email], "index_where": NOT_DELETED}
+
+
+def _insert(db: AsyncSession):
+    """Конструктор INSERT з підтримкою ON CONFLICT для діалекту сесії."""
+    return pg_insert if db.get_bind().dialect.name == "postgresql" else sqlite_insert
+
+
+def contact_dicts(rows) -> list:
+    """
+    Перетворює рядки CONTACT_RESPONSE_COLUMNS на словники у форматі ContactResponse.
+
+    Дані в базі вже пройшли перевірку ContactCreate, тож повторна перевірка не потрібна.
+
+    :param rows: Рядки, що починаються зі стовпців CONTACT_RESPONSE_COLUMNS; зайві стовпці ігноруються
+    :return: Список словників
+    """
+    fields = CONTACT_RESPONSE_FIELDS
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def _next_change_seq(db: AsyncSession, user_id: int):
+    """
+    SQL-вираз наступного номера зміни контактів користувача для запиту запису.
+
+    На PostgreSQL номер видає UPDATE users ... RETURNING у CTE того ж запиту: рядок
+    користувача лишається заблокованим до COMMIT, тож зміни одного користувача
+    фіксуються в порядку номерів і синхронізація не пропустить зміну, яку ще не
+    видно. SQLite виконує записи послідовно, тому там достатньо max(change_seq) + 1.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        seq = (update(User.__table__).where(User.__table__.c.id == user_id)
+               .values(change_seq=User.__table__.c.change_seq + 1).returning(User.__table__.c.change_seq)
+               .cte("next_change_seq"))
+        return select(seq.c.change_seq).scalar_subquery()
+    contacts = Contact.__table__.alias("seq_contacts")
+    return (select(func.coalesce(func.max(contacts.c.change_seq), 0) + 1)
+            .where(contacts.c.user_id == user_id).scalar_subquery())
+
+
+async def _allocate_change_seq(db: AsyncSession, user_id: int) -> int:
+    """
+    Видає номер зміни окремим запитом для багаторядкових записів, де CTE
+    з _next_change_seq не компілюється (insertmanyvalues, UPDATE ... FROM VALUES).
+    """
+    return await db.scalar(select(_next_change_seq(db, user_id)))
+
+
+async def create_contact(db: AsyncSession, contact_data, user_id: int):
     """
     Створює новий контакт для вказаного користувача.
 
-    :param db: Сесія бази даних SQLAlchemy
+    Один запит INSERT ... ON CONFLICT (user_id, email) DO NOTHING RETURNING:
+    дублікат email відсікає унікальний індекс, тож паралельні запити не
+    створять двох однакових контактів.
+
+    :param db: Асинхронна сесія бази даних SQLAlchemy
     :param contact_data: Дані нового контакту (Pydantic модель)
     :param user_id: ID поточного користувача
     :return: Створений об'єкт контакту або None, якщо email вже існує
     """
-    existing_contact = db.query(Contact).filter(Contact.email == contact_data.email, Contact.user_id == user_id).first()
-    if existing_contact:
-        return None
-    new_contact = Contact(**contact_data.dict(), user_id=user_id)
-    db.add(new_contact)
-    db.commit()
-    db.refresh(new_contact)
+    new_contact = await db.scalar(
+        _insert(db)(Contact).values(**contact_data.model_dump(), user_id=user_id,
+                                    change_seq=_next_change_seq(db, user_id))
+        .on_conflict_do_nothing(**EMAIL_CONFLICT).returning(Contact)
+    )
+    await db.commit()
+    if new_contact is not None:
+        await birthday_cache.invalidate(user_id)
     return new_contact
 
 
-def get_contacts(db: Session, skip: int, limit: int, user_id: int):
+async def insert_new_contacts(db: AsyncSession, contacts: list, user_id: int) -> dict:
+    """
+    Додає пакет контактів одним запитом, пропускаючи ті, чий email уже зайнятий.
+
+    Повтори всередині пакета відкидаються (лишається перший), решта вставляється
+    багаторядковим INSERT ... ON CONFLICT (user_id, email) DO NOTHING: наявні email
+    відсікає унікальний індекс. Усі рядки пакета отримують один номер зміни,
+    виданий окремим запитом. Транзакцію фіксує викликач.
+
+    :param db: Асинхронна сесія бази даних
+    :param contacts: Список даних контактів (Pydantic моделі ContactCreate)
+    :param user_id: ID користувача
+    :return: Словник email -> рядок CONTACT_RESPONSE_COLUMNS для контактів, які справді додано
+    """
+    rows = {}
+    for contact in contacts:
+        rows.setdefault(contact.email, {**contact.model_dump(), "user_id": user_id})
+    if not rows:
+        return {}
+    change_seq = await _allocate_change_seq(db, user_id)
+    # Insert по таблиці, а не по ORM-класу: без побудови ORM-стану для кожного рядка.
+    # executemany з RETURNING SQLAlchemy відправляє як багаторядкові VALUES (insertmanyvalues)
+    result = await db.execute(
+        _insert(db)(Contact.__table__).on_conflict_do_nothing(**EMAIL_CONFLICT).returning(*CONTACT_RESPONSE_COLUMNS),
+        [{**row, "change_seq": change_seq} for row in rows.values()],
+    )
+    return {row.email: row for row in result}
+
+
+async def update_contacts(db: AsyncSession, changes: dict, user_id: int) -> dict:
+    """
+    Оновлює кілька контактів користувача одним запитом UPDATE ... FROM (VALUES ...).
+
+    На SQLite, де VALUES з іменами стовпців у FROM не підтримується, виконується
+    executemany за первинним ключем. Усі рядки отримують один номер зміни,
+    виданий окремим запитом. Транзакцію фіксує викликач.
+
+    :param db: Асинхронна сесія бази даних
+    :param changes: Словник ID контакту -> нові дані (Pydantic модель ContactCreate)
+    :param user_id: ID користувача
+    :return: Словник ID -> рядок CONTACT_RESPONSE_COLUMNS для оновлених контактів (чужі й відсутні пропущено)
+    """
+    if not changes:
+        return {}
+    table = Contact.__table__
+    fields = list(ContactCreate.model_fields)
+    change_seq = await _allocate_change_seq(db, user_id)
+    if db.get_bind().dialect.name == "postgresql":
+        data = values(column("id", Integer), *(column(name, table.c[name].type) for name in fields),
+                      name="changes").data([(contact_id, *contact.model_dump().values())
+                                            for contact_id, contact in changes.items()])
+        result = await db.execute(
+            update(table).where(table.c.id == data.c.id, table.c.user_id == user_id, NOT_DELETED)
+            .values({**{name: data.c[name] for name in fields}, "version": table.c.version + 1,
+                     "change_seq": change_seq})
+            .returning(*CONTACT_RESPONSE_COLUMNS)
+        )
+        return {row.id: row for row in result}
+    ids = list(await db.scalars(select(Contact.id).filter(Contact.user_id == user_id, Contact.id.in_(changes),
+                                                          NOT_DELETED)))
+    if not ids:
+        return {}
+    await db.execute(update(table).where(table.c.id == bindparam("contact_id"))
+                     .values(version=table.c.version + 1, change_seq=change_seq),
+                     [{"contact_id": contact_id, **changes[contact_id].model_dump()} for contact_id in ids])
+    result = await db.execute(select(*CONTACT_RESPONSE_COLUMNS).filter(Contact.id.in_(ids)))
+    return {row.id: row for row in result}
+
+
+async def delete_contacts(db: AsyncSession, contact_ids, user_id: int) -> set:
+    """
+    Видаляє кілька контактів користувача одним запитом UPDATE ... RETURNING id,
+    що перетворює їх на надгробки (див. delete_contact).
+
+    :param db: Асинхронна сесія бази даних
+    :param contact_ids: ID контактів
+    :param user_id: ID користувача
+    :return: Множина ID, які справді видалено
+    """
+    if not contact_ids:
+        return set()
+    result = await db.execute(
+        update(Contact.__table__).where(Contact.user_id == user_id, Contact.id.in_(contact_ids), NOT_DELETED)
+        .values(deleted_at=func.now(), change_seq=_next_change_seq(db, user_id)).returning(Contact.id)
+    )
+    return set(result.scalars())
+
+
+async def get_contacts(db: AsyncSession, skip: int, limit: int, user_id: int, after_id: int = None):
     """
     Отримує список контактів користувача з пагінацією.
 
-    :param db: Сесія бази даних
+    Контакти впорядковані за (user_id, id), тож сторінки стабільні між викликами.
+    Якщо задано after_id, використовується keyset-пагінація: сторінка починається
+    одразу після цього контакту, а skip ігнорується, тому кожна сторінка читає
+    лише limit рядків з індексу ix_contacts_user_id_id незалежно від глибини.
+
+    :param db: Асинхронна сесія бази даних
     :param skip: Кількість пропущених записів
     :param limit: Максимальна кількість результатів
     :param user_id: ID користувача
-    :return: Список контактів
+    :param after_id: ID останнього контакту попередньої сторінки (опціонально)
+    :return: Список рядків CONTACT_RESPONSE_COLUMNS і version
     """
-    return db.query(Contact).filter(Contact.user_id == user_id).offset(skip).limit(limit).all()
+    result = await db.execute(_contacts_page(select(*CONTACT_RESPONSE_COLUMNS, Contact.version), skip, limit,
+                                             user_id, after_id))
+    return result.all()
+
 
+def _contacts_page(query, skip: int, limit: int, user_id: int, after_id: int = None):
+    """Обмежує запит однією сторінкою списку контактів (див. get_contacts)."""
+    query = query.filter(Contact.user_id == user_id, NOT_DELETED).order_by(Contact.user_id, Contact.id)
+    if after_id is not None:
+        query = query.filter(Contact.id > after_id)
+    else:
+        query = query.offset(skip)
+    return query.limit(limit)
 
-def get_contact(db: Session, contact_id: int, user_id: int):
+
+async def get_contacts_fingerprint(db: AsyncSession, skip: int, limit: int, user_id: int, after_id: int = None):
+    """
+    Обчислює відбиток сторінки списку контактів без завантаження рядків.
+
+    Агрегати (кількість, перший і останній ID, сума версій) змінюються при будь-якому
+    створенні, оновленні чи видаленні контакту на сторінці. На PostgreSQL запит
+    обслуговується index-only scan по ix_contacts_user_id_id, що містить version.
+
+    :param db: Асинхронна сесія бази даних
+    :param skip: Кількість пропущених записів
+    :param limit: Максимальна кількість результатів
+    :param user_id: ID користувача
+    :param after_id: ID останнього контакту попередньої сторінки (опціонально)
+    :return: Кортеж (count, first_id, last_id, version_sum)
+    """
+    page = _contacts_page(select(Contact.id, Contact.version), skip, limit, user_id, after_id).subquery()
+    result = await db.execute(
+        select(func.count(), func.min(page.c.id), func.max(page.c.id), func.coalesce(func.sum(page.c.version), 0))
+    )
+    return tuple(result.one())
+
+
+async def get_contact(db: AsyncSession, contact_id: int, user_id: int):
     """
     Повертає один контакт по його ID для конкретного користувача.
 
-    :param db: Сесія бази даних
+    :param db: Асинхронна сесія бази даних
     :param contact_id: ID контакту
     :param user_id: ID користувача
     :return: Об'єкт контакту або None
     """
-    return db.query(Contact).filter(Contact.id == contact_id, Contact.user_id == user_id).first()
+    return await db.scalar(select(Contact).filter(Contact.id == contact_id, Contact.user_id == user_id, NOT_DELETED))
 
 
-def update_contact(db: Session, contact_id: int, contact_data, user_id: int):
+async def update_contact(db: AsyncSession, contact_id: int, contact_data, user_id: int,
+                         expected_version: int = None):
     """
-    Оновлює контакт користувача за ID.
+    Оновлює контакт користувача за ID одним запитом UPDATE ... RETURNING.
 
-    :param db: Сесія бази даних
+    ContactCreate замінює всі поля; для ContactUpdate у SET потраплять лише
+    поля, які клієнт справді надіслав (exclude_unset). Кожне оновлення збільшує
+    Contact.version; якщо задано expected_version, запит змінить рядок лише
+    тоді, коли його версія збігається (оптимістичне блокування).
+
+    :param db: Асинхронна сесія бази даних
     :param contact_id: ID контакту
-    :param contact_data: Нові дані контакту (Pydantic модель)
+    :param contact_data: Нові дані контакту (Pydantic модель ContactCreate або ContactUpdate)
     :param user_id: ID користувача
-    :return: Оновлений контакт або None
-    """
-    contact = get_contact(db, contact_id, user_id)
-    if contact:
-        for key, value in contact_data.dict().items():
-            setattr(contact, key, value)
-        db.commit()
-        db.refresh(contact)
+    :param expected_version: Очікувана поточна версія контакту (опціонально)
+    :return: Оновлений контакт або None, якщо його немає чи версія не збіглася
+    :raises IntegrityError: Якщо новий email уже має інший контакт користувача
+    """
+    query = update(Contact).where(Contact.id == contact_id, Contact.user_id == user_id, NOT_DELETED)
+    if expected_version is not None:
+        query = query.where(Contact.version == expected_version)
+    contact = await db.scalar(
+        query.values(**contact_data.model_dump(exclude_unset=isinstance(contact_data, ContactUpdate)),
+                     version=Contact.version + 1, change_seq=_next_change_seq(db, user_id))
+        .returning(Contact).execution_options(populate_existing=True)
+    )
+    await db.commit()
+    if contact is not None:
+        await birthday_cache.invalidate(user_id)
     return contact
 
 
-def delete_contact(db: Session, contact_id: int, user_id: int):
+async def delete_contact(db: AsyncSession, contact_id: int, user_id: int):
     """
-    Видаляє контакт за ID для конкретного користувача.
+    Видаляє контакт за ID для конкретного користувача одним запитом UPDATE ... RETURNING id.
 
-    :param db: Сесія бази даних
+    Рядок лишається в таблиці надгробком з deleted_at і новим change_seq, щоб
+    клієнти синхронізації дізналися про видалення з GET /contacts/changes.
+
+    :param db: Асинхронна сесія бази даних
     :param contact_id: ID контакту
     :param user_id: ID користувача
-    :return: Видалений контакт або None
+    :return: ID видаленого контакту або None
     """
-    contact = get_contact(db, contact_id, user_id)
-    if contact:
-        db.delete(contact)
-        db.commit()
-    return contact
+    deleted_id = await db.scalar(
+        update(Contact).where(Contact.id == contact_id, Contact.user_id == user_id, NOT_DELETED)
+        .values(deleted_at=func.now(), change_seq=_next_change_seq(db, user_id)).returning(Contact.id)
+    )
+    await db.commit()
+    if deleted_id is not None:
+        await birthday_cache.invalidate(user_id)
+    return deleted_id
 
 
-def search_contacts(db: Session, first_name, last_name, email, user_id: int):
+async def stream_contact_rows(db: AsyncSession, user_id: int, columns=CONTACT_RESPONSE_COLUMNS,
+                              batch_size: int = 1000):
+    """
+    Потоково читає всі контакти користувача серверним курсором.
+
+    Повертаються пакети кортежів стовпців без створення ORM-об'єктів,
+    тож пам'ять не залежить від кількості контактів.
+
+    :param db: Асинхронна сесія бази даних
+    :param user_id: ID користувача
+    :param columns: Стовпці Contact у потрібному порядку
+    :param batch_size: Кількість рядків, що читаються з курсора за раз
+    :return: Асинхронний генератор списків рядків
+    """
+    result = await db.stream(
+        select(*columns).filter(Contact.user_id == user_id, NOT_DELETED).order_by(Contact.user_id, Contact.id)
+        .execution_options(yield_per=batch_size)
+    )
+    async for rows in result.partitions():
+        yield rows
+
+
+async def get_contact_changes(db: AsyncSession, user_id: int, since: tuple = None, limit: int = 100):
+    """
+    Повертає контакти, створені, змінені або видалені після позиції синхронізації.
+
+    Зміни впорядковані за (change_seq, id) і читаються keyset-пагінацією по індексу
+    ix_contacts_user_id_change_seq, тож після редагування одного контакту запит
+    поверне один рядок незалежно від розміру записника. Без позиції (перша
+    синхронізація) повертаються всі наявні контакти без надгробків.
+
+    :param db: Асинхронна сесія бази даних
+    :param user_id: ID користувача
+    :param since: Кортеж (change_seq, id) останньої отриманої зміни (опціонально)
+    :param limit: Максимальна кількість результатів
+    :return: Список контактів; у видалених заповнено deleted_at
+    """
+    query = select(Contact).filter(Contact.user_id == user_id)
+    if since is None:
+        query = query.filter(NOT_DELETED)
+    else:
+        query = query.filter(tuple_(Contact.change_seq, Contact.id) > tuple_(*since))
+    result = await db.scalars(query.order_by(Contact.change_seq, Contact.id).limit(limit))
+    return result.all()
+
+
+def _like_escape(term: str) -> str:
+    """Екранує символи шаблону LIKE, щоб пошуковий запит сприймався буквально."""
+    return term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+async def search_contacts(db: AsyncSession, first_name, last_name, email, user_id: int,
+                          q: str = None, prefix: bool = False, limit: int = None):
     """
     Шукає контакти користувача за іменем, прізвищем або email.
 
-    :param db: Сесія бази даних
+    Параметр q шукає одразу в імені, прізвищі та email через обчислюваний стовпець
+    search_text. На PostgreSQL цей пошук обслуговує GIN-індекс pg_trgm, а результати
+    ранжуються за word_similarity; на інших СУБД (SQLite у тестах) вище стоять
+    збіги з початку слова.
+
+    :param db: Асинхронна сесія бази даних
     :param first_name: Ім'я для пошуку (опціонально)
     :param last_name: Прізвище для пошуку (опціонально)
     :param email: Email для пошуку (опціонально)
     :param user_id: ID користувача
-    :return: Список знайдених контактів
+    :param q: Рядок пошуку по всіх полях (опціонально)
+    :param prefix: Шукати лише слова, що починаються з q (режим typeahead)
+    :param limit: Максимальна кількість результатів (опціонально)
+    :return: Список рядків CONTACT_RESPONSE_COLUMNS знайдених контактів
     """
-    query = db.query(Contact).filter(Contact.user_id == user_id)
+    query = select(*CONTACT_RESPONSE_COLUMNS).filter(Contact.user_id == user_id, NOT_DELETED)
     if first_name:
         query = query.filter(Contact.first_name.ilike(f"%{first_name}%"))
     if last_name:
         query = query.filter(Contact.last_name.ilike(f"%{last_name}%"))
     if email:
         query = query.filter(Contact.email.ilike(f"%{email}%"))
-    return query.all()
+    if q:
+        term = q.strip().lower()
+        escaped = _like_escape(term)
+        word_start = or_(Contact.search_text.like(f"{escaped}%", escape="\\"),
+                         Contact.search_text.like(f"% {escaped}%", escape="\\"))
+        query = query.filter(word_start if prefix else Contact.search_text.like(f"%{escaped}%", escape="\\"))
+        if db.get_bind().dialect.name == "postgresql":
+            query = query.order_by(func.word_similarity(term, Contact.search_text).desc(), Contact.id)
+        else:
+            query = query.order_by(case((word_start, 0), else_=1), Contact.id)
+    else:
+        query = query.order_by(Contact.id)
+    if limit is not None:
+        query = query.limit(limit)
+    result = await db.execute(query)
+    return result.all()
+
 
+def _ordinal(day: date) -> int:
+    """MMDD дати, як у стовпці Contact.birthday_ordinal."""
+    return day.month * 100 + day.day
 
-def get_upcoming_birthdays(db: Session, user_id: int):
+
+async def get_upcoming_birthdays(db: AsyncSession, user_id: int, days: int = 7, today: date = None):
     """
-    Повертає список контактів, у яких день народження протягом наступних 7 днів.
+    Повертає список контактів, у яких день народження протягом наступних days днів.
+
+    Порівнюється лише місяць і день (стовпець birthday_ordinal у форматі MMDD),
+    тому рік народження не має значення. Вікно, що переходить через 31 грудня,
+    розбивається на два діапазони; у невисокосний рік день народження 29 лютого
+    святкується 28 лютого. Результати впорядковані від найближчого.
 
-    :param db: Сесія бази даних
+    :param db: Асинхронна сесія бази даних
     :param user_id: ID користувача
-    :return: Список контактів з близьким днем народження
+    :param days: Розмір вікна в днях, включно з сьогоднішнім днем
+    :param today: Дата відліку (за замовчуванням сьогодні)
+    :return: Список рядків CONTACT_RESPONSE_COLUMNS контактів з близьким днем народження
+    """
+    today = today or datetime.today().date()
+    end = today + timedelta(days=days)
+    start_key, end_key = _ordinal(today), _ordinal(end)
+    if not isleap(end.year) and end_key == 228:
+        end_key = 229
+
+    query = select(*CONTACT_RESPONSE_COLUMNS).filter(Contact.user_id == user_id, NOT_DELETED)
+    if days >= 365:
+        order = (Contact.birthday_ordinal < start_key, Contact.birthday_ordinal)
+    elif end.year == today.year:
+        query = query.filter(Contact.birthday_ordinal.between(start_key, end_key))
+        order = (Contact.birthday_ordinal,)
+    else:
+        # Вікно переходить через Новий рік: кінець грудня та початок січня
+        query = query.filter(or_(Contact.birthday_ordinal >= start_key, Contact.birthday_ordinal <= end_key))
+        order = (Contact.birthday_ordinal < start_key, Contact.birthday_ordinal)
+    result = await db.execute(query.order_by(*order, Contact.id))
+    return result.all()
+
+
+async def refresh_upcoming_birthdays(db: AsyncSession, user_id: int, days: int = 7, today: date = None):
+    """
+    Обчислює найближчі дні народження з бази і зберігає результат у Redis до кінця дня,
+    якщо контакти користувача тим часом не змінилися (див. birthday_cache.store).
+
+    :param db: Асинхронна сесія бази даних
+    :param user_id: ID користувача
+    :param days: Розмір вікна в днях
+    :param today: Дата відліку (за замовчуванням сьогодні)
+    :return: Список словників контактів у форматі ContactResponse
+    """
+    today = today or datetime.today().date()
+    # Лічильник читається до запиту: зміна контактів після нього скасує запис у кеш
+    generation = await birthday_cache.generation(user_id)
+    payload = contact_dicts(await get_upcoming_birthdays(db, user_id, days, today))
+    await birthday_cache.store(user_id, days, payload, generation, today)
+    return payload
+
+
+async def get_cached_upcoming_birthdays(db: AsyncSession, user_id: int, days: int = 7):
+    """
+    Повертає найближчі дні народження з Redis одним читанням; база даних
+    використовується лише тоді, коли список ще не побудовано або Redis недоступний.
+
+    Збережений у Redis JSON повертається як є, без розбору й повторного кодування.
+
+    :param db: Асинхронна сесія бази даних
+    :param user_id: ID користувача
+    :param days: Розмір вікна в днях
+    :return: JSON-масив контактів у форматі ContactResponse (str або bytes)
+    """
+    cached = await birthday_cache.get_json(user_id, days)
+    if cached is not None:
+        return cached
+    return orjson.dumps(await refresh_upcoming_birthdays(db, user_id, days))
+
+
+async def acquire_avatar_asset(db: AsyncSession, digest: str):
+    """
+    Додає посилання на аватар з указаним хешем, створюючи запис, якщо його ще немає.
+
+    Посилання фіксується до обробки файлу, тож фонове прибирання не видалить
+    аватар, поки завдання його використовує.
+
+    :param db: Асинхронна сесія бази даних
+    :param digest: Хеш вмісту аватара
+    :return: Рядок (url, renditions); url дорівнює None, якщо файл ще не оброблено
+    """
+    asset = (await db.execute(
+        _insert(db)(AvatarAsset).values(digest=digest, refcount=1)
+        .on_conflict_do_update(index_elements=[AvatarAsset.digest],
+                               set_={"refcount": AvatarAsset.refcount + 1, "released_at": None})
+        .returning(AvatarAsset.url, AvatarAsset.renditions)
+    )).first()
+    await db.commit()
+    return asset
+
+
+async def complete_avatar_asset(db: AsyncSession, digest: str, url: str, renditions: dict):
+    """
+    Зберігає URL обробленого аватара.
+
+    :param db: Асинхронна сесія бази даних
+    :param digest: Хеш вмісту аватара
+    :param url: URL основного розміру
+    :param renditions: {сторона в пікселях: URL} усіх розмірів
+    """
+    await db.execute(update(AvatarAsset).where(AvatarAsset.digest == digest).values(url=url, renditions=renditions))
+    await db.commit()
+
+
+def _release_avatar_asset(digest: str):
+    # У SET праві частини бачать старе значення refcount
+    return (update(AvatarAsset).where(AvatarAsset.digest == digest)
+            .values(refcount=AvatarAsset.refcount - 1,
+                    released_at=case((AvatarAsset.refcount == 1, datetime.now(timezone.utc)),
+                                     else_=AvatarAsset.released_at)))
+
+
+async def release_avatar_asset(db: AsyncSession, digest: str):
+    """
+    Знімає посилання на аватар, наприклад, коли його обробка не вдалася.
+
+    :param db: Асинхронна сесія бази даних
+    :param digest: Хеш вмісту аватара
+    """
+    await db.execute(_release_avatar_asset(digest))
+    await db.commit()
+
+
+async def set_user_avatar(db: AsyncSession, user_id: int, digest: str, url: str):
+    """
+    Призначає користувачу аватар і знімає посилання на попередній.
+
+    Аватар, на який більше ніхто не посилається, отримує released_at і згодом
+    видаляється фоновим прибиранням (див. delete_released_avatar_assets).
+
+    :param db: Асинхронна сесія бази даних
+    :param user_id: ID користувача
+    :param digest: Хеш вмісту нового аватара (посилання на нього вже додано)
+    :param url: URL нового аватара
+    """
+    previous = await db.scalar(select(User.avatar_digest).where(User.id == user_id).with_for_update())
+    await db.execute(update(User).where(User.id == user_id).values(avatar_url=url, avatar_digest=digest))
+    if previous is not None:
+        await db.execute(_release_avatar_asset(previous))
+    await db.commit()
+
+
+async def delete_released_avatar_assets(db: AsyncSession, released_before: datetime, limit: int) -> list:
+    """
+    Видаляє записи аватарів, на які давно ніхто не посилається. Транзакцію не фіксує.
+
+    Поки транзакція відкрита, рядки заблоковані: завдання з тим самим файлом
+    чекає її завершення і створює запис заново, а не посилається на файли,
+    які саме видаляються. Тому викликач фіксує транзакцію після видалення файлів.
+
+    :param db: Асинхронна сесія бази даних
+    :param released_before: Межа: видаляються аватари, звільнені раніше
+    :param limit: Найбільша кількість записів за раз
+    :return: Список рядків (digest, renditions) видалених записів
     """
-    today = datetime.today().date()
-    upcoming = today + timedelta(days=7)
-    return db.query(Contact).filter(Contact.user_id == user_id, Contact.birthday >= today,
-                                    Contact.birthday <= upcoming).all()
+    released = (select(AvatarAsset.digest)
+                .where(AvatarAsset.refcount == 0, AvatarAsset.released_at < released_before)
+                .limit(limit))
+    return (await db.execute(
+        delete(AvatarAsset).where(AvatarAsset.digest.in_(released), AvatarAsset.refcount == 0)
+        .returning(AvatarAsset.digest, AvatarAsset.renditions)
+    )).all()
@@ -1,15 +1,15 @@
 import os
-import json
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from jose import jwt, JWTError
-from sqlalchemy.orm import Session
+from jose import JWTError
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.redis import redis_client
 from app.database import get_db
 from app.models import User
-from app.schemas import UserResponse
+from app.schemas import TokenUser, UserResponse
+from app.services import token_cache, user_cache
 
 SECRET_KEY = os.getenv("SECRET_KEY", "secret")
 ALGORITHM = "HS256"
@@ -17,31 +17,60 @@ ALGORITHM = "HS256"
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
+async def get_token_claims(token: str = Depends(oauth2_scheme)) -> dict:
     """
-    Отримує поточного користувача з токена, перевіряє кеш Redis перед запитом до БД.
+    Перевіряє токен доступу й повертає його claims.
+
+    Перевірені токени кешуються в пам'яті процесу до exp (див. app.services.token_cache).
     """
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        email = payload.get("sub")
-        if email is None:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+        payload = token_cache.decode(token, SECRET_KEY, [ALGORITHM])
+    except JWTError:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
+    if payload.get("sub") is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    return payload
 
-        # Спроба дістати з кешу
-        cached_user = redis_client.get(f"user:{email}")
-        if cached_user:
-            return UserResponse(**json.loads(cached_user))
 
-        # Якщо не знайдено — шукаємо в базі
-        user = db.query(User).filter(User.email == email).first()
-        if not user:
-            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+async def _user_by_email(email: str, db: AsyncSession) -> UserResponse:
+    """
+    Шукає користувача з уже перевіреного токена в кеші процесу, потім у Redis і лише
+    потім у базі (див. app.services.user_cache); відсутній користувач теж кешується.
 
-        # серіалізація через Pydantic
-        user_data = UserResponse.model_validate(user).model_dump()
-        redis_client.setex(f"user:{email}", 3600, json.dumps(user_data))
+    :raises HTTPException: 401, якщо користувача немає
+    """
+    user = await user_cache.lookup(email)
+    if isinstance(user, user_cache.Miss):
+        miss = user
+        db_user = await db.scalar(select(User).filter(User.email == email))
+        user = UserResponse.model_validate(db_user) if db_user is not None else None
+        await user_cache.store(email, user, miss)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
+    return user
 
-        return UserResponse(**user_data)
 
-    except JWTError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Could not validate credentials")
\ No newline at end of file
+async def get_current_user(claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_db)):
+    """
+    Отримує поточного користувача з токена.
+
+    Користувач шукається в кеші процесу, потім у Redis і лише потім у базі
+    (див. app.services.user_cache); відсутній користувач теж кешується.
+    """
+    return await _user_by_email(claims["sub"], db)
+
+
+async def get_token_user(claims: dict = Depends(get_token_claims), db: AsyncSession = Depends(get_db)):
+    """
+    Отримує поточного користувача для маршрутів, яким досить його id.
+
+    Якщо токен містить id та is_verified (JWT_EMBED_USER_CLAIMS), користувач
+    береться з claims без звернення до кешу чи бази: значення актуальні на
+    момент входу. Інакше користувач шукається як у get_current_user, за claims,
+    які вже перевірив get_token_claims.
+
+    :return: TokenUser або UserResponse
+    """
+    if "id" in claims and "is_verified" in claims:
+        return TokenUser(id=claims["id"], email=claims["sub"], is_verified=claims["is_verified"])
+    return await _user_by_email(claims["sub"], db)
@@ -1,19 +1,50 @@
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 
 from app import models, database
-from app.routers import contacts, auth, users
+from app.core.body_limit import BodySizeLimitMiddleware
+from app.core.compression import CompressionMiddleware
+from app.core.metrics import QueryCountMiddleware
+from app.routers import contacts, auth, users, metrics
+from app.services import avatar_pipeline, avatar_storage, password_hasher, user_cache
+from app.services.scheduler import run_avatar_gc, run_daily_birthday_refresh
 
 # Ініціалізація бази даних за допомогою ORM SQLAlchemy
 models.Base.metadata.create_all(bind=database.engine)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Запускає фонові завдання застосунку на час його роботи."""
+    birthday_refresh = asyncio.create_task(run_daily_birthday_refresh())
+    user_cache_listener = asyncio.create_task(user_cache.listen_for_invalidations())
+    avatar_gc = asyncio.create_task(run_avatar_gc())
+    yield
+    birthday_refresh.cancel()
+    user_cache_listener.cancel()
+    avatar_gc.cancel()
+    password_hasher.shutdown()
+    avatar_pipeline.pool.shutdown()
+
+
 # Ініціалізація FastAPI з автоматичною генерацією Swagger документації
 app = FastAPI(
     title="Contact Management API",
     description="API з підтримкою аутентифікації, авторизації, роботи з контактами, аватарами та верифікацією email.",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan,
+    # orjson кодує відповіді в кілька разів швидше за стандартний json
+    default_response_class=ORJSONResponse,
 )
 
+# Найглибший шар: завеликі завантаження відхиляються до розбору форми, а 413 ще отримує заголовки CORS
+app.add_middleware(BodySizeLimitMiddleware, limits={"/api/v1/users/avatar": avatar_pipeline.AVATAR_MAX_REQUEST_BYTES})
+
 origins = ["*"]
 app.add_middleware(
     CORSMiddleware,
@@ -21,8 +52,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[contacts.NEXT_CURSOR_HEADER, "ETag"],
 )
+app.add_middleware(QueryCountMiddleware)
+app.add_middleware(CompressionMiddleware)
 
 app.include_router(auth.router, prefix="/api/v1/auth", tags=["Auth"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["Users"])
 app.include_router(contacts.router, prefix="/api/v1/contacts", tags=["Contacts"])
+app.include_router(metrics.router, tags=["Metrics"])
+
+# Локальне сховище аватарів роздає файли сам застосунок
+if avatar_storage.AVATAR_STORAGE == "local":
+    os.makedirs(avatar_storage.AVATAR_LOCAL_DIR, exist_ok=True)
+    app.mount(avatar_storage.AVATAR_LOCAL_URL, avatar_storage.AvatarFiles(directory=avatar_storage.AVATAR_LOCAL_DIR),
+              name="media")
@@ -1,8 +1,33 @@
-from sqlalchemy import Column, Integer, String, Boolean
+from sqlalchemy import (BigInteger, Column, Integer, JSON, String, Boolean, Computed, Date, DateTime, DDL, ForeignKey,
+                        Index, column, event, func, text)
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
 
 from app.database import Base
 
 
+class birthday_ordinal(FunctionElement):
+    """
+    Порядковий номер дня народження в році у форматі MMDD (1 січня = 101, 29 лютого = 229).
+
+    На відміну від номера дня в році, значення не залежить від високосності року,
+    тож його можна зберігати та індексувати.
+    """
+    type = Integer()
+    inherit_cache = True
+
+
+@compiles(birthday_ordinal)
+def _birthday_ordinal_default(element, compiler, **kw):
+    birthday = compiler.process(element.clauses, **kw)
+    return f"(CAST(EXTRACT(MONTH FROM {birthday}) AS INTEGER) * 100 + CAST(EXTRACT(DAY FROM {birthday}) AS INTEGER))"
+
+
+@compiles(birthday_ordinal, "sqlite")
+def _birthday_ordinal_sqlite(element, compiler, **kw):
+    return f"CAST(strftime('%m%d', {compiler.process(element.clauses, **kw)}) AS INTEGER)"
+
+
 class User(Base):
     __tablename__ = "users"
 
@@ -11,6 +36,37 @@ class User(Base):
     password = Column(String, nullable=False)
     is_verified = Column(Boolean, default=False)
     avatar_url = Column(String, nullable=True)
+    # Файл аватара, на який посилається користувач (AvatarAsset.refcount)
+    avatar_digest = Column(String(64), ForeignKey("avatar_assets.digest", name="fk_users_avatar_digest_avatar_assets"),
+                           nullable=True)
+    # Останній виданий номер зміни контактів користувача (див. Contact.change_seq)
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+
+
+class AvatarAsset(Base):
+    """Оброблений аватар у сховищі, спільний для всіх, хто завантажив той самий файл."""
+    __tablename__ = "avatar_assets"
+
+    # SHA-256 завантаженого файлу та налаштувань обробки (див. avatar_pipeline.content_hasher)
+    digest = Column(String(64), primary_key=True)
+    # NULL, доки перше завдання з цим файлом ще обробляє його
+    url = Column(String, nullable=True)
+    # {сторона в пікселях: URL} усіх збережених розмірів, включно з основним
+    renditions = Column(JSON, nullable=True)
+    # Скільки користувачів використовують аватар; відколи він нікому не потрібен
+    refcount = Column(Integer, nullable=False, server_default="0")
+    released_at = Column(DateTime(timezone=True), nullable=True)
+
+    __table_args__ = (
+        # Фонове прибирання: WHERE refcount = 0 AND released_at < ?
+        Index("ix_avatar_assets_released_at", "released_at", postgresql_where=text("refcount = 0"),
+              sqlite_where=text("refcount = 0")),
+    )
+
+
+# Умова часткових індексів контактів: запис не є надгробком
+LIVE = text("deleted_at IS NULL")
+
 
 class Contact(Base):
     __tablename__ = "contacts"
@@ -18,8 +74,49 @@ class Contact(Base):
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String, nullable=False)
     last_name = Column(String, nullable=False)
-    email = Column(String, unique=True, index=True, nullable=False)
+    # Унікальний у межах записника користувача (uq_contacts_user_id_email)
+    email = Column(String, nullable=False)
     phone_number = Column(String, nullable=False)
-    birthday = Column(String, nullable=False)
+    birthday = Column(Date, nullable=False)
+    # MMDD дня народження для індексованого пошуку найближчих днів народження
+    birthday_ordinal = Column(Integer, Computed(birthday_ordinal(column("birthday")), persisted=True))
     additional_info = Column(String, nullable=True)
-    user_id = Column(Integer, nullable=False)  # посилання на власника-користувача
+    # Нормалізований текст для повнотекстового пошуку; обчислюється базою даних
+    search_text = Column(String, Computed("lower(first_name || ' ' || last_name || ' ' || email)", persisted=True))
+    # Номер версії: збільшується кожним оновленням, основа ETag та If-Match
+    # Значення за замовчуванням лише серверні: INSERT з CTE у crud не передає їх параметрами
+    version = Column(Integer, nullable=False, server_default="1")
+    # Номер останньої зміни в межах користувача (User.change_seq): курсор GET /contacts/changes
+    change_seq = Column(BigInteger, nullable=False, server_default="0")
+    updated_at = Column(DateTime(timezone=True), nullable=False, server_default=func.now(), onupdate=func.now())
+    # Час видалення: видалений контакт лишається записом-надгробком для синхронізації
+    deleted_at = Column(DateTime(timezone=True), nullable=True)
+    # власник контакту
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE", name="fk_contacts_user_id_users"),
+                     nullable=False)
+
+    # Кожен запит у crud фільтрує за user_id, тож усі індекси починаються з нього. Запити до
+    # записника не бачать видалених контактів, тому індекси часткові (лише deleted_at IS NULL)
+    __table_args__ = (
+        # Список і keyset-пагінація: WHERE user_id = ? AND id > ? ORDER BY user_id, id;
+        # version у листі індексу дає index-only scan для відбитка сторінки (ETag списку)
+        Index("ix_contacts_user_id_id", "user_id", "id", postgresql_include=["version"],
+              postgresql_where=LIVE, sqlite_where=LIVE),
+        # Один email на записник; ціль ON CONFLICT у create_contact та insert_new_contacts
+        Index("uq_contacts_user_id_email", "user_id", "email", unique=True,
+              postgresql_where=LIVE, sqlite_where=LIVE),
+        # Найближчі дні народження: WHERE user_id = ? AND birthday_ordinal BETWEEN ? AND ?
+        Index("ix_contacts_user_id_birthday_ordinal", "user_id", "birthday_ordinal",
+              postgresql_where=LIVE, sqlite_where=LIVE),
+        # Пошук /contacts/search: WHERE user_id = ? AND search_text LIKE '%...%' (pg_trgm + btree_gin)
+        Index("ix_contacts_user_id_search_text_trgm", "user_id", "search_text", postgresql_using="gin",
+              postgresql_ops={"search_text": "gin_trgm_ops"}, postgresql_where=LIVE).ddl_if(dialect="postgresql"),
+        # Синхронізація змін: WHERE user_id = ? AND (change_seq, id) > (?, ?) ORDER BY change_seq, id
+        Index("ix_contacts_user_id_change_seq", "user_id", "change_seq", "id"),
+    )
+
+
+# Розширення для GIN-індексу пошуку мають існувати до створення таблиць
+event.listen(Base.metadata, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm; CREATE EXTENSION IF NOT EXISTS btree_gin")
+             .execute_if(dialect="postgresql"))
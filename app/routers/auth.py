@@ -1,5 +1,7 @@
-from fastapi import APIRouter, HTTPException, Form, status, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Form, status, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.database import get_db
 from app.schemas import UserCreate, Token, UserResponse, PasswordResetRequest, PasswordResetConfirm
 from app.services.auth_service import AuthService
 
@@ -9,27 +11,29 @@ auth_service = AuthService()
 
 # Реєстрація користувача з поверненням 201 Created та відправкою листа верифікації
 @router.post("/signup", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-async def signup(user: UserCreate, background_tasks: BackgroundTasks):
+async def signup(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """
     Реєстрація нового користувача.
 
     - **user**: Дані нового користувача
-    - **background_tasks**: Завдання у фоновому режимі для надсилання верифікації
     - **db**: Сесія бази даних
 
     :return: Дані нового користувача з відповіддю 201 Created
     """
-    new_user = auth_service.register_user(user)
+    new_user = await auth_service.register_user(user, db)
+    # Лист лише ставиться в чергу; надсилає його воркер app.services.mail_worker
     try:
-        await auth_service.send_verification_email(new_user, background_tasks)
-    except Exception as e:
-        print(f"Email verification send failed: {e}")
+        await auth_service.send_verification_email(new_user)
+    except HTTPException:
+        # Без листа обліковий запис не підтвердити, а повторна реєстрація отримала б 409
+        await auth_service.discard_user(new_user, db)
+        raise
     return new_user
 
 
 # Логін користувача через передачу username та password у тілі запиту
 @router.post("/login", response_model=Token, status_code=status.HTTP_200_OK)
-def login(username: str = Form(...), password: str = Form(...)):
+async def login(username: str = Form(...), password: str = Form(...), db: AsyncSession = Depends(get_db)):
     """
     Авторизація користувача та видача JWT токена.
 
@@ -38,16 +42,16 @@ def login(username: str = Form(...), password: str = Form(...)):
 
     :return: JWT токен доступу (access_token)
     """
-    db_user = auth_service.find_user_by_email(username)
-    if not db_user or not auth_service.verify_password(password, db_user.password):
+    db_user = await auth_service.authenticate_user(username, password, db)
+    if not db_user:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid email or password")
-    access_token = auth_service.create_access_token({"sub": db_user.email})
+    access_token = auth_service.create_login_token(db_user)
     return {"access_token": access_token, "token_type": "bearer"}
 
 
 # Верифікація користувача через посилання
 @router.get("/verify-email/{token}")
-def verify_email(token: str):
+async def verify_email(token: str, db: AsyncSession = Depends(get_db)):
     """
     Підтвердження електронної пошти користувача.
 
@@ -56,15 +60,15 @@ def verify_email(token: str):
 
     :return: Результат верифікації email
     """
-    return auth_service.verify_email(token)
+    return await auth_service.verify_email(token, db)
 
 
 @router.post("/request-password-reset")
-async def request_password_reset(data: PasswordResetRequest, background_tasks: BackgroundTasks):
-    await auth_service.send_password_reset_email(data.email, background_tasks)
+async def request_password_reset(data: PasswordResetRequest, db: AsyncSession = Depends(get_db)):
+    await auth_service.send_password_reset_email(data.email, db)
     return {"message": "If the email exists, a reset link was sent."}
 
 @router.post("/reset-password")
-async def reset_password(data: PasswordResetConfirm):
-    auth_service.reset_password(data.token, data.new_password)
-    return {"message": "Password updated successfully."}
\ No newline at end of file
+async def reset_password(data: PasswordResetConfirm, db: AsyncSession = Depends(get_db)):
+    await auth_service.reset_password(data.token, data.new_password, db)
+    return {"message": "Password updated successfully."}
@@ -1,80 +1,249 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Body, Depends, File, Header, HTTPException, Query, Response, UploadFile, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app import schemas, crud, database
-from app.dependencies import get_current_user
+from app.core.etag import contact_etag, contacts_list_etag, if_match_version, list_etag, not_modified
+from app.core.pagination import InvalidCursor, decode_cursor, encode_cursor
+from app.core.responses import json_response
+from app.dependencies import get_token_user
+from app.services.contact_batch import BATCH_MAX_OPERATIONS, apply_batch
+from app.services.contact_export import FORMATS as EXPORT_FORMATS, export_contacts
+from app.services.contact_import import ImportFormatError, detect_format, import_contacts
+from app.services.rate_limiter import rate_limit
 
 router = APIRouter(prefix="/contacts")
 
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
 
 @router.post("/", response_model=schemas.ContactResponse, status_code=status.HTTP_201_CREATED)
-def create_contact(contact: schemas.ContactCreate, db: Session = Depends(database.get_db),
-                   current_user=Depends(get_current_user)):
+async def create_contact(contact: schemas.ContactCreate, db: AsyncSession = Depends(database.get_db),
+                         current_user=Depends(get_token_user)):
     """
     Створює новий контакт для поточного користувача.
     """
-    created_contact = crud.create_contact(db, contact, current_user.id)
+    created_contact = await crud.create_contact(db, contact, current_user.id)
     if created_contact is None:
         raise HTTPException(status_code=400, detail="Contact with this email already exists.")
     return created_contact
 
+@router.post("/import", response_model=schemas.ContactImportReport, dependencies=[Depends(rate_limit(limit=10))])
+async def import_contacts_file(file: UploadFile = File(...),
+                               format: Optional[Literal["csv", "ndjson"]] = Query(default=None),
+                               db: AsyncSession = Depends(database.get_db),
+                               current_user=Depends(get_token_user)):
+    """
+    Імпортує контакти з CSV (з рядком заголовків) або NDJSON файлу.
+
+    Формат визначається параметром format або розширенням файлу. Рядки з помилками
+    та email, що вже є в записнику, пропускаються і потрапляють у звіт.
+    """
+    try:
+        return await import_contacts(db, file, format or detect_format(file.filename, file.content_type),
+                                     current_user.id)
+    except ImportFormatError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+@router.post("/batch", response_model=List[schemas.ContactBatchResult])
+async def batch_contacts(operations: List[schemas.ContactBatchOperation] = Body(..., max_length=BATCH_MAX_OPERATIONS),
+                         db: AsyncSession = Depends(database.get_db),
+                         current_user=Depends(get_token_user)):
+    """
+    Створює, оновлює та видаляє контакти пакетом в одній транзакції.
+
+    Кожна операція отримує власний результат зі статусом (201, 200, 400 або 404).
+    """
+    try:
+        return await apply_batch(db, operations, current_user.id)
+    except IntegrityError:
+        raise HTTPException(status_code=409, detail="Batch conflicts with existing contacts")
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_contacts_file(format: Literal["csv", "ndjson", "vcf"] = Query(default="csv"),
+                               current_user=Depends(get_token_user)):
+    """
+    Експортує всі контакти поточного користувача у CSV, NDJSON або vCard.
+
+    Файл передається частинами безпосередньо з курсора бази даних.
+    """
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(export_contacts(current_user.id, format), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="contacts.{extension}"'})
+
 @router.get("/", response_model=List[schemas.ContactResponse])
-def read_contacts(skip: int = 0, limit: int = 10, db: Session = Depends(database.get_db),
-                  current_user=Depends(get_current_user)):
+async def read_contacts(skip: int = 0, limit: int = 10, cursor: Optional[str] = None,
+                        if_none_match: Optional[str] = Header(default=None),
+                        db: AsyncSession = Depends(database.get_db), current_user=Depends(get_token_user)):
     """
     Отримує всі контакти поточного користувача.
+
+    Якщо сторінка повна, заголовок X-Next-Cursor містить курсор наступної сторінки;
+    передайте його як параметр cursor замість skip. Якщо ETag з If-None-Match
+    досі актуальний, повертається 304 без тіла.
+    """
+    after_id = None
+    if cursor is not None:
+        try:
+            after_id = decode_cursor(cursor, "id")["id"]
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+    if if_none_match is not None:
+        # Повторна перевірка: лише агрегатний запит, без завантаження рядків
+        count, first_id, last_id, version_sum = await crud.get_contacts_fingerprint(
+            db, skip, limit, current_user.id, after_id=after_id)
+        etag = list_etag(current_user.id, count, first_id, last_id, version_sum)
+        if not_modified(if_none_match, etag):
+            headers = {"ETag": etag}
+            if count and count == limit:
+                headers[NEXT_CURSOR_HEADER] = encode_cursor(id=last_id)
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    contacts = await crud.get_contacts(db, skip, limit, current_user.id, after_id=after_id)
+    headers = {"ETag": contacts_list_etag(current_user.id, contacts)}
+    if contacts and len(contacts) == limit:
+        headers[NEXT_CURSOR_HEADER] = encode_cursor(id=contacts[-1].id)
+    return json_response(crud.contact_dicts(contacts), headers)
+
+@router.get("/changes", response_model=schemas.ContactChanges)
+async def read_contact_changes(since: Optional[str] = Query(default=None, description="sync_token попередньої відповіді"),
+                               limit: int = Query(default=100, ge=1, le=1000),
+                               db: AsyncSession = Depends(database.get_db),
+                               current_user=Depends(get_token_user)):
+    """
+    Повертає контакти, створені, змінені чи видалені після позиції синхронізації since.
+
+    Без since повертаються всі контакти. Видалені контакти приходять з deleted=true
+    без даних. Поки has_more=true, запитуйте далі з отриманим sync_token; його ж
+    збережіть для наступної синхронізації.
     """
-    return crud.get_contacts(db, skip, limit, current_user.id)
+    position = None
+    if since is not None:
+        try:
+            token = decode_cursor(since, "seq", "id")
+        except InvalidCursor:
+            raise HTTPException(status_code=400, detail="Invalid sync token")
+        position = (token["seq"], token["id"])
+    contacts = await crud.get_contact_changes(db, current_user.id, position, limit)
+    if contacts:
+        position = (contacts[-1].change_seq, contacts[-1].id)
+    seq, last_id = position or (0, 0)
+    return {
+        "changes": [{"id": contact.id, "deleted": contact.deleted_at is not None, "updated_at": contact.updated_at,
+                     "contact": None if contact.deleted_at is not None else contact} for contact in contacts],
+        "sync_token": encode_cursor(seq=seq, id=last_id),
+        "has_more": len(contacts) == limit,
+    }
 
 @router.get("/{contact_id:int}", response_model=schemas.ContactResponse)
-def read_contact(contact_id: int, db: Session = Depends(database.get_db), current_user=Depends(get_current_user)):
+async def read_contact(contact_id: int, response: Response, if_none_match: Optional[str] = Header(default=None),
+                       db: AsyncSession = Depends(database.get_db), current_user=Depends(get_token_user)):
     """
     Отримує конкретний контакт за ID.
+
+    Заголовок ETag можна передати як If-Match у PUT чи PATCH або як If-None-Match
+    у наступному GET: для незміненого контакту відповідь буде 304 без тіла.
     """
-    contact = crud.get_contact(db, contact_id, current_user.id)
+    contact = await crud.get_contact(db, contact_id, current_user.id)
     if contact is None:
         raise HTTPException(status_code=404, detail="Contact not found")
+    etag = contact_etag(contact)
+    if not_modified(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    response.headers["ETag"] = etag
     return contact
 
+async def _update_contact(db: AsyncSession, contact_id: int, contact, user_id: int, if_match: Optional[str],
+                          response: Response):
+    """Спільна частина PUT і PATCH: оновлення з перевіркою If-Match і заголовком ETag."""
+    expected_version = if_match_version(if_match, contact_id)
+    if contact.model_fields_set or isinstance(contact, schemas.ContactCreate):
+        try:
+            db_contact = await crud.update_contact(db, contact_id, contact, user_id, expected_version)
+        except IntegrityError:
+            raise HTTPException(status_code=400, detail="Contact with this email already exists.")
+    else:
+        # Порожній PATCH нічого не змінює і не збільшує версію
+        db_contact = await crud.get_contact(db, contact_id, user_id)
+        if db_contact is not None and expected_version not in (None, db_contact.version):
+            raise HTTPException(status_code=412, detail="Contact was modified by another request")
+    if db_contact is None:
+        # Рядок не оновився: або контакту немає, або його версія вже інша
+        if expected_version is not None and await crud.get_contact(db, contact_id, user_id) is not None:
+            raise HTTPException(status_code=412, detail="Contact was modified by another request")
+        raise HTTPException(status_code=404, detail="Contact not found")
+    response.headers["ETag"] = contact_etag(db_contact)
+    return db_contact
+
 @router.put("/{contact_id:int}", response_model=schemas.ContactResponse)
-def update_contact(contact_id: int, contact: schemas.ContactCreate, db: Session = Depends(database.get_db),
-                   current_user=Depends(get_current_user)):
+async def update_contact(contact_id: int, contact: schemas.ContactCreate, response: Response,
+                         if_match: Optional[str] = Header(default=None),
+                         db: AsyncSession = Depends(database.get_db),
+                         current_user=Depends(get_token_user)):
     """
     Оновлює контакт користувача.
+
+    З заголовком If-Match (ETag з попередньої відповіді) оновлення виконається лише
+    для незміненого контакту, інакше 412.
     """
-    db_contact = crud.update_contact(db, contact_id, contact, current_user.id)
-    if db_contact is None:
-        raise HTTPException(status_code=404, detail="Contact not found")
-    return db_contact
+    return await _update_contact(db, contact_id, contact, current_user.id, if_match, response)
+
+@router.patch("/{contact_id:int}", response_model=schemas.ContactResponse)
+async def patch_contact(contact_id: int, contact: schemas.ContactUpdate, response: Response,
+                        if_match: Optional[str] = Header(default=None),
+                        db: AsyncSession = Depends(database.get_db),
+                        current_user=Depends(get_token_user)):
+    """
+    Частково оновлює контакт: змінюються лише передані поля.
+
+    З заголовком If-Match (ETag з попередньої відповіді) оновлення виконається лише
+    для незміненого контакту, інакше 412.
+    """
+    return await _update_contact(db, contact_id, contact, current_user.id, if_match, response)
 
 @router.delete("/{contact_id:int}")
-def delete_contact(contact_id: int, db: Session = Depends(database.get_db), current_user=Depends(get_current_user)):
+async def delete_contact(contact_id: int, db: AsyncSession = Depends(database.get_db),
+                         current_user=Depends(get_token_user)):
     """
     Видаляє контакт користувача.
     """
-    db_contact = crud.delete_contact(db, contact_id, current_user.id)
-    if db_contact is None:
+    deleted_id = await crud.delete_contact(db, contact_id, current_user.id)
+    if deleted_id is None:
         raise HTTPException(status_code=404, detail="Contact not found")
     return {"detail": "Contact deleted"}
 
 @router.get("/search", response_model=List[schemas.ContactResponse])
-def search_contacts(
+async def search_contacts(
+        q: Optional[str] = Query(default=None, min_length=1, description="Пошук по імені, прізвищу та email"),
+        prefix: bool = Query(default=False, description="Лише слова, що починаються з q (typeahead)"),
+        limit: int = Query(default=50, ge=1, le=200),
         first_name: Optional[str] = Query(default=None),
         last_name: Optional[str] = Query(default=None),
         email: Optional[str] = Query(default=None),
-        db: Session = Depends(database.get_db),
-        current_user=Depends(get_current_user)
+        db: AsyncSession = Depends(database.get_db),
+        current_user=Depends(get_token_user)
 ):
     """
     Пошук контактів за іменем, прізвищем або email.
+
+    Результати за q відсортовані за релевантністю.
     """
-    return crud.search_contacts(db, first_name, last_name, email, current_user.id)
+    # Із пробілів вийшов би шаблон '%%', що збігається з усіма контактами
+    if q is not None and not q.strip():
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail="Search query must not be blank")
+    contacts = await crud.search_contacts(db, first_name, last_name, email, current_user.id,
+                                          q=q, prefix=prefix, limit=limit)
+    return json_response(crud.contact_dicts(contacts))
 
 @router.get("/upcoming-birthdays", response_model=List[schemas.ContactResponse])
-def upcoming_birthdays(db: Session = Depends(database.get_db), current_user=Depends(get_current_user)):
+async def upcoming_birthdays(days: int = Query(default=7, ge=0, le=366),
+                             db: AsyncSession = Depends(database.get_db),
+                             current_user=Depends(get_token_user)):
     """
-    Отримує контакти з днями народження впродовж 7 днів.
+    Отримує контакти з днями народження впродовж наступних days днів (за замовчуванням 7).
+
+    Список на поточний день зберігається в Redis і оновлюється щоночі та при зміні контактів.
     """
-    return crud.get_upcoming_birthdays(db, current_user.id)
+    return json_response(await crud.get_cached_upcoming_birthdays(db, current_user.id, days))
@@ -0,0 +1,12 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
+
+router = APIRouter()
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """
+    Метрики у форматі Prometheus: стан пулу з'єднань, час очікування та кількість SQL-запитів за маршрутом.
+    """
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
@@ -1,12 +1,11 @@
-from fastapi import APIRouter, Depends, UploadFile, File, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, UploadFile, File, status
 
 from app.dependencies import get_current_user
-from app.schemas import UserResponse
-from app.services.auth_service import AuthService
-from app.services.rate_limiter import limit_requests
+from app.schemas import AvatarJob, UserResponse
+from app.services import avatar_pipeline
+from app.services.rate_limiter import limit_requests, rate_limit
 
 router = APIRouter()
-auth_service = AuthService()
 
 
 @router.get("/me", response_model=UserResponse, dependencies=[Depends(limit_requests)])
@@ -17,10 +16,33 @@ def get_me(current_user=Depends(get_current_user)):
     return current_user
 
 
-@router.post("/avatar", status_code=status.HTTP_201_CREATED)
-def update_avatar(current_user=Depends(get_current_user), file: UploadFile = File(...)):
+@router.post("/avatar", response_model=AvatarJob, status_code=status.HTTP_202_ACCEPTED,
+             dependencies=[Depends(rate_limit(limit=10, window=3600))])
+async def update_avatar(background_tasks: BackgroundTasks, current_user=Depends(get_current_user),
+                        file: UploadFile = File(...)):
     """
-    Завантажити аватар користувача на Cloudinary.
+    Прийняти новий аватар користувача на обробку.
+
+    Зображення зменшується до аватара й мініатюр у WebP у фоні; відповідь
+    одразу містить ID завдання, стан якого повертає GET /avatar/jobs/{job_id}.
+    Файл, який уже завантажували, повторно не обробляється.
+    """
+    if avatar_pipeline.pool.full:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many avatars are being processed", headers={"Retry-After": "5"})
+    path, digest = await avatar_pipeline.spool_upload(file)
+    job = await avatar_pipeline.create_job(current_user.id)
+    background_tasks.add_task(avatar_pipeline.process_avatar, job["id"], current_user.id, current_user.email, path,
+                              digest)
+    return job
+
+
+@router.get("/avatar/jobs/{job_id}", response_model=AvatarJob)
+async def get_avatar_job(job_id: str, current_user=Depends(get_current_user)):
+    """
+    Отримати стан завдання обробки аватара.
     """
-    file_bytes = file.file.read()
-    return auth_service.upload_avatar_to_cloudinary(current_user, file_bytes)
+    job = await avatar_pipeline.get_job(job_id, current_user.id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Avatar job not found")
+    return job
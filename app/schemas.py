@@ -1,7 +1,7 @@
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Dict, List, Literal, Optional
 
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, model_validator
 
 
 class ContactCreate(BaseModel):
@@ -12,6 +12,21 @@ class ContactCreate(BaseModel):
     birthday: date
     additional_info: Optional[str] = None
 
+class ContactUpdate(BaseModel):
+    first_name: Optional[str] = None
+    last_name: Optional[str] = None
+    email: Optional[EmailStr] = None
+    phone_number: Optional[str] = None
+    birthday: Optional[date] = None
+    additional_info: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_required_not_null(self):
+        for name in self.model_fields_set:
+            if getattr(self, name) is None and ContactCreate.model_fields[name].is_required():
+                raise ValueError(f"{name} cannot be null")
+        return self
+
 class ContactResponse(ContactCreate):
     id: int
 
@@ -19,11 +34,65 @@ class ContactResponse(ContactCreate):
         from_attributes = True
 
 
+class ContactImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    detail: str
+
+class ContactImportReport(BaseModel):
+    imported: int
+    failed: int
+    errors: List[ContactImportError]
+
+class ContactBatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[int] = None
+    contact: Optional[ContactCreate] = None
+
+    @model_validator(mode="after")
+    def check_required_fields(self):
+        if self.op != "create" and self.id is None:
+            raise ValueError(f"{self.op} operation requires id")
+        if self.op != "delete" and self.contact is None:
+            raise ValueError(f"{self.op} operation requires contact")
+        return self
+
+class ContactBatchResult(BaseModel):
+    index: int
+    op: str
+    status: int
+    id: Optional[int] = None
+    detail: Optional[str] = None
+    contact: Optional[ContactResponse] = None
+
+
+class ContactChange(BaseModel):
+    id: int
+    deleted: bool
+    updated_at: datetime
+    # Дані контакту; для видаленого (надгробка) відсутні
+    contact: Optional[ContactResponse] = None
+
+
+class ContactChanges(BaseModel):
+    changes: List[ContactChange]
+    # Позиція для наступного запиту GET /contacts/changes?since=
+    sync_token: str
+    has_more: bool
+
+
 class UserCreate(BaseModel):
     email: EmailStr
     password: str
 
 
+class TokenUser(BaseModel):
+    # Email уже перевірено при реєстрації, а claims підписані нами
+    id: int
+    email: str
+    is_verified: bool
+
+
 class UserResponse(BaseModel):
     id: int
     email: EmailStr
@@ -34,6 +103,14 @@ class UserResponse(BaseModel):
         from_attributes = True
 
 
+class AvatarJob(BaseModel):
+    id: str
+    status: Literal["pending", "done", "failed"]
+    avatar_url: Optional[str] = None
+    thumbnails: Dict[str, str] = {}
+    error: Optional[str] = None
+
+
 class Token(BaseModel):
     access_token: str
     token_type: str
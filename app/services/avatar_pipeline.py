@@ -0,0 +1,284 @@
+import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from fastapi import UploadFile
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.core import redis
+from app.core.body_limit import too_large
+from app.core.process_pool import BoundedProcessPool, PoolFull
+from app.database import AsyncSessionLocal
+from app.services import avatar_storage, user_cache
+
+logger = logging.getLogger(__name__)
+
+# Найбільший розмір завантаженого файлу; файл копіюється частинами по AVATAR_CHUNK_SIZE
+AVATAR_MAX_BYTES = int(os.getenv("AVATAR_MAX_BYTES", 5 * 1024 * 1024))
+AVATAR_CHUNK_SIZE = 64 * 1024
+# Ліміт усього тіла запиту (див. BodySizeLimitMiddleware): файл плюс заголовки multipart
+AVATAR_MAX_REQUEST_BYTES = AVATAR_MAX_BYTES + 16 * 1024
+# Каталог для завантажень, що чекають на обробку; за замовчуванням системний тимчасовий
+AVATAR_UPLOAD_DIR = os.getenv("AVATAR_UPLOAD_DIR") or None
+# Сторона аватара й мініатюр у пікселях; усі зберігаються у WebP
+AVATAR_SIZE = int(os.getenv("AVATAR_SIZE", 512))
+AVATAR_THUMBNAIL_SIZES = tuple(int(size) for size in os.getenv("AVATAR_THUMBNAIL_SIZES", "128,64").split(","))
+AVATAR_WEBP_QUALITY = int(os.getenv("AVATAR_WEBP_QUALITY", 80))
+# Захист від «бомб» стиснення: файл на кілька КБ, що розпаковується в гігабайти
+AVATAR_MAX_PIXELS = int(os.getenv("AVATAR_MAX_PIXELS", 40_000_000))
+ALLOWED_FORMATS = {"JPEG", "PNG", "WEBP", "GIF"}
+# Процеси обробки зображень і скільки завантажень може чекати на вільний процес
+AVATAR_WORKERS = int(os.getenv("AVATAR_WORKERS", 1))
+AVATAR_QUEUE_SIZE = int(os.getenv("AVATAR_QUEUE_SIZE", 16))
+AVATAR_WORKER_NICE = int(os.getenv("AVATAR_WORKER_NICE", 10))
+
+# Стан завдань у Redis-хешах avatar:job:<id>, доступний клієнту добу
+JOB_PREFIX = "avatar:job"
+JOB_TTL = 24 * 3600
+
+# Фонове прибирання: як часто, скільки аватар без посилань ще зберігається і скільки видаляти за раз
+AVATAR_GC_INTERVAL = float(os.getenv("AVATAR_GC_INTERVAL", 3600))
+AVATAR_GC_GRACE = float(os.getenv("AVATAR_GC_GRACE", 24 * 3600))
+AVATAR_GC_BATCH = int(os.getenv("AVATAR_GC_BATCH", 100))
+
+pool = BoundedProcessPool(AVATAR_WORKERS, AVATAR_QUEUE_SIZE, nice=AVATAR_WORKER_NICE)
+
+
+class InvalidImage(ValueError):
+    """Файл не є зображенням підтримуваного формату або пошкоджений."""
+
+
+def content_hasher():
+    """
+    SHA-256 для адресації аватара за вмістом.
+
+    Хеш враховує й налаштування обробки: після їх зміни той самий файл
+    обробляється заново, а не отримує збережені раніше розміри.
+    """
+    sizes = ",".join(map(str, (AVATAR_SIZE, *AVATAR_THUMBNAIL_SIZES)))
+    return hashlib.sha256(f"webp:{sizes}:{AVATAR_WEBP_QUALITY}\n".encode())
+
+
+def asset_key(digest: str, size) -> str:
+    """Ключ файлу одного розміру аватара в сховищі."""
+    return f"avatars/{digest}_{size}.webp"
+
+
+def _spool(source, max_bytes: int):
+    hasher = content_hasher()
+    size = 0
+    target = tempfile.NamedTemporaryFile(dir=AVATAR_UPLOAD_DIR, prefix="avatar-", suffix=".upload", delete=False)
+    try:
+        with target:
+            while chunk := source.read(AVATAR_CHUNK_SIZE):
+                size += len(chunk)
+                if size > max_bytes:
+                    raise too_large(max_bytes)
+                target.write(chunk)
+                hasher.update(chunk)
+    except BaseException:
+        os.unlink(target.name)
+        raise
+    return target.name, hasher.hexdigest()
+
+
+async def spool_upload(file: UploadFile) -> tuple:
+    """
+    Копіює завантажений файл частинами у власний тимчасовий файл, не допускаючи
+    перевищення ліміту, і одночасно обчислює його хеш.
+
+    Вміст не збирається в пам'яті: процес пулу читає зображення з диска. Файл форми
+    закривається разом із запитом, тож фоновому завданню потрібна власна копія;
+    її видаляє process_avatar.
+
+    :param file: Завантажений файл
+    :return: Кортеж (шлях до тимчасового файлу, хеш вмісту)
+    :raises HTTPException: 413, якщо файл більший за AVATAR_MAX_BYTES
+    """
+    max_bytes = AVATAR_MAX_BYTES
+    if file.size is not None and file.size > max_bytes:
+        raise too_large(max_bytes)
+    await file.seek(0)
+    return await run_in_threadpool(_spool, file.file, max_bytes)
+
+
+def render_avatar(path: str) -> dict:
+    """
+    Зменшує зображення до аватара й мініатюр у WebP. Виконується в процесі пулу.
+
+    Кожен наступний розмір зменшується з попереднього, а не з оригіналу.
+
+    :param path: Шлях до завантаженого файлу (див. spool_upload)
+    :return: Словник {сторона в пікселях: байти WebP}
+    :raises InvalidImage: Якщо файл не є зображенням підтримуваного формату
+    """
+    Image.MAX_IMAGE_PIXELS = AVATAR_MAX_PIXELS
+    try:
+        with Image.open(path) as original:
+            if original.format not in ALLOWED_FORMATS:
+                raise InvalidImage(f"Unsupported image format {original.format}")
+            # Pillow сам відмовляє лише вдвічі більшим зображенням, між лімітами лише попереджає
+            if original.width * original.height > AVATAR_MAX_PIXELS:
+                raise InvalidImage("Image has too many pixels")
+            # JPEG декодується одразу зі зменшенням, що в рази швидше за повне декодування
+            original.draft("RGB", (AVATAR_SIZE, AVATAR_SIZE))
+            image = ImageOps.exif_transpose(original)
+            image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError) as exc:
+        raise InvalidImage(str(exc)) from exc
+
+    renditions = {}
+    for size in sorted((AVATAR_SIZE, *AVATAR_THUMBNAIL_SIZES), reverse=True):
+        image.thumbnail((size, size), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.save(buffer, "WEBP", quality=AVATAR_WEBP_QUALITY)
+        renditions[size] = buffer.getvalue()
+    return renditions
+
+
+def job_key(job_id: str) -> str:
+    """Ключ Redis-хешу стану завдання."""
+    return f"{JOB_PREFIX}:{job_id}"
+
+
+async def _save_job(job_id: str, fields: dict):
+    await redis.pipeline(lambda pipe: pipe.hset(job_key(job_id), mapping=fields).expire(job_key(job_id), JOB_TTL))
+
+
+async def create_job(user_id: int) -> dict:
+    """
+    Реєструє нове завдання обробки аватара.
+
+    :param user_id: ID власника
+    :return: Словник завдання зі статусом pending
+    """
+    job = {"id": uuid.uuid4().hex, "status": "pending"}
+    await _save_job(job["id"], {"user_id": user_id, "status": "pending"})
+    return job
+
+
+async def get_job(job_id: str, user_id: int):
+    """
+    Повертає стан завдання власника.
+
+    :param job_id: ID завдання
+    :param user_id: ID користувача, що запитує
+    :return: Словник завдання або None, якщо завдання немає чи воно чуже
+    """
+    fields = await redis.execute(lambda client: client.hgetall(job_key(job_id)), default={})
+    if not fields or fields.get("user_id") != str(user_id):
+        return None
+    return {
+        "id": job_id,
+        "status": fields["status"],
+        "avatar_url": fields.get("avatar_url"),
+        "thumbnails": json.loads(fields.get("thumbnails", "{}")),
+        "error": fields.get("error"),
+    }
+
+
+async def _store_renditions(digest: str, path: str) -> dict:
+    renditions = await pool.submit(render_avatar, path)
+    storage = avatar_storage.get_storage()
+    sizes = list(renditions)
+    urls = await asyncio.gather(*(
+        storage.save(asset_key(digest, size), renditions[size], "image/webp") for size in sizes
+    ))
+    return {str(size): url for size, url in zip(sizes, urls)}
+
+
+async def _renditions_exist(digest: str, renditions: dict) -> bool:
+    storage = avatar_storage.get_storage()
+    found = await asyncio.gather(*(storage.exists(asset_key(digest, size)) for size in renditions or {}))
+    return bool(found) and all(found)
+
+
+async def process_avatar(job_id: str, user_id: int, email: str, path: str, digest: str):
+    """
+    Фонове завдання: обробляє зображення, зберігає всі розміри і оновлює аватар користувача.
+
+    Файл, який уже хтось завантажував, не обробляється і не зберігається вдруге:
+    користувач отримує посилання на наявні розміри. Якщо файлів цих розмірів у
+    сховищі вже немає, зображення обробляється заново. Результат або причина
+    помилки записуються в стан завдання (див. get_job).
+
+    :param job_id: ID завдання
+    :param user_id: ID користувача
+    :param email: Email користувача (ключ його кешу)
+    :param path: Тимчасовий файл завантаження; видаляється після обробки
+    :param digest: Хеш вмісту (див. spool_upload)
+    """
+    try:
+        await _process_avatar(job_id, user_id, email, path, digest)
+    finally:
+        await run_in_threadpool(Path(path).unlink, missing_ok=True)
+
+
+async def _process_avatar(job_id: str, user_id: int, email: str, path: str, digest: str):
+    acquired = False
+    try:
+        async with AsyncSessionLocal() as db:
+            asset = await crud.acquire_avatar_asset(db, digest)
+            acquired = True
+            # Запис без файлів роздавав би посилання, що відповідають 404
+            if asset.url is None or not await _renditions_exist(digest, asset.renditions):
+                renditions = await _store_renditions(digest, path)
+                url = renditions[str(AVATAR_SIZE)]
+                await crud.complete_avatar_asset(db, digest, url, renditions)
+            else:
+                url, renditions = asset.url, asset.renditions
+            await crud.set_user_avatar(db, user_id, digest, url)
+            acquired = False
+        await user_cache.invalidate(email)
+    except Exception as exc:
+        if acquired:
+            await _release(digest)
+        if isinstance(exc, InvalidImage):
+            error = f"Invalid image: {exc}"
+        elif isinstance(exc, PoolFull):
+            error = "Too many avatars are being processed, retry later"
+        else:
+            logger.exception("Avatar job %s failed", job_id)
+            error = "Internal error"
+        await _save_job(job_id, {"status": "failed", "error": error})
+        return
+    thumbnails = {size: rendition for size, rendition in renditions.items() if size != str(AVATAR_SIZE)}
+    await _save_job(job_id, {"status": "done", "avatar_url": url, "thumbnails": json.dumps(thumbnails)})
+
+
+async def _release(digest: str):
+    try:
+        async with AsyncSessionLocal() as db:
+            await crud.release_avatar_asset(db, digest)
+    except Exception:
+        logger.exception("Could not release avatar asset %s", digest)
+
+
+async def sweep_released_assets(now: datetime = None) -> int:
+    """
+    Видаляє зі сховища аватари, на які ніхто не посилається довше за AVATAR_GC_GRACE.
+
+    Записи видаляються в одній транзакції з файлами: якщо файли видалити не
+    вдалося, транзакція відкочується і наступне прибирання спробує знову.
+
+    :param now: Поточний час (для тестів)
+    :return: Кількість видалених аватарів
+    """
+    released_before = (now or datetime.now(timezone.utc)) - timedelta(seconds=AVATAR_GC_GRACE)
+    storage = avatar_storage.get_storage()
+    async with AsyncSessionLocal() as db:
+        assets = await crud.delete_released_avatar_assets(db, released_before, AVATAR_GC_BATCH)
+        await asyncio.gather(*(
+            storage.delete(asset_key(asset.digest, size)) for asset in assets for size in asset.renditions or {}
+        ))
+        await db.commit()
+    return len(assets)
@@ -0,0 +1,149 @@
+import os
+from pathlib import Path
+
+import cloudinary
+import cloudinary.api
+import cloudinary.uploader
+from cloudinary.exceptions import NotFound
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse, StaticFiles
+
+# Де зберігати аватари: "cloudinary" або "local" (файлова система, для розробки й тестів)
+AVATAR_STORAGE = os.getenv("AVATAR_STORAGE", "cloudinary")
+# Каталог і URL-префікс, під яким застосунок роздає локальні файли
+AVATAR_LOCAL_DIR = os.getenv("AVATAR_LOCAL_DIR", "media")
+AVATAR_LOCAL_URL = os.getenv("AVATAR_LOCAL_URL", "/media")
+# Ім'я файлу містить хеш вмісту, тож файл за тим самим URL ніколи не змінюється
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+cloudinary.config(
+    cloud_name=os.getenv("CLOUDINARY_CLOUD_NAME"),
+    api_key=os.getenv("CLOUDINARY_API_KEY"),
+    api_secret=os.getenv("CLOUDINARY_API_SECRET"),
+    secure=True
+)
+
+
+class CloudinaryStorage:
+    """Зберігає файли в Cloudinary; виклики SDK блокуючі, тому виконуються в пулі потоків."""
+
+    async def save(self, key: str, data: bytes, content_type: str) -> str:
+        """
+        Завантажує файл і повертає його публічний URL.
+
+        :param key: Шлях файлу, наприклад "avatars/abc_512.webp"; розширення Cloudinary визначає сам
+        :param data: Вміст файлу
+        :param content_type: MIME-тип вмісту
+        :return: HTTPS URL файлу
+        """
+        folder, public_id = self._split(key)
+        result = await run_in_threadpool(cloudinary.uploader.upload, data, folder=folder, public_id=public_id,
+                                         overwrite=True, resource_type="image")
+        return result["secure_url"]
+
+    async def delete(self, key: str):
+        """
+        Видаляє файл; відсутній файл не є помилкою.
+
+        :param key: Шлях файлу, переданий у save
+        """
+        folder, public_id = self._split(key)
+        await run_in_threadpool(cloudinary.uploader.destroy, f"{folder}/{public_id}" if folder else public_id,
+                                resource_type="image", invalidate=True)
+
+    async def exists(self, key: str) -> bool:
+        """
+        Перевіряє, чи файл ще є в Cloudinary.
+
+        :param key: Шлях файлу, переданий у save
+        """
+        folder, public_id = self._split(key)
+        try:
+            await run_in_threadpool(cloudinary.api.resource, f"{folder}/{public_id}" if folder else public_id,
+                                    resource_type="image")
+        except NotFound:
+            return False
+        return True
+
+    @staticmethod
+    def _split(key: str) -> tuple:
+        folder, _, name = key.rpartition("/")
+        return folder, name.rsplit(".", 1)[0]
+
+
+class LocalStorage:
+    """Зберігає файли в каталозі, який застосунок роздає за префіксом base_url."""
+
+    def __init__(self, root: str, base_url: str):
+        self.root = Path(root)
+        self.base_url = base_url.rstrip("/")
+
+    async def save(self, key: str, data: bytes, content_type: str) -> str:
+        """
+        Записує файл на диск і повертає його URL.
+
+        Ключі містять хеш вмісту, тож наявний файл не перезаписується.
+
+        :param key: Шлях файлу відносно каталогу, наприклад "avatars/abc_512.webp"
+        :param data: Вміст файлу
+        :param content_type: MIME-тип вмісту
+        :return: URL файлу в застосунку
+        """
+        path = self.root / key
+        await run_in_threadpool(self._write, path, data)
+        return f"{self.base_url}/{key}"
+
+    async def delete(self, key: str):
+        """
+        Видаляє файл; відсутній файл не є помилкою.
+
+        :param key: Шлях файлу відносно каталогу
+        """
+        await run_in_threadpool((self.root / key).unlink, missing_ok=True)
+
+    async def exists(self, key: str) -> bool:
+        """
+        Перевіряє, чи файл є на диску.
+
+        :param key: Шлях файлу відносно каталогу
+        """
+        return await run_in_threadpool((self.root / key).is_file)
+
+    @staticmethod
+    def _write(path: Path, data: bytes):
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Запис через тимчасовий файл, щоб ніхто не прочитав файл наполовину
+        temporary = path.with_suffix(path.suffix + ".tmp")
+        temporary.write_bytes(data)
+        temporary.replace(path)
+
+
+class AvatarFiles(StaticFiles):
+    """
+    Роздає локальні аватари з заголовками довготривалого кешування.
+
+    ETag — ім'я файлу (хеш вмісту і розмір), а не час зміни, тож він однаковий
+    на всіх екземплярах застосунку.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": f'"{Path(full_path).stem}"'}
+        response = FileResponse(full_path, status_code=status_code, headers=headers, stat_result=stat_result)
+        if self.is_not_modified(response.headers, Headers(scope=scope)):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+def get_storage():
+    """
+    Повертає сховище аватарів, вибране змінною AVATAR_STORAGE.
+
+    :return: CloudinaryStorage або LocalStorage
+    """
+    if AVATAR_STORAGE == "local":
+        return LocalStorage(AVATAR_LOCAL_DIR, AVATAR_LOCAL_URL)
+    return CloudinaryStorage()
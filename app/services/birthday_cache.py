@@ -0,0 +1,145 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+import orjson
+
+from app.core import redis
+
+# Ключ містить дату, тож список за вчора ніколи не віддається сьогодні
+KEY_PREFIX = "birthdays"
+# Запас після опівночі, поки щоденне завдання будує списки на новий день
+EXPIRE_GRACE = timedelta(hours=1)
+# Лічильник змін контактів користувача: invalidate збільшує його, а store записує
+# список, лише якщо лічильник не змінився відтоді, як список почали будувати
+GENERATION_PREFIX = "birthdays-gen"
+GENERATION_TTL = 2 * 24 * 3600
+# Окремий префікс: ключ блокування не повинен збігатися з шаблоном SCAN у cached_windows
+REFRESH_LOCK_PREFIX = "birthdays-lock"
+
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('HSET', KEYS[1], ARGV[2], ARGV[3])
+redis.call('EXPIREAT', KEYS[1], ARGV[4])
+return 1
+"""
+store_if_current = redis.script(STORE_SCRIPT)
+
+
+def cache_key(user_id: int, day: date) -> str:
+    """Ключ Redis-хешу найближчих днів народження користувача на вказаний день."""
+    return f"{KEY_PREFIX}:{user_id}:{day.isoformat()}"
+
+
+def generation_key(user_id: int) -> str:
+    """Ключ лічильника змін контактів користувача."""
+    return f"{GENERATION_PREFIX}:{user_id}"
+
+
+def refresh_lock_key(day: date) -> str:
+    """Ключ блокування щоденного оновлення списків на вказаний день."""
+    return f"{REFRESH_LOCK_PREFIX}:{day.isoformat()}"
+
+
+async def get(user_id: int, days: int, today: date = None):
+    """
+    Читає збережений список найближчих днів народження одним запитом HGET.
+
+    :param user_id: ID користувача
+    :param days: Розмір вікна в днях
+    :param today: Дата, на яку побудовано список (за замовчуванням сьогодні)
+    :return: Список словників контактів або None, якщо кешу немає чи Redis недоступний
+    """
+    cached = await get_json(user_id, days, today)
+    return json.loads(cached) if cached is not None else None
+
+
+async def get_json(user_id: int, days: int, today: date = None):
+    """
+    Те саме, що get, але повертає збережений JSON без розбору.
+
+    :return: JSON-масив контактів або None, якщо кешу немає чи Redis недоступний
+    """
+    key = cache_key(user_id, today or date.today())
+    return await redis.execute(lambda client: client.hget(key, str(days)))
+
+
+async def generation(user_id: int):
+    """
+    Читає лічильник змін контактів користувача перед побудовою списку з бази.
+
+    :param user_id: ID користувача
+    :return: Значення лічильника для store або None, якщо Redis недоступний
+    """
+    async def read(client):
+        return await client.get(generation_key(user_id)) or "0"
+
+    return await redis.execute(read)
+
+
+async def store(user_id: int, days: int, contacts: list, generation: str, today: date = None) -> bool:
+    """
+    Зберігає список найближчих днів народження до кінця дня, якщо контакти
+    користувача не змінилися, поки список читався з бази.
+
+    Інакше застарілий список, записаний після invalidate, віддавався б до опівночі.
+
+    :param user_id: ID користувача
+    :param days: Розмір вікна в днях
+    :param contacts: Список словників контактів (дати кодуються у формат ISO)
+    :param generation: Значення generation(user_id), прочитане до запиту в базу
+    :param today: Дата, на яку побудовано список (за замовчуванням сьогодні)
+    :return: True, якщо список збережено
+    """
+    if generation is None:
+        return False
+    today = today or date.today()
+    expire_at = datetime.combine(today + timedelta(days=1), time.min) + EXPIRE_GRACE
+    stored = await redis.execute(lambda client: store_if_current(
+        keys=[cache_key(user_id, today), generation_key(user_id)],
+        args=[generation, str(days), orjson.dumps(contacts), int(expire_at.timestamp())], client=client))
+    return bool(stored)
+
+
+async def invalidate(user_id: int, today: date = None):
+    """
+    Видаляє збережені списки користувача після зміни його контактів і збільшує
+    лічильник змін, щоб списки, прочитані з бази до зміни, не потрапили в кеш.
+
+    :param user_id: ID користувача
+    :param today: Дата, для якої видаляється кеш (за замовчуванням сьогодні)
+    """
+    key = cache_key(user_id, today or date.today())
+    counter = generation_key(user_id)
+    await redis.pipeline(lambda pipe: pipe.delete(key).incr(counter).expire(counter, GENERATION_TTL),
+                         transaction=True)
+
+
+async def cached_windows(day: date) -> list:
+    """
+    Перелічує користувачів і розміри вікон, для яких є кеш на вказаний день.
+
+    Ключі знаходить SCAN, а розміри вікон усіх ключів читаються одним pipeline.
+
+    :param day: Дата кешу
+    :return: Список пар (user_id, [days, ...]); порожній, якщо Redis недоступний
+    """
+    async def scan(client):
+        return [key async for key in client.scan_iter(match=f"{KEY_PREFIX}:*:{day.isoformat()}", count=500)]
+
+    keys = await redis.execute(scan, default=[])
+    windows = await redis.pipeline(lambda pipe: [pipe.hkeys(key) for key in keys], default=[]) if keys else []
+    return [(int(key.split(":")[1]), [int(days) for days in fields]) for key, fields in zip(keys, windows)]
+
+
+async def acquire_refresh_lock(day: date) -> bool:
+    """
+    Гарантує, що щоденне оновлення виконає лише один воркер чи репліка.
+
+    :param day: Дата, для якої будуються списки
+    :return: True, якщо блокування отримано
+    """
+    key = refresh_lock_key(day)
+    return bool(await redis.execute(lambda client: client.set(key, 1, nx=True,
+                                                               ex=int(EXPIRE_GRACE.total_seconds()))))
@@ -0,0 +1,81 @@
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.models import Contact
+from app.services import birthday_cache
+
+# Найбільша кількість операцій в одному запиті POST /contacts/batch
+BATCH_MAX_OPERATIONS = 1000
+
+NOT_FOUND = "Contact not found"
+DUPLICATE_EMAIL = "Contact with this email already exists."
+REPEATED_ID = "Contact appears more than once in the batch"
+
+
+async def apply_batch(db: AsyncSession, operations: list, user_id: int) -> list:
+    """
+    Виконує пакет операцій над контактами однією транзакцією.
+
+    Операції групуються за типом і виконуються по одному запиту на групу:
+    спершу видалення, потім оновлення, потім створення, тож email видаленого
+    чи зміненого контакту можна використати в тому ж пакеті. Операція, що не
+    вдалася (контакт не знайдено, email зайнятий), не скасовує решту.
+
+    :param db: Асинхронна сесія бази даних
+    :param operations: Список операцій (Pydantic моделі ContactBatchOperation)
+    :param user_id: ID користувача
+    :return: Список результатів у форматі ContactBatchResult у порядку операцій
+    """
+    results = [{"index": index, "op": operation.op, "id": operation.id} for index, operation in enumerate(operations)]
+    deletes, updates, creates, seen = {}, {}, {}, set()
+    for index, operation in enumerate(operations):
+        if operation.op == "create":
+            creates[index] = operation.contact
+        elif operation.id in seen:
+            results[index].update(status=400, detail=REPEATED_ID)
+        else:
+            seen.add(operation.id)
+            (deletes if operation.op == "delete" else updates)[index] = operation.id
+
+    deleted = await crud.delete_contacts(db, set(deletes.values()), user_id)
+    for index, contact_id in deletes.items():
+        if contact_id in deleted:
+            results[index].update(status=200, detail="Contact deleted")
+        else:
+            results[index].update(status=404, detail=NOT_FOUND)
+
+    # Новий email не може належати іншому контакту користувача чи повторюватися в пакеті
+    owners, changes = {}, {}
+    if updates:
+        emails = {operations[index].contact.email for index in updates}
+        owners = dict((await db.execute(
+            select(Contact.email, Contact.id).filter(Contact.user_id == user_id, Contact.email.in_(emails),
+                                                    crud.NOT_DELETED)
+        )).all())
+    for index, contact_id in updates.items():
+        email = operations[index].contact.email
+        if owners.setdefault(email, contact_id) != contact_id:
+            results[index].update(status=400, detail=DUPLICATE_EMAIL)
+        else:
+            changes[contact_id] = operations[index].contact
+    updated = await crud.update_contacts(db, changes, user_id)
+    for index, contact_id in updates.items():
+        if contact_id in updated:
+            results[index].update(status=200, contact=updated[contact_id]._asdict())
+        elif contact_id in changes:
+            results[index].update(status=404, detail=NOT_FOUND)
+
+    created = await crud.insert_new_contacts(db, list(creates.values()), user_id) if creates else {}
+    changed = bool(deleted or updated or created)
+    for index, contact in creates.items():
+        row = created.pop(contact.email, None)
+        if row is None:
+            results[index].update(status=400, detail=DUPLICATE_EMAIL)
+        else:
+            results[index].update(status=201, id=row.id, contact=row._asdict())
+
+    await db.commit()
+    if changed:
+        await birthday_cache.invalidate(user_id)
+    return results
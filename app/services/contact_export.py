@@ -0,0 +1,81 @@
+import csv
+import io
+import json
+
+from app import crud
+from app.database import AsyncSessionLocal
+from app.models import Contact
+
+# Поля ContactResponse, але id першим: так стовпці файлу йшли від початку
+COLUMNS = ["id", *(name for name in crud.CONTACT_RESPONSE_FIELDS if name != "id")]
+SELECTED = tuple(getattr(Contact, name) for name in COLUMNS)
+
+# Формат -> (MIME-тип, розширення файлу)
+FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "vcf": ("text/vcard; charset=utf-8", "vcf"),
+}
+
+
+def _csv_chunk(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(COLUMNS)
+    writer.writerows(rows)
+    return buffer.getvalue()
+
+
+def _ndjson_chunk(rows, header: bool) -> str:
+    return "".join(json.dumps(dict(zip(COLUMNS, row)), ensure_ascii=False, default=str) + "\n" for row in rows)
+
+
+def _vcard_escape(value) -> str:
+    return (str(value).replace("\\", "\\\\").replace("\n", "\\n").replace(",", "\\,")
+            .replace(";", "\\;"))
+
+
+def _vcf_chunk(rows, header: bool) -> str:
+    cards = []
+    for row in rows:
+        lines = [
+            "BEGIN:VCARD",
+            "VERSION:3.0",
+            f"N:{_vcard_escape(row.last_name)};{_vcard_escape(row.first_name)};;;",
+            f"FN:{_vcard_escape(f'{row.first_name} {row.last_name}')}",
+            f"EMAIL;TYPE=INTERNET:{_vcard_escape(row.email)}",
+            f"TEL:{_vcard_escape(row.phone_number)}",
+            f"BDAY:{row.birthday.isoformat()}",
+        ]
+        if row.additional_info:
+            lines.append(f"NOTE:{_vcard_escape(row.additional_info)}")
+        lines.append("END:VCARD")
+        cards.append("\r\n".join(lines) + "\r\n")
+    return "".join(cards)
+
+
+WRITERS = {"csv": _csv_chunk, "ndjson": _ndjson_chunk, "vcf": _vcf_chunk}
+
+
+async def export_contacts(user_id: int, fmt: str):
+    """
+    Генерує вміст файлу експорту контактів частинами для StreamingResponse.
+
+    Генератор відкриває власну сесію: залежність get_db закривається до того,
+    як FastAPI почне надсилати тіло відповіді. Кожна частина відповідає
+    одному пакету серверного курсора crud.stream_contact_rows.
+
+    :param user_id: ID користувача
+    :param fmt: Формат файлу: "csv", "ndjson" або "vcf"
+    :return: Асинхронний генератор байтів
+    """
+    write = WRITERS[fmt]
+    header = True
+    async with AsyncSessionLocal() as db:
+        async for rows in crud.stream_contact_rows(db, user_id, SELECTED):
+            yield write(rows, header).encode()
+            header = False
+    if header and fmt == "csv":
+        # Порожній записник: лише рядок заголовків
+        yield write([], header).encode()
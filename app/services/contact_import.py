@@ -0,0 +1,146 @@
+import asyncio
+import csv
+import io
+import json
+
+from fastapi import UploadFile
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from app import crud
+from app.schemas import ContactCreate
+from app.services import birthday_cache
+
+# Рядків у одному пакеті: один запит на перевірку email і один INSERT на пакет
+IMPORT_BATCH_SIZE = 1000
+# Звіт містить не більше стільки помилок; лічильник failed рахує всі
+MAX_REPORTED_ERRORS = 1000
+
+REQUIRED_COLUMNS = {name for name, field in ContactCreate.model_fields.items() if field.is_required()}
+DUPLICATE_EMAIL = "Contact with this email already exists."
+
+
+class ImportFormatError(ValueError):
+    """Файл неможливо прочитати у вказаному форматі."""
+
+
+def detect_format(filename: str = None, content_type: str = None) -> str:
+    """
+    Визначає формат файлу імпорту за розширенням або типом вмісту (за замовчуванням CSV).
+
+    :param filename: Ім'я завантаженого файлу
+    :param content_type: MIME-тип завантаженого файлу
+    :return: "csv" або "ndjson"
+    """
+    filename = (filename or "").lower()
+    if filename.endswith((".ndjson", ".jsonl")) or "ndjson" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def _csv_records(text):
+    reader = csv.DictReader(text)
+    missing = REQUIRED_COLUMNS - set(reader.fieldnames or ())
+    if missing:
+        raise ImportFormatError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+    for record in reader:
+        # Порожня клітинка в CSV означає відсутнє значення
+        yield reader.line_num, {key: value for key, value in record.items() if key and value not in ("", None)}
+
+
+def _ndjson_records(text):
+    for line_num, line in enumerate(text, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield line_num, f"Invalid JSON: {error.msg}"
+            continue
+        yield line_num, record if isinstance(record, dict) else "Expected a JSON object"
+
+
+def _validation_detail(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, item['loc'])) or 'row'}: {item['msg']}" for item in error.errors())
+
+
+def _read_batch(records, size: int) -> list:
+    """
+    Читає і валідує наступні size записів (виконується в пулі потоків).
+
+    :return: Список кортежів (номер рядка, ContactCreate або None, email з файлу, текст помилки)
+    """
+    batch = []
+    for line_num, record in records:
+        if isinstance(record, str):
+            batch.append((line_num, None, None, record))
+        else:
+            email = record.get("email") if isinstance(record.get("email"), str) else None
+            try:
+                batch.append((line_num, ContactCreate.model_validate(record), email, None))
+            except ValidationError as error:
+                batch.append((line_num, None, email, _validation_detail(error)))
+        if len(batch) >= size:
+            break
+    return batch
+
+
+async def import_contacts(db: AsyncSession, upload: UploadFile, fmt: str, user_id: int) -> dict:
+    """
+    Потоково імпортує контакти з CSV або NDJSON файлу.
+
+    Файл читається пакетами по IMPORT_BATCH_SIZE рядків, тож у пам'яті одночасно
+    не більше двох пакетів: наступний валідується за ContactCreate у пулі потоків,
+    поки поточний додається через crud.insert_new_contacts. Увесь імпорт
+    фіксується однією транзакцією.
+
+    :param db: Асинхронна сесія бази даних
+    :param upload: Завантажений файл
+    :param fmt: Формат файлу: "csv" або "ndjson"
+    :param user_id: ID користувача
+    :return: Звіт імпорту у форматі ContactImportReport
+    :raises ImportFormatError: Якщо файл не в UTF-8 або в CSV бракує обов'язкових стовпців
+    """
+    text = io.TextIOWrapper(upload.file, encoding="utf-8-sig", newline="")
+    imported, failed, errors = 0, 0, []
+
+    def fail(line_num, email, detail):
+        nonlocal failed
+        failed += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line_num, "email": email, "detail": detail})
+
+    pending = None
+    try:
+        records = _csv_records(text) if fmt == "csv" else _ndjson_records(text)
+        pending = asyncio.ensure_future(run_in_threadpool(_read_batch, records, IMPORT_BATCH_SIZE))
+        while batch := await pending:
+            # Наступний пакет читається і валідується, поки база вставляє поточний
+            pending = asyncio.ensure_future(run_in_threadpool(_read_batch, records, IMPORT_BATCH_SIZE))
+            contacts = [contact for _, contact, _, _ in batch if contact is not None]
+            created = set(await crud.insert_new_contacts(db, contacts, user_id)) if contacts else set()
+            imported += len(created)
+            for line_num, contact, email, detail in batch:
+                if contact is None:
+                    fail(line_num, email, detail)
+                elif contact.email in created:
+                    # Повтор email нижче у файлі вже не новий
+                    created.discard(contact.email)
+                else:
+                    fail(line_num, contact.email, DUPLICATE_EMAIL)
+    except UnicodeDecodeError:
+        raise ImportFormatError("File must be UTF-8 encoded")
+    finally:
+        if pending is not None:
+            # Потік читання не скасувати: чекаємо його, перш ніж відпустити файл
+            await asyncio.wait([pending])
+            if not pending.cancelled():
+                pending.exception()
+        # Файл закриває UploadFile, а не обгортка
+        text.detach()
+
+    await db.commit()
+    if imported:
+        await birthday_cache.invalidate(user_id)
+    return {"imported": imported, "failed": failed, "errors": errors}
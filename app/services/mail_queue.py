@@ -0,0 +1,70 @@
+import json
+import logging
+import os
+import uuid
+
+from fastapi import HTTPException, status
+from redis.exceptions import RedisError
+
+from app.core import redis
+
+logger = logging.getLogger(__name__)
+
+# Черга листів у Redis: застосунок додає лист у кінець списку, а воркер
+# (python -m app.services.mail_worker) забирає їх пачками й надсилає через SMTP
+QUEUE_KEY = "mail:queue"
+# Відкладені повторні спроби: ZSET лист → час наступної спроби (unix-секунди)
+RETRY_KEY = "mail:retry"
+# Листи, які не вдалося надіслати за MAIL_MAX_ATTEMPTS спроб
+DEAD_KEY = "mail:dead"
+DEDUPE_PREFIX = "mail:dedupe"
+# Скільки секунд повторні запити скидання пароля не породжують нових листів
+RESET_DEDUPE_TTL = int(os.getenv("MAIL_RESET_DEDUPE_TTL", 300))
+# Через скільки секунд клієнту варто повторити запит, якщо лист не вдалося поставити в чергу
+RETRY_AFTER = int(os.getenv("MAIL_QUEUE_RETRY_AFTER", 5))
+
+# Додає лист, лише якщо ключ дедуплікації ще не встановлено; обидві дії атомарні
+ENQUEUE_ONCE_SCRIPT = """
+if redis.call('SET', KEYS[2], 1, 'NX', 'EX', ARGV[2]) then
+    return redis.call('RPUSH', KEYS[1], ARGV[1])
+end
+return 0
+"""
+enqueue_once = redis.script(ENQUEUE_ONCE_SCRIPT)
+
+
+def dedupe_key(kind: str, recipient: str) -> str:
+    """Ключ Redis, що блокує повторні листи одного виду одному адресату."""
+    return f"{DEDUPE_PREFIX}:{kind}:{recipient}"
+
+
+async def enqueue(recipient: str, subject: str, body: str, dedupe: str = None,
+                  dedupe_ttl: int = RESET_DEDUPE_TTL) -> bool:
+    """
+    Ставить лист у чергу надсилання однією командою Redis.
+
+    :param recipient: Адреса отримувача
+    :param subject: Тема листа
+    :param body: Текст листа
+    :param dedupe: Вид листа для дедуплікації (наприклад, "reset"); None — без дедуплікації
+    :param dedupe_ttl: Скільки секунд ігнорувати повторні листи того ж виду
+    :return: True, якщо лист додано; False для дубліката
+    :raises HTTPException: 503, якщо Redis недоступний і лист не потрапив у чергу
+    """
+    payload = json.dumps({"id": uuid.uuid4().hex, "to": recipient, "subject": subject, "body": body,
+                          "attempts": 0})
+    # Не через redis.execute: запобіжник і поглинання помилок годяться для кешу, а
+    # загублений лист ніхто не помітить. Клієнт сам повторює команду при обриві з'єднання
+    client = redis.get_async_redis()
+    try:
+        if dedupe is None:
+            queued = await client.rpush(QUEUE_KEY, payload)
+        else:
+            queued = await enqueue_once(keys=[QUEUE_KEY, dedupe_key(dedupe, recipient)],
+                                        args=[payload, dedupe_ttl], client=client)
+    except RedisError as exc:
+        logger.error("Mail to %s was not queued: %s", recipient, exc)
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Email could not be queued, try again later",
+                            headers={"Retry-After": str(RETRY_AFTER)}) from exc
+    return queued > 0
@@ -0,0 +1,229 @@
+"""
+Воркер черги листів: забирає листи з Redis пачками й надсилає їх через одне
+постійне SMTP-з'єднання.
+
+    python -m app.services.mail_worker
+
+Лист, узятий у роботу, лежить у списку обробки воркера, доки його не надіслано,
+тож після падіння воркера він повертається в чергу. Невдалі спроби повторюються
+з експоненційною затримкою, після MAIL_MAX_ATTEMPTS лист переходить у mail:dead.
+"""
+import asyncio
+import json
+import logging
+import os
+import socket
+import time
+from email.message import EmailMessage
+from email.utils import formataddr
+
+import aiosmtplib
+from redis import RedisError, asyncio as aioredis
+from redis.asyncio.retry import Retry
+
+from app.core.redis import connection_options
+from app.database import env_flag
+from app.services.mail_queue import DEAD_KEY, QUEUE_KEY, RETRY_KEY
+
+logger = logging.getLogger(__name__)
+
+MAIL_SERVER = os.getenv("EMAIL_HOST", "live.smtp.mailtrap.io")
+MAIL_PORT = int(os.getenv("EMAIL_PORT", "587"))
+MAIL_USERNAME = os.getenv("EMAIL_USER", "api")
+MAIL_PASSWORD = os.getenv("EMAIL_PASSWORD", "eab9f8d8e7ab19d53c529b72c7445fdd")
+MAIL_FROM = os.getenv("EMAIL_FROM", "test@test.com")
+MAIL_FROM_NAME = "Contacts App"
+MAIL_STARTTLS = env_flag("EMAIL_STARTTLS", True)
+MAIL_TIMEOUT = float(os.getenv("EMAIL_TIMEOUT", 30))
+
+# Скільки листів воркер забирає з черги за раз і скільки секунд чекає на новий лист
+MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", 50))
+MAIL_POLL_TIMEOUT = float(os.getenv("MAIL_POLL_TIMEOUT", 5))
+# Повторні спроби: затримка MAIL_BACKOFF_BASE * 2^(спроба-1), не більше MAIL_BACKOFF_CAP секунд
+MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", 5))
+MAIL_BACKOFF_BASE = float(os.getenv("MAIL_BACKOFF_BASE", 2))
+MAIL_BACKOFF_CAP = float(os.getenv("MAIL_BACKOFF_CAP", 300))
+
+# Переносить у чергу листи, час повторної спроби яких настав
+PROMOTE_RETRIES_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, ARGV[2])
+for _, message in ipairs(due) do
+    redis.call('ZREM', KEYS[1], message)
+    redis.call('RPUSH', KEYS[2], message)
+end
+return #due
+"""
+
+
+def retry_delay(attempts: int) -> float:
+    """Затримка перед наступною спробою після attempts невдалих."""
+    return min(MAIL_BACKOFF_CAP, MAIL_BACKOFF_BASE * 2 ** (attempts - 1))
+
+
+def build_message(message: dict) -> EmailMessage:
+    """Створює лист із запису черги."""
+    email = EmailMessage()
+    email["From"] = formataddr((MAIL_FROM_NAME, MAIL_FROM))
+    email["To"] = message["to"]
+    email["Subject"] = message["subject"]
+    email["Message-ID"] = f"<{message['id']}@{MAIL_FROM.partition('@')[2] or 'localhost'}>"
+    email.set_content(message["body"])
+    return email
+
+
+class MailWorker:
+    """
+    Надсилає листи з черги Redis через постійне SMTP-з'єднання.
+
+    Кілька воркерів можуть працювати паралельно: кожен має власний список обробки
+    mail:processing:<worker_id>, і worker_id має бути сталим між перезапусками.
+    """
+
+    def __init__(self, hostname: str = MAIL_SERVER, port: int = MAIL_PORT, username: str = MAIL_USERNAME,
+                 password: str = MAIL_PASSWORD, start_tls: bool = MAIL_STARTTLS, worker_id: str = None):
+        self.smtp = aiosmtplib.SMTP(hostname=hostname, port=port, start_tls=start_tls, timeout=MAIL_TIMEOUT)
+        self.username = username
+        self.password = password
+        self.processing_key = f"mail:processing:{worker_id or socket.gethostname()}"
+        # Власний клієнт без тайм-ауту читання: BLMOVE чекає на лист довше за REDIS_SOCKET_TIMEOUT
+        options = connection_options(Retry) | {"socket_timeout": None, "max_connections": 2}
+        self.redis = aioredis.Redis(connection_pool=aioredis.BlockingConnectionPool(**options))
+        self.promote_retries = self.redis.register_script(PROMOTE_RETRIES_SCRIPT)
+
+    async def connect(self):
+        """Відкриває SMTP-з'єднання, якщо його немає або сервер його закрив."""
+        if self.smtp.is_connected:
+            return
+        await self.smtp.connect()
+        if self.username:
+            await self.smtp.login(self.username, self.password)
+
+    async def close(self):
+        if self.smtp.is_connected:
+            try:
+                await self.smtp.quit()
+            except aiosmtplib.SMTPException:
+                self.smtp.close()
+
+    async def send(self, email: EmailMessage):
+        """
+        Надсилає один лист; якщо сервер закрив простоєне з'єднання, відкриває його знову.
+
+        :raises SMTPException: Якщо лист не прийнято
+        """
+        await self.connect()
+        try:
+            await self.smtp.send_message(email)
+        except aiosmtplib.SMTPServerDisconnected:
+            self.smtp.close()
+            await self.connect()
+            await self.smtp.send_message(email)
+
+    async def recover(self) -> int:
+        """
+        Повертає в початок черги листи, що лишилися в обробці після падіння воркера.
+
+        :return: Кількість повернених листів
+        """
+        recovered = 0
+        while await self.redis.lmove(self.processing_key, QUEUE_KEY, "RIGHT", "LEFT") is not None:
+            recovered += 1
+        return recovered
+
+    async def promote_due_retries(self) -> int:
+        """
+        Повертає в чергу листи, час повторної спроби яких настав.
+
+        :return: Кількість листів
+        """
+        return await self.promote_retries(keys=[RETRY_KEY, QUEUE_KEY], args=[time.time(), MAIL_BATCH_SIZE])
+
+    async def take_batch(self, timeout: float) -> list:
+        """
+        Забирає до MAIL_BATCH_SIZE листів у список обробки.
+
+        :param timeout: Скільки секунд чекати на перший лист
+        :return: Сирі записи черги (JSON)
+        """
+        first = await self.redis.blmove(QUEUE_KEY, self.processing_key, timeout, "LEFT", "RIGHT")
+        if first is None:
+            return []
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for _ in range(MAIL_BATCH_SIZE - 1):
+                pipe.lmove(QUEUE_KEY, self.processing_key, "LEFT", "RIGHT")
+            rest = await pipe.execute()
+        return [first] + [raw for raw in rest if raw is not None]
+
+    async def process_batch(self, timeout: float = MAIL_POLL_TIMEOUT) -> int:
+        """
+        Надсилає одну пачку листів.
+
+        Надісланий лист видаляється зі списку обробки, невдалий — відкладається
+        для повторної спроби або переходить у mail:dead. Туди ж одразу йде запис,
+        з якого не вдається зібрати лист: інакше він валив би воркер на кожному запуску.
+
+        :param timeout: Скільки секунд чекати на перший лист
+        :return: Кількість надісланих листів
+        """
+        sent = 0
+        for raw in await self.take_batch(timeout):
+            try:
+                message = json.loads(raw)
+                email = build_message(message)
+                if not isinstance(message["attempts"], int):
+                    raise TypeError("attempts must be an integer")
+            except (ValueError, KeyError, TypeError) as exc:
+                await self.bury(raw, exc)
+                continue
+            try:
+                await self.send(email)
+            except (aiosmtplib.SMTPException, OSError) as exc:
+                await self.reschedule(raw, message, exc)
+                continue
+            await self.redis.lrem(self.processing_key, 1, raw)
+            sent += 1
+        return sent
+
+    async def bury(self, raw: str, error: Exception):
+        """Переносить зіпсований запис черги зі списку обробки в mail:dead."""
+        logger.error("Dropping malformed mail entry %r: %s", raw[:200], error)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            pipe.rpush(DEAD_KEY, raw)
+            await pipe.execute()
+
+    async def reschedule(self, raw: str, message: dict, error: Exception):
+        message["attempts"] += 1
+        # Відмова з кодом 5xx постійна: повтор нічого не змінить
+        permanent = isinstance(error, aiosmtplib.SMTPRecipientsRefused) or (
+            isinstance(error, aiosmtplib.SMTPResponseException) and error.code >= 500)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.lrem(self.processing_key, 1, raw)
+            if permanent or message["attempts"] >= MAIL_MAX_ATTEMPTS:
+                logger.error("Giving up on mail %s to %s: %s", message["id"], message["to"], error)
+                pipe.rpush(DEAD_KEY, json.dumps(message))
+            else:
+                logger.warning("Mail %s to %s failed (attempt %s): %s",
+                               message["id"], message["to"], message["attempts"], error)
+                pipe.zadd(RETRY_KEY, {json.dumps(message): time.time() + retry_delay(message["attempts"])})
+            await pipe.execute()
+
+    async def run(self):
+        """Основний цикл воркера; працює, доки завдання не скасують."""
+        await self.recover()
+        try:
+            while True:
+                try:
+                    await self.promote_due_retries()
+                    await self.process_batch()
+                except RedisError:
+                    logger.warning("Mail worker lost its Redis connection", exc_info=True)
+                    await asyncio.sleep(1)
+        finally:
+            await self.close()
+            await self.redis.aclose()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(MailWorker().run())
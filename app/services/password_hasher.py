@@ -0,0 +1,68 @@
+import os
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+from app.core.process_pool import BoundedProcessPool, PoolFull
+
+# Вартість bcrypt (log2 кількості раундів). Хеші з іншою вартістю перераховуються
+# при наступному вході користувача
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", 12))
+# Процеси, що рахують bcrypt, і скільки операцій може чекати на вільний процес;
+# решта запитів одразу отримує 503, а не займає пул потоків застосунку
+PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", os.cpu_count() or 1))
+PASSWORD_QUEUE_SIZE = int(os.getenv("PASSWORD_QUEUE_SIZE", 32))
+# Пріоритет процесів хешування (nice): планувальник ОС віддає процесор спершу
+# обробці звичайних запитів
+PASSWORD_WORKER_NICE = int(os.getenv("PASSWORD_WORKER_NICE", 10))
+# Через скільки секунд радити повторити запит після 503
+RETRY_AFTER = 1
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+pool = BoundedProcessPool(PASSWORD_WORKERS, PASSWORD_QUEUE_SIZE, nice=PASSWORD_WORKER_NICE)
+
+
+def _hash(password: str) -> str:
+    return pwd_context.hash(password)
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple:
+    return pwd_context.verify_and_update(password, hashed_password)
+
+
+async def _submit(function, *args):
+    try:
+        return await pool.submit(function, *args)
+    except PoolFull:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                            detail="Too many concurrent password operations",
+                            headers={"Retry-After": str(RETRY_AFTER)})
+
+
+async def hash_password(password: str) -> str:
+    """
+    Хешує пароль bcrypt в окремому процесі.
+
+    :param password: Пароль у відкритому вигляді
+    :return: Хеш bcrypt з поточною вартістю BCRYPT_ROUNDS
+    :raises HTTPException: 503, якщо черга операцій з паролями заповнена
+    """
+    return await _submit(_hash, password)
+
+
+async def verify_password(password: str, hashed_password: str) -> tuple:
+    """
+    Перевіряє пароль в окремому процесі.
+
+    :param password: Пароль у відкритому вигляді
+    :param hashed_password: Збережений хеш
+    :return: Кортеж (пароль правильний, новий хеш або None, якщо перерахунок не потрібен)
+    :raises HTTPException: 503, якщо черга операцій з паролями заповнена
+    """
+    return await _submit(_verify_and_update, password, hashed_password)
+
+
+def shutdown():
+    """Зупиняє процеси пулу під час завершення застосунку."""
+    pool.shutdown()
@@ -1,16 +1,127 @@
+import math
+import os
+import threading
 import time
-from collections import defaultdict
+from collections import OrderedDict, deque
 
-from fastapi import HTTPException
+from fastapi import Depends, HTTPException, Request, Response
 
-RATE_LIMIT = 5
-WINDOW_SIZE = 60
-request_counter = defaultdict(list)
+from app.core import redis
+from app.dependencies import get_token_user
 
+# Ліміт за замовчуванням: RATE_LIMIT запитів за WINDOW_SIZE секунд на користувача й маршрут
+RATE_LIMIT = int(os.getenv("RATE_LIMIT", 5))
+WINDOW_SIZE = int(os.getenv("RATE_LIMIT_WINDOW", 60))
+# Скільки ключів (користувач + маршрут) тримає локальний лічильник, коли Redis недоступний
+LOCAL_MAX_KEYS = int(os.getenv("RATE_LIMIT_LOCAL_KEYS", 10000))
 
-def limit_requests(user_id: int):
-    current_time = time.time()
-    request_counter[user_id] = [t for t in request_counter[user_id] if current_time - t < WINDOW_SIZE]
-    if len(request_counter[user_id]) >= RATE_LIMIT:
-        raise HTTPException(status_code=429, detail="Rate limit exceeded")
-    request_counter[user_id].append(current_time)
+KEY_PREFIX = "ratelimit"
+
+# GCRA: у Redis зберігається лише теоретичний час наступного запиту (TAT) у мілісекундах.
+# Скрипт виконується атомарно і бере час з TIME сервера, тож усі воркери й репліки
+# рахують один ліміт за одним годинником.
+# Повертає {дозволено, залишок, мс до повного відновлення, мс до наступної спроби}
+GCRA_SCRIPT = """
+local limit = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local interval = period / limit
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) * 1000 + math.floor(tonumber(clock[2]) / 1000)
+local tat = math.max(tonumber(redis.call('GET', KEYS[1]) or now), now)
+local new_tat = tat + interval
+if new_tat - period > now then
+    return {0, 0, math.ceil(tat - now), math.ceil(new_tat - period - now)}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((now + period - new_tat) / interval), math.ceil(new_tat - now), 0}
+"""
+gcra = redis.script(GCRA_SCRIPT)
+
+_local_hits = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def rate_limit_key(route: str, user_id: int) -> str:
+    """Ключ Redis лічильника користувача для маршруту (наприклад, "GET /api/v1/users/me")."""
+    return f"{KEY_PREFIX}:{route}:{user_id}"
+
+
+async def _hit_redis(key: str, limit: int, window: int):
+    result = await redis.execute(lambda client: gcra(keys=[key], args=[limit, window * 1000], client=client))
+    if result is None:
+        return None
+    allowed, remaining, reset_ms, retry_ms = result
+    return bool(allowed), remaining, reset_ms / 1000, retry_ms / 1000
+
+
+def _hit_local(key: str, limit: int, window: int) -> tuple:
+    """
+    Ковзне вікно в пам'яті процесу: черга часу останніх limit запитів на ключ.
+
+    Черги обмежені limit елементами, а кількість ключів — LOCAL_MAX_KEYS:
+    найдовше не використаний ключ витісняється (LRU).
+    """
+    now = time.monotonic()
+    with _local_lock:
+        hits = _local_hits.get(key)
+        if hits is None or hits.maxlen != limit:
+            hits = _local_hits[key] = deque(maxlen=limit)
+            while len(_local_hits) > LOCAL_MAX_KEYS:
+                _local_hits.popitem(last=False)
+        else:
+            _local_hits.move_to_end(key)
+        while hits and now - hits[0] >= window:
+            hits.popleft()
+        if len(hits) >= limit:
+            retry_after = window - (now - hits[0])
+            return False, 0, retry_after, retry_after
+        hits.append(now)
+        return True, limit - len(hits), window - (now - hits[0]), 0
+
+
+async def hit(key: str, limit: int, window: int) -> tuple:
+    """
+    Зараховує запит до ліміту limit запитів за window секунд.
+
+    Рахує атомарно в Redis; якщо Redis недоступний, лічильник тимчасово
+    ведеться в пам'яті процесу.
+
+    :param key: Ключ лічильника (див. rate_limit_key)
+    :param limit: Дозволена кількість запитів у вікні
+    :param window: Розмір вікна в секундах
+    :return: Кортеж (дозволено, залишок, секунд до повного відновлення, секунд до наступної спроби)
+    """
+    result = await _hit_redis(key, limit, window)
+    return result if result is not None else _hit_local(key, limit, window)
+
+
+def rate_limit(limit: int = RATE_LIMIT, window: int = WINDOW_SIZE):
+    """
+    Створює залежність FastAPI, що обмежує кількість запитів користувача до маршруту.
+
+    Ліміт рахується окремо для кожного маршруту й автентифікованого користувача.
+    Відповідь отримує заголовки X-RateLimit-Limit, X-RateLimit-Remaining та
+    X-RateLimit-Reset; перевищення ліміту повертає 429 з Retry-After.
+
+    :param limit: Дозволена кількість запитів у вікні
+    :param window: Розмір вікна в секундах
+    :return: Залежність для Depends
+    """
+    async def limit_requests(request: Request, response: Response, current_user=Depends(get_token_user)):
+        route = f"{request.method} {request.scope['route'].path}"
+        allowed, remaining, reset, retry_after = await hit(rate_limit_key(route, current_user.id), limit, window)
+        headers = {
+            "X-RateLimit-Limit": str(limit),
+            "X-RateLimit-Remaining": str(remaining),
+            "X-RateLimit-Reset": str(math.ceil(reset)),
+        }
+        if not allowed:
+            raise HTTPException(status_code=429, detail="Rate limit exceeded",
+                                headers={**headers, "Retry-After": str(math.ceil(retry_after))})
+        response.headers.update(headers)
+
+    return limit_requests
+
+
+# Ліміт за замовчуванням для маршрутів без власних налаштувань
+limit_requests = rate_limit()
@@ -0,0 +1,61 @@
+import asyncio
+import logging
+from datetime import date, datetime, time, timedelta
+
+from app import crud
+from app.database import AsyncSessionLocal
+from app.services import avatar_pipeline, birthday_cache
+
+logger = logging.getLogger(__name__)
+
+
+def seconds_until_midnight(now: datetime = None) -> float:
+    """Кількість секунд до наступної локальної опівночі."""
+    now = now or datetime.now()
+    return (datetime.combine(now.date() + timedelta(days=1), time.min) - now).total_seconds()
+
+
+async def refresh_cached_birthdays(today: date = None) -> int:
+    """
+    Будує списки найближчих днів народження на новий день.
+
+    Перераховуються лише ті користувачі та вікна, які мали кеш учора, тобто
+    ті, хто справді відкривав цей список; решта наповниться при першому читанні.
+
+    :param today: Дата, на яку будуються списки (за замовчуванням сьогодні)
+    :return: Кількість перерахованих списків
+    """
+    today = today or date.today()
+    if not await birthday_cache.acquire_refresh_lock(today):
+        return 0
+    refreshed = 0
+    async with AsyncSessionLocal() as db:
+        for user_id, windows in await birthday_cache.cached_windows(today - timedelta(days=1)):
+            for days in windows:
+                await crud.refresh_upcoming_birthdays(db, user_id, days, today)
+                refreshed += 1
+    return refreshed
+
+
+async def run_daily_birthday_refresh():
+    """Фонове завдання застосунку: щоночі о локальній опівночі оновлює кеш днів народження."""
+    while True:
+        # Секунда запасу, щоб прокинутися вже в новому дні
+        await asyncio.sleep(seconds_until_midnight() + 1)
+        try:
+            refreshed = await refresh_cached_birthdays()
+            logger.info("Refreshed %s upcoming birthday lists", refreshed)
+        except Exception:
+            logger.exception("Daily birthday refresh failed")
+
+
+async def run_avatar_gc():
+    """Фонове завдання застосунку: щогодини видаляє аватари, на які ніхто не посилається."""
+    while True:
+        await asyncio.sleep(avatar_pipeline.AVATAR_GC_INTERVAL)
+        try:
+            deleted = await avatar_pipeline.sweep_released_assets()
+            if deleted:
+                logger.info("Deleted %s unused avatars", deleted)
+        except Exception:
+            logger.exception("Avatar garbage collection failed")
@@ -0,0 +1,57 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from jose import jwt
+
+# Скільки перевірених токенів пам'ятає процес і як довго (секунди); запис ніколи
+# не живе довше за exp самого токена
+MAX_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", 10000))
+TTL = float(os.getenv("TOKEN_CACHE_TTL", 300))
+
+_tokens = OrderedDict()
+_lock = threading.Lock()
+
+
+def token_digest(token: str) -> bytes:
+    """Ключ кешу: SHA-256 токена, щоб не тримати в пам'яті самі токени."""
+    return hashlib.sha256(token.encode()).digest()
+
+
+def decode(token: str, key: str, algorithms: list) -> dict:
+    """
+    Перевіряє JWT і повертає його claims, запам'ятовуючи результат.
+
+    Повторний запит з тим самим токеном обходиться без розбору й перевірки
+    підпису. Запис видаляється, щойно минає exp токена або TTL кешу, після
+    чого токен перевіряється знову (і відхиляється як прострочений).
+    Невалідні токени не кешуються.
+
+    :param token: JWT з заголовка Authorization
+    :param key: Секретний ключ підпису
+    :param algorithms: Дозволені алгоритми підпису
+    :return: Словник claims
+    :raises JWTError: Якщо токен невалідний або прострочений
+    """
+    digest = token_digest(token)
+    now = time.time()
+    with _lock:
+        entry = _tokens.get(digest)
+        if entry is not None:
+            expires_at, claims = entry
+            if expires_at > now:
+                _tokens.move_to_end(digest)
+                return claims
+            del _tokens[digest]
+
+    claims = jwt.decode(token, key, algorithms=algorithms)
+    expires_at = now + TTL
+    if "exp" in claims:
+        expires_at = min(expires_at, claims["exp"])
+    with _lock:
+        _tokens[digest] = (expires_at, claims)
+        while len(_tokens) > MAX_SIZE:
+            _tokens.popitem(last=False)
+    return claims
@@ -0,0 +1,179 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from redis import RedisError
+
+from app.core import redis
+from app.schemas import UserResponse
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "user"
+# Канал, яким процеси повідомляють один одного про зміну користувача
+INVALIDATE_CHANNEL = "user-cache:invalidate"
+
+# Час життя запису в Redis і в пам'яті процесу; локальний TTL обмежує застарілість,
+# якщо повідомлення pub/sub загубилося
+REDIS_TTL = int(os.getenv("USER_CACHE_REDIS_TTL", 3600))
+LOCAL_TTL = float(os.getenv("USER_CACHE_LOCAL_TTL", 30))
+LOCAL_MAX_SIZE = int(os.getenv("USER_CACHE_LOCAL_SIZE", 10000))
+# Як довго пам'ятати, що користувача з таким email немає
+NEGATIVE_TTL = int(os.getenv("USER_CACHE_NEGATIVE_TTL", 30))
+# Лічильник змін користувача: invalidate збільшує його, а store записує користувача,
+# лише якщо лічильник не змінився відтоді, як користувача почали читати з бази
+GENERATION_PREFIX = "user-gen"
+GENERATION_TTL = 24 * 3600
+
+STORE_SCRIPT = """
+if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[2], 'EX', ARGV[3])
+return 1
+"""
+store_if_current = redis.script(STORE_SCRIPT)
+
+_local = OrderedDict()
+_local_lock = threading.Lock()
+# Кількість локальних інвалідацій: запис, прочитаний до будь-якої з них, у пам'ять не потрапляє
+_local_generation = 0
+
+
+class Miss:
+    """
+    Результат lookup, коли користувача немає в жодному рівні кешу.
+
+    Передається в store після читання з бази: запис не відбудеться, якщо
+    користувача тим часом змінили.
+    """
+
+    __slots__ = ("generation", "local_generation")
+
+    def __init__(self, generation, local_generation: int):
+        # None, якщо Redis недоступний
+        self.generation = generation
+        self.local_generation = local_generation
+
+
+def cache_key(email: str) -> str:
+    """Ключ Redis збереженого користувача."""
+    return f"{KEY_PREFIX}:{email}"
+
+
+def generation_key(email: str) -> str:
+    """Ключ Redis лічильника змін користувача."""
+    return f"{GENERATION_PREFIX}:{email}"
+
+
+def _remember(email: str, user, ttl: float, local_generation: int):
+    with _local_lock:
+        if local_generation != _local_generation:
+            return
+        _local[email] = (time.monotonic() + ttl, user)
+        _local.move_to_end(email)
+        while len(_local) > LOCAL_MAX_SIZE:
+            _local.popitem(last=False)
+
+
+def _forget(email: str):
+    global _local_generation
+    with _local_lock:
+        _local_generation += 1
+        _local.pop(email, None)
+
+
+async def lookup(email: str):
+    """
+    Шукає користувача спершу в пам'яті процесу, потім у Redis.
+
+    Знайдений у Redis запис копіюється в пам'ять процесу, тож повторні запити
+    того ж користувача обходяться без мережі й розбору JSON.
+
+    :param email: Email користувача (sub токена)
+    :return: UserResponse, None для відомо відсутнього користувача або Miss
+    """
+    with _local_lock:
+        entry = _local.get(email)
+        if entry is not None:
+            expires_at, user = entry
+            if expires_at > time.monotonic():
+                _local.move_to_end(email)
+                return user
+            del _local[email]
+        local_generation = _local_generation
+    # Лічильник змін читається тим самим зверненням: він знадобиться store при промаху
+    result = await redis.execute(lambda client: client.mget(cache_key(email), generation_key(email)))
+    if result is None:
+        return Miss(None, local_generation)
+    cached, generation = result
+    if cached is None:
+        return Miss(generation or "0", local_generation)
+    user = UserResponse.model_validate_json(cached) if cached != "null" else None
+    _remember(email, user, LOCAL_TTL if user is not None else NEGATIVE_TTL, local_generation)
+    return user
+
+
+async def store(email: str, user, miss: Miss) -> bool:
+    """
+    Зберігає користувача (або факт його відсутності) в обох рівнях кешу, якщо
+    його не змінили, поки він читався з бази.
+
+    Інакше знімок, прочитаний до verify_email чи зміни аватара й записаний
+    після invalidate, віддавався б до кінця TTL.
+
+    :param email: Email користувача
+    :param user: UserResponse або None, якщо користувача з таким email немає
+    :param miss: Результат lookup, отриманий до запиту в базу
+    :return: True, якщо користувача збережено
+    """
+    local_ttl = LOCAL_TTL if user is not None else NEGATIVE_TTL
+    if miss.generation is None:
+        # Redis недоступний: лише пам'ять процесу, застарілість обмежує локальний TTL
+        _remember(email, user, local_ttl, miss.local_generation)
+        return True
+    value, ttl = ("null", NEGATIVE_TTL) if user is None else (user.model_dump_json(), REDIS_TTL)
+    stored = await redis.execute(lambda client: store_if_current(
+        keys=[cache_key(email), generation_key(email)], args=[miss.generation, value, ttl], client=client))
+    if stored:
+        _remember(email, user, local_ttl, miss.local_generation)
+    return bool(stored)
+
+
+async def invalidate(email: str):
+    """
+    Видаляє користувача з кешу після зміни його даних і збільшує лічильник змін,
+    щоб знімки, прочитані з бази до зміни, не потрапили в кеш.
+
+    Локальний запис видаляється одразу, а інші процеси дізнаються про зміну
+    з каналу INVALIDATE_CHANNEL (див. listen_for_invalidations).
+
+    :param email: Email користувача
+    """
+    _forget(email)
+    counter = generation_key(email)
+    await redis.pipeline(lambda pipe: pipe.delete(cache_key(email)).incr(counter).expire(counter, GENERATION_TTL)
+                         .publish(INVALIDATE_CHANNEL, email), transaction=True)
+
+
+async def listen_for_invalidations():
+    """
+    Фонове завдання застосунку: видаляє локальні записи за повідомленнями інших процесів.
+
+    Після обриву з'єднання підписка відновлюється; повідомлення, пропущені за цей
+    час, покриває локальний TTL.
+    """
+    while True:
+        try:
+            async with redis.get_async_redis().pubsub(ignore_subscribe_messages=True) as pubsub:
+                await pubsub.subscribe(INVALIDATE_CHANNEL)
+                while True:
+                    message = await pubsub.get_message(timeout=1.0)
+                    if message is not None:
+                        _forget(message["data"])
+        except RedisError:
+            logger.warning("User cache listener lost its Redis connection", exc_info=True)
+            await asyncio.sleep(1)
@@ -0,0 +1,83 @@
+"""
+Накладні витрати автентифікації на запит: перевірка токена плюс пошук користувача.
+
+get_current_user для трьох станів кешу користувача (токен щоразу перевіряється заново):
+
+    cold    — запису немає в жодному рівні кешу, користувач читається з бази
+    miss    — запису немає в пам'яті процесу, але він є в Redis
+    hit     — запис у пам'яті процесу
+
+і ті самі запити з кешем перевірених токенів:
+
+    token   — токен і користувач уже в пам'яті процесу
+    claims  — get_token_user з id та is_verified у токені (JWT_EMBED_USER_CLAIMS)
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_auth_dependency --seconds 3
+"""
+import argparse
+import asyncio
+import time
+
+from app.database import AsyncSessionLocal, async_engine
+from app.dependencies import get_current_user, get_token_claims, get_token_user
+from app.services import auth_service as auth_module, token_cache, user_cache
+from app.services.auth_service import AuthService
+from benchmarks.common import seed_contacts
+
+EMAIL = "bench-auth@example.com"
+
+
+async def run(label: str, authenticate, prepare, seconds: float):
+    calls = 0
+    elapsed = 0.0
+    async with AsyncSessionLocal() as db:
+        while elapsed < seconds:
+            await prepare()
+            started = time.perf_counter()
+            await authenticate(db)
+            elapsed += time.perf_counter() - started
+            calls += 1
+    print(f"{label:<7} {calls / elapsed:12.0f} ops/s  {elapsed / calls * 1e6:9.1f} µs/op")
+
+
+async def main(seconds: float):
+    seed_contacts(EMAIL, 0)
+    auth_service = AuthService()
+    token = auth_service.create_access_token({"sub": EMAIL})
+    auth_module.EMBED_USER_CLAIMS = True
+    async with AsyncSessionLocal() as db:
+        embedded = auth_service.create_login_token(await auth_service.find_user_by_email(EMAIL, db))
+
+    async def current_user(db, token=token):
+        return await get_current_user(await get_token_claims(token), db)
+
+    async def token_user(db):
+        return await get_token_user(await get_token_claims(embedded), db)
+
+    async def forget_token():
+        token_cache._tokens.clear()
+
+    async def forget_user():
+        token_cache._tokens.clear()
+        await user_cache.invalidate(EMAIL)
+
+    async def forget_local_user():
+        token_cache._tokens.clear()
+        user_cache._local.clear()
+
+    async def nothing():
+        pass
+
+    await run("cold", current_user, forget_user, seconds)
+    await run("miss", current_user, forget_local_user, seconds)
+    await run("hit", current_user, forget_token, seconds)
+    await run("token", current_user, nothing, seconds)
+    await run("claims", token_user, nothing, seconds)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds))
@@ -0,0 +1,68 @@
+"""
+Ціна стиснення відповідей: час CPU проти заощаджених байтів.
+
+Стискає типові відповіді застосунку (сторінки списку контактів у JSON і частину
+експорту NDJSON зі згенерованими контактами) gzip та brotli на різних рівнях,
+як це робить CompressionMiddleware. База даних не потрібна:
+
+    python -m benchmarks.bench_compression --repeats 50
+
+Для кожного рівня виводить медіанний час стиснення, розмір і скільки кілобайтів
+заощаджує одна мілісекунда CPU.
+"""
+import argparse
+import statistics
+import time
+
+import orjson
+from faker import Faker
+
+from app.core.compression import Compressor
+
+LEVELS = [("gzip", level) for level in (1, 6, 9)] + [("br", quality) for quality in (1, 4, 6, 9, 11)]
+
+
+def contacts(count: int) -> list:
+    fake = Faker()
+    Faker.seed(42)
+    return [{
+        "first_name": fake.first_name(), "last_name": fake.last_name(), "email": fake.unique.email(),
+        "phone_number": fake.phone_number(), "birthday": fake.date_of_birth().isoformat(),
+        "additional_info": fake.sentence() if index % 3 == 0 else None, "id": index + 1,
+    } for index in range(count)]
+
+
+def payloads(rows: list) -> dict:
+    return {
+        "list page, 10 rows": orjson.dumps(rows[:10]),
+        "list page, 100 rows": orjson.dumps(rows[:100]),
+        "list page, 1000 rows": orjson.dumps(rows[:1000]),
+        "export chunk, 1000 rows": b"".join(orjson.dumps(row) + b"\n" for row in rows[:1000]),
+    }
+
+
+def compress(encoding: str, level: int, data: bytes) -> bytes:
+    compressor = Compressor(encoding, gzip_level=level, brotli_quality=level)
+    return compressor.finish(data)
+
+
+def main(repeats: int):
+    for label, data in payloads(contacts(1000)).items():
+        print(f"{label}: {len(data)} bytes")
+        for encoding, level in LEVELS:
+            timings = []
+            for _ in range(repeats):
+                started = time.process_time()
+                compressed = compress(encoding, level, data)
+                timings.append(time.process_time() - started)
+            cpu_ms = statistics.median(timings) * 1000
+            saved = len(data) - len(compressed)
+            print(f"  {encoding:<4} {level:>2}  {cpu_ms:8.3f} ms CPU  {len(compressed):8} bytes "
+                  f"({len(compressed) / len(data):6.1%})  {saved / 1024 / max(cpu_ms, 1e-3):9.1f} KiB saved per ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+    main(args.repeats)
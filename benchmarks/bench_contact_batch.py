@@ -0,0 +1,92 @@
+"""
+POST /contacts/batch проти поштучних crud.create_contact / update_contact / delete_contact.
+
+Обидва варіанти виконують однаковий набір операцій (40% створень, 40% оновлень,
+20% видалень) над окремими контактами і рахують запити до бази:
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_contact_batch --operations 1000
+"""
+import argparse
+import asyncio
+import time
+import uuid
+
+from sqlalchemy import event, select
+
+from app import crud
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Contact
+from app.schemas import ContactBatchOperation, ContactCreate
+from app.services.contact_batch import apply_batch
+from benchmarks.common import seed_contacts
+
+EMAIL = "bench-batch@example.com"
+
+statements = 0
+
+
+@event.listens_for(async_engine.sync_engine, "before_cursor_execute")
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+def contact(run: str, n: int) -> ContactCreate:
+    return ContactCreate(first_name=f"Batch{n}", last_name="Bench", email=f"batch-{run}-{n}@example.com",
+                         phone_number="+380000000000", birthday="1990-01-01")
+
+
+def build_operations(run: str, creates: int, ids: list) -> list:
+    updates = len(ids) * 2 // 3
+    operations = [ContactBatchOperation(op="create", contact=contact(run, n)) for n in range(creates)]
+    operations += [ContactBatchOperation(op="update", id=contact_id, contact=contact(run, f"u{contact_id}"))
+                   for contact_id in ids[:updates]]
+    operations += [ContactBatchOperation(op="delete", id=contact_id) for contact_id in ids[updates:]]
+    return operations
+
+
+async def run_loop(operations: list, user_id: int):
+    async with AsyncSessionLocal() as db:
+        for operation in operations:
+            if operation.op == "create":
+                await crud.create_contact(db, operation.contact, user_id)
+            elif operation.op == "update":
+                await crud.update_contact(db, operation.id, operation.contact, user_id)
+            else:
+                await crud.delete_contact(db, operation.id, user_id)
+
+
+async def run_batch(operations: list, user_id: int):
+    async with AsyncSessionLocal() as db:
+        await apply_batch(db, operations, user_id)
+
+
+async def main(count: int):
+    global statements
+    user_id = seed_contacts(EMAIL, 0)
+    run = uuid.uuid4().hex[:8]
+    # Контакти для оновлення й видалення: окремі для кожного варіанту
+    per_run = count * 3 // 5
+    async with AsyncSessionLocal() as db:
+        for n in range(per_run * 2):
+            db.add(Contact(**contact(f"{run}-seed", n).model_dump(), user_id=user_id))
+        await db.commit()
+        ids = list(await db.scalars(select(Contact.id).filter(Contact.email.like(f"batch-{run}-seed-%"))
+                                    .order_by(Contact.id)))
+
+    for label, call, chunk, prefix in (("per-item loop", run_loop, ids[:per_run], "loop"),
+                                       ("POST /contacts/batch", run_batch, ids[per_run:], "batch")):
+        operations = build_operations(f"{run}-{prefix}", count - per_run, chunk)
+        statements = 0
+        started = time.perf_counter()
+        await call(operations, user_id)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<22} {len(operations)} ops  {elapsed * 1000:9.1f} ms  {statements:5} statements")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--operations", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.operations))
@@ -0,0 +1,50 @@
+"""
+Синхронізація записника через GET /contacts/changes проти повторного завантаження всіх контактів.
+
+Після редагування одного контакту порівнює повне гортання сторінками по 1000
+з дельта-запитом від останнього sync_token:
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_contact_changes --contacts 100000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import func, select
+
+from app import crud
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Contact
+from app.schemas import ContactUpdate
+from benchmarks.common import measure, seed_contacts
+
+
+async def full_download(db, user_id: int, page: int = 1000) -> list:
+    contacts, after_id = [], 0
+    while batch := await crud.get_contacts(db, 0, page, user_id, after_id=after_id):
+        contacts += batch
+        after_id = batch[-1].id
+    return contacts
+
+
+async def main(contacts: int, repeats: int):
+    user_id = seed_contacts(f"bench-changes-{contacts}@example.com", contacts)
+    async with AsyncSessionLocal() as db:
+        # Позиція клієнта, що вже синхронізував увесь записник
+        since = tuple((await db.execute(
+            select(func.max(Contact.change_seq), func.max(Contact.id)).filter(Contact.user_id == user_id)
+        )).one())
+        contact_id = since[1]
+        await crud.update_contact(db, contact_id, ContactUpdate(additional_info=f"edited {since[0]}"), user_id)
+
+    print(f"{contacts} contacts, 1 edited")
+    await measure("full download (pages of 1000)", lambda db: full_download(db, user_id), repeats)
+    await measure("changes since sync token", lambda db: crud.get_contact_changes(db, user_id, since), repeats)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=100_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.contacts, args.repeats))
@@ -0,0 +1,61 @@
+"""
+Потоковий експорт контактів проти гортання GET /contacts/ сторінками ORM-об'єктів.
+
+Для кожного розміру записника міряє час і пік пам'яті Python (tracemalloc):
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_contact_export --contacts 1000 1000000
+"""
+import argparse
+import asyncio
+import time
+import tracemalloc
+
+from app import crud
+from app.database import AsyncSessionLocal, async_engine
+from app.schemas import ContactResponse
+from app.services.contact_export import export_contacts
+from benchmarks.common import seed_contacts
+
+
+async def stream(user_id: int, fmt: str) -> int:
+    size = 0
+    async for chunk in export_contacts(user_id, fmt):
+        size += len(chunk)
+    return size
+
+
+async def paginate(user_id: int, page: int = 100) -> int:
+    size, after_id = 0, 0
+    async with AsyncSessionLocal() as db:
+        while contacts := await crud.get_contacts(db, 0, page, user_id, after_id=after_id):
+            size += sum(len(ContactResponse.model_validate(contact).model_dump_json()) for contact in contacts)
+            after_id = contacts[-1].id
+            db.expunge_all()
+    return size
+
+
+async def run(label: str, call):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = await call()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  {label:<22} {elapsed:8.2f} s  {size / 1e6:8.1f} MB out  peak {peak / 1e6:6.1f} MB")
+
+
+async def main(sizes):
+    for contacts in sizes:
+        user_id = seed_contacts(f"bench-export-{contacts}@example.com", contacts)
+        print(f"{contacts} contacts")
+        for fmt in ("csv", "ndjson", "vcf"):
+            await run(f"export {fmt}", lambda: stream(user_id, fmt))
+        await run("keyset pages of 100", lambda: paginate(user_id))
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, nargs="+", default=[1_000, 1_000_000])
+    args = parser.parse_args()
+    asyncio.run(main(args.contacts))
@@ -0,0 +1,68 @@
+"""
+Імпорт N контактів з CSV через POST /contacts/import проти N окремих crud.create_contact.
+
+Файл генерується у тимчасовий файл і передається в сервіс імпорту так само, як його
+передає FastAPI; поштучне створення міряється на --sample рядках і екстраполюється:
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_contact_import --rows 100000
+"""
+import argparse
+import asyncio
+import csv
+import io
+import tempfile
+import time
+import uuid
+
+from fastapi import UploadFile
+
+from app import crud
+from app.database import AsyncSessionLocal, async_engine
+from app.schemas import ContactCreate
+from app.services.contact_import import import_contacts
+from benchmarks.common import seed_contacts
+
+EMAIL = "bench-import@example.com"
+
+
+def contact_row(run: str, n: int) -> dict:
+    return {"first_name": f"First{n}", "last_name": f"Last{n}", "email": f"import-{run}-{n}@example.com",
+            "phone_number": "+380000000000", "birthday": f"19{n % 100:02d}-{n % 12 + 1:02d}-{n % 28 + 1:02d}"}
+
+
+async def main(rows: int, sample: int):
+    user_id = seed_contacts(EMAIL, 0)
+    run = uuid.uuid4().hex[:8]
+
+    spooled = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+    text = io.TextIOWrapper(spooled, encoding="utf-8", newline="")
+    writer = csv.DictWriter(text, fieldnames=list(contact_row(run, 0)))
+    writer.writeheader()
+    writer.writerows(contact_row(run, n) for n in range(rows))
+    text.flush()
+    text.detach()
+    spooled.seek(0)
+
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        report = await import_contacts(db, UploadFile(spooled, filename="bench.csv"), "csv", user_id)
+        elapsed = time.perf_counter() - started
+    print(f"import endpoint     {rows:>8} rows  {elapsed:8.2f} s  ({report['imported']} imported, "
+          f"{report['failed']} failed, {rows / elapsed:,.0f} rows/s)")
+
+    async with AsyncSessionLocal() as db:
+        started = time.perf_counter()
+        for n in range(sample):
+            await crud.create_contact(db, ContactCreate(**contact_row(f"{run}-single", n)), user_id)
+        elapsed = time.perf_counter() - started
+    print(f"create_contact loop {sample:>8} rows  {elapsed:8.2f} s  "
+          f"(~{elapsed / sample * rows:.1f} s for {rows} rows)")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--sample", type=int, default=2_000)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.sample))
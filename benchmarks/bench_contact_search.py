@@ -0,0 +1,47 @@
+"""
+Порівняння старого пошуку ILIKE по окремих полях з пошуком q через pg_trgm.
+
+Створює (один раз) користувача з N контактами і вимірює пошук рідкісного фрагмента
+імені в усіх режимах:
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_contact_search --contacts 10000000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app import crud
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Contact
+from benchmarks.common import measure, seed_contacts
+
+EMAIL = "bench-search@example.com"
+
+
+async def main(contacts: int, limit: int, repeats: int):
+    user_id = seed_contacts(EMAIL, contacts)
+    async with AsyncSessionLocal() as db:
+        # Ім'я контакту з середини записника: шукаємо його середину та початок
+        first_name = await db.scalar(select(Contact.first_name).filter(Contact.user_id == user_id)
+                                     .order_by(Contact.id).offset(contacts // 2).limit(1))
+    term = first_name[2:7]
+
+    print(f"user {user_id}: {contacts} contacts, term {term!r}, limit {limit}, median of {repeats}")
+    await measure("legacy first_name ILIKE",
+                  lambda db: crud.search_contacts(db, term, None, None, user_id, limit=limit), repeats)
+    await measure("q contains (trigram)",
+                  lambda db: crud.search_contacts(db, None, None, None, user_id, q=term, limit=limit), repeats)
+    await measure("q prefix (typeahead)",
+                  lambda db: crud.search_contacts(db, None, None, None, user_id, q=first_name[:5],
+                                                  prefix=True, limit=limit), repeats)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=10_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.contacts, args.limit, args.repeats))
@@ -0,0 +1,90 @@
+"""
+Навантажувальний бенчмарк GET /api/v1/contacts/contacts/.
+
+Запускається проти вже піднятого сервера (uvicorn), тому однаково підходить
+для порівняння синхронної та асинхронної версій застосунку:
+
+    uvicorn app.main:app --port 8000 --workers 1
+    python benchmarks/bench_contacts_list.py --base-url http://localhost:8000 --concurrency 200
+
+Виводить кількість запитів за секунду та затримки p50/p99.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+EMAIL = "bench-list@example.com"
+PASSWORD = "bench-password"
+
+
+async def get_token(client: httpx.AsyncClient) -> str:
+    """Реєструє (за потреби) користувача для бенчмарку та повертає JWT."""
+    await client.post("/api/v1/auth/signup", json={"email": EMAIL, "password": PASSWORD})
+    response = await client.post("/api/v1/auth/login", data={"username": EMAIL, "password": PASSWORD})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def seed_contacts(client: httpx.AsyncClient, headers: dict, count: int):
+    """Створює контакти, щоб сторінка списку не була порожньою."""
+    for i in range(count):
+        await client.post("/api/v1/contacts/contacts/", headers=headers, json={
+            "first_name": f"Bench{i}",
+            "last_name": "User",
+            "email": f"bench-list-{i}@example.com",
+            "phone_number": "+380000000000",
+            "birthday": "1990-01-01",
+        })
+
+
+async def worker(client: httpx.AsyncClient, headers: dict, queue: asyncio.Queue, latencies: list, errors: list):
+    while True:
+        try:
+            queue.get_nowait()
+        except asyncio.QueueEmpty:
+            return
+        started = time.perf_counter()
+        try:
+            response = await client.get("/api/v1/contacts/contacts/", headers=headers, params={"limit": 10})
+        except httpx.TransportError as exc:
+            errors.append(type(exc).__name__)
+            continue
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            errors.append(response.status_code)
+
+
+async def main(base_url: str, concurrency: int, requests: int, seed: int):
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        headers = {"Authorization": f"Bearer {await get_token(client)}"}
+        await seed_contacts(client, headers, seed)
+
+        queue = asyncio.Queue()
+        for i in range(requests):
+            queue.put_nowait(i)
+        latencies, errors = [], []
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client, headers, queue, latencies, errors) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"requests:    {requests} (concurrency {concurrency}, errors {len(errors)})")
+    print(f"throughput:  {requests / elapsed:.1f} req/s")
+    print(f"latency p50: {statistics.median(latencies) * 1000:.1f} ms")
+    print(f"latency p99: {p99 * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=10, help="скільки контактів створити перед заміром")
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.concurrency, args.requests, args.seed))
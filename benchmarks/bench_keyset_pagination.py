@@ -0,0 +1,46 @@
+"""
+Порівняння offset- та keyset-пагінації crud.get_contacts на великому адресному записнику.
+
+Створює (один раз) користувача з N контактами через generate_series (лише Postgres)
+і вимірює час отримання першої та глибокої сторінки обома способами:
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_keyset_pagination --contacts 1000000
+"""
+import argparse
+import asyncio
+
+from sqlalchemy import select
+
+from app import crud
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Contact
+from benchmarks.common import measure, seed_contacts
+
+EMAIL = "bench-keyset@example.com"
+
+
+async def main(contacts: int, page: int, limit: int, repeats: int):
+    user_id = seed_contacts(EMAIL, contacts)
+    skip = (page - 1) * limit
+    async with AsyncSessionLocal() as db:
+        # ID останнього контакту сторінки page-1: саме його клієнт отримав би в курсорі
+        after_id = await db.scalar(select(Contact.id).filter(Contact.user_id == user_id)
+                                   .order_by(Contact.id).offset(skip - 1).limit(1))
+
+    print(f"user {user_id}: {contacts} contacts, limit {limit}, median of {repeats}")
+    await measure("offset page 1", lambda db: crud.get_contacts(db, 0, limit, user_id), repeats)
+    await measure(f"offset page {page}", lambda db: crud.get_contacts(db, skip, limit, user_id), repeats)
+    await measure("cursor page 1", lambda db: crud.get_contacts(db, 0, limit, user_id, after_id=0), repeats)
+    await measure(f"cursor page {page}",
+                  lambda db: crud.get_contacts(db, 0, limit, user_id, after_id=after_id), repeats)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--page", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=100)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.contacts, args.page, args.limit, args.repeats))
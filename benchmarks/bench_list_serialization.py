@@ -0,0 +1,82 @@
+"""
+Вартість однієї сторінки списку контактів: запит і кодування в JSON.
+
+Порівнює попередній шлях (ORM-об'єкти → перевірка response_model → jsonable_encoder
+→ стандартний json) з теперішнім (кортежі стовпців → словники → orjson) на сторінці
+з --limit рядків. Створює (один раз) користувача з контактами (лише Postgres):
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_list_serialization --limit 1000
+
+Виводить медіанний час на рядок окремо для запиту й для кодування.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+from sqlalchemy import select
+
+from app import crud
+from app.core.responses import json_response
+from app.database import AsyncSessionLocal, async_engine
+from app.models import Contact
+from app.schemas import ContactResponse
+from benchmarks.common import seed_contacts
+
+EMAIL = "bench-serialization@example.com"
+
+response_model = TypeAdapter(List[ContactResponse])
+
+
+async def orm_page(db, limit: int, user_id: int):
+    return (await db.scalars(select(Contact).filter(Contact.user_id == user_id, crud.NOT_DELETED)
+                             .order_by(Contact.user_id, Contact.id).limit(limit))).all()
+
+
+def encode_orm(contacts) -> bytes:
+    # Те, що FastAPI робив для response_model=List[ContactResponse] з JSONResponse
+    validated = response_model.validate_python(contacts, from_attributes=True)
+    return JSONResponse(jsonable_encoder(response_model.dump_python(validated, mode="json"))).body
+
+
+def encode_rows(rows) -> bytes:
+    return json_response(crud.contact_dicts(rows)).body
+
+
+async def run(label: str, query, encode, repeats: int):
+    query_times, encode_times = [], []
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            rows = await query(db)
+            fetched = time.perf_counter()
+            body = encode(rows)
+            query_times.append(fetched - started)
+            encode_times.append(time.perf_counter() - fetched)
+    count = len(rows)
+    query_us, encode_us = (statistics.median(times) / count * 1e6 for times in (query_times, encode_times))
+    print(f"{label:<8} query {query_us:6.2f} µs/row   encode {encode_us:6.2f} µs/row   "
+          f"total {query_us + encode_us:6.2f} µs/row  ({count} rows, {len(body)} bytes)")
+    return body
+
+
+async def main(contacts: int, limit: int, repeats: int):
+    user_id = seed_contacts(EMAIL, contacts)
+    print(f"user {user_id}: page of {limit} contacts, median of {repeats}")
+    before = await run("before", lambda db: orm_page(db, limit, user_id), encode_orm, repeats)
+    after = await run("after", lambda db: crud.get_contacts(db, 0, limit, user_id), encode_rows, repeats)
+    print("identical bodies:", before == after)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=10_000)
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.contacts, args.limit, args.repeats))
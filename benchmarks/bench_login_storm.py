@@ -0,0 +1,79 @@
+"""
+Затримка GET /api/v1/contacts/contacts/ під час хвилі входів.
+
+Спершу міряє список контактів без іншого навантаження, потім — поки паралельні
+клієнти безперервно викликають /auth/login (кожен вхід рахує bcrypt).
+Запускається проти вже піднятого сервера:
+
+    uvicorn app.main:app --port 8000 --workers 1
+    python -m benchmarks.bench_login_storm --base-url http://localhost:8000 --logins 50
+
+Виводить затримки p50/p99 обох фаз і коди відповідей на вхід (503 — черга хешування заповнена).
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+import httpx
+
+from benchmarks.bench_contacts_list import get_token, seed_contacts
+
+
+async def list_contacts(client: httpx.AsyncClient, headers: dict, seconds: float, latencies: list):
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        started = time.perf_counter()
+        response = await client.get("/api/v1/contacts/contacts/", headers=headers, params={"limit": 10})
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - started)
+
+
+async def login(client: httpx.AsyncClient, stop: asyncio.Event, statuses: Counter):
+    while not stop.is_set():
+        try:
+            response = await client.post("/api/v1/auth/login",
+                                         data={"username": "bench-list@example.com", "password": "bench-password"})
+        except httpx.TransportError as exc:
+            statuses[type(exc).__name__] += 1
+            continue
+        statuses[response.status_code] += 1
+
+
+def report(label: str, latencies: list):
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(f"{label:<14} {len(latencies):6} requests  p50 {statistics.median(latencies) * 1000:7.1f} ms"
+          f"  p99 {p99 * 1000:7.1f} ms")
+
+
+async def main(base_url: str, readers: int, logins: int, seconds: float):
+    limits = httpx.Limits(max_connections=readers + logins)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        headers = {"Authorization": f"Bearer {await get_token(client)}"}
+        await seed_contacts(client, headers, 10)
+
+        quiet = []
+        await asyncio.gather(*(list_contacts(client, headers, seconds, quiet) for _ in range(readers)))
+
+        storm, statuses, stop = [], Counter(), asyncio.Event()
+        login_tasks = [asyncio.create_task(login(client, stop, statuses)) for _ in range(logins)]
+        await asyncio.sleep(1)
+        await asyncio.gather(*(list_contacts(client, headers, seconds, storm) for _ in range(readers)))
+        stop.set()
+        await asyncio.gather(*login_tasks)
+
+    report("quiet", quiet)
+    report("login storm", storm)
+    print("login responses:", dict(statuses))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--readers", type=int, default=10, help="паралельні клієнти списку контактів")
+    parser.add_argument("--logins", type=int, default=50, help="паралельні клієнти, що входять")
+    parser.add_argument("--seconds", type=float, default=10)
+    args = parser.parse_args()
+    asyncio.run(main(args.base_url, args.readers, args.logins, args.seconds))
@@ -0,0 +1,69 @@
+"""
+Пропускна здатність черги листів проти окремого SMTP-з'єднання на кожен лист.
+
+Листи надсилаються на локальний aiosmtpd, тож заміряються накладні витрати
+застосунку й протоколу, а не мережа. Потрібен Redis (REDIS_HOST/REDIS_PORT):
+
+    python -m benchmarks.bench_mail_queue --messages 2000
+"""
+import argparse
+import asyncio
+import socket
+import time
+import uuid
+
+import aiosmtplib
+from aiosmtpd.controller import Controller
+
+from app.core.redis import redis_client
+from app.services import mail_queue
+from app.services.mail_worker import MailWorker, build_message
+
+
+class Sink:
+    async def handle_DATA(self, server, session, envelope):
+        return "250 OK"
+
+
+def report(label: str, messages: int, elapsed: float):
+    print(f"{label:<28} {messages / elapsed:9.0f} msg/s  {elapsed / messages * 1e3:7.2f} ms/msg")
+
+
+async def main(messages: int, port: int):
+    redis_client.delete(mail_queue.QUEUE_KEY, mail_queue.RETRY_KEY)
+
+    started = time.perf_counter()
+    for i in range(messages):
+        await mail_queue.enqueue(f"user{i}@example.com", "Hello", "Body")
+    report("enqueue (request path)", messages, time.perf_counter() - started)
+
+    worker = MailWorker("127.0.0.1", port, username=None, start_tls=False, worker_id=uuid.uuid4().hex)
+    started = time.perf_counter()
+    sent = 0
+    while sent < messages:
+        sent += await worker.process_batch(timeout=1)
+    report("worker, one connection", messages, time.perf_counter() - started)
+    await worker.close()
+    await worker.redis.aclose()
+
+    # Як раніше з FastMail: нове з'єднання на кожен лист
+    started = time.perf_counter()
+    for i in range(messages):
+        message = {"id": uuid.uuid4().hex, "to": f"user{i}@example.com", "subject": "Hello", "body": "Body"}
+        await aiosmtplib.send(build_message(message), hostname="127.0.0.1", port=port, start_tls=False)
+    report("connection per message", messages, time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--messages", type=int, default=2000)
+    args = parser.parse_args()
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    controller = Controller(Sink(), hostname="127.0.0.1", port=port)
+    controller.start()
+    try:
+        asyncio.run(main(args.messages, port))
+    finally:
+        controller.stop()
@@ -0,0 +1,52 @@
+"""
+Швидкість crud.get_upcoming_birthdays на користувачі з великою кількістю контактів.
+
+Порівнює індексований діапазон birthday_ordinal з тим самим фільтром, обчисленим
+на льоту з дати народження (без індексу):
+
+    DATABASE_URL=postgresql+psycopg2://... python -m benchmarks.bench_upcoming_birthdays --contacts 1000000
+"""
+import argparse
+import asyncio
+from datetime import date
+
+from sqlalchemy import extract, select
+
+from app import crud
+from app.database import async_engine
+from app.models import Contact
+from benchmarks.common import measure, seed_contacts
+
+EMAIL = "bench-birthdays@example.com"
+
+
+async def computed_on_the_fly(db, user_id: int, today: date, days: int):
+    """Той самий запит без стовпця birthday_ordinal: місяць і день рахуються для кожного рядка."""
+    ordinal = extract("month", Contact.birthday) * 100 + extract("day", Contact.birthday)
+    start = today.month * 100 + today.day
+    result = await db.scalars(select(Contact).filter(Contact.user_id == user_id,
+                                                     ordinal.between(start, start + days))
+                              .order_by(ordinal, Contact.id))
+    return result.all()
+
+
+async def main(contacts: int, repeats: int):
+    user_id = seed_contacts(EMAIL, contacts)
+    june = date(2025, 6, 10)
+    print(f"user {user_id}: {contacts} contacts, median of {repeats}")
+    await measure("on the fly, 7 days", lambda db: computed_on_the_fly(db, user_id, june, 7), repeats)
+    await measure("ordinal index, 7 days",
+                  lambda db: crud.get_upcoming_birthdays(db, user_id, 7, today=june), repeats)
+    await measure("ordinal index, 30 days",
+                  lambda db: crud.get_upcoming_birthdays(db, user_id, 30, today=june), repeats)
+    await measure("ordinal index, year end",
+                  lambda db: crud.get_upcoming_birthdays(db, user_id, 7, today=date(2025, 12, 28)), repeats)
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--contacts", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.contacts, args.repeats))
@@ -0,0 +1,59 @@
+"""
+Спільні допоміжні функції бенчмарків: наповнення бази (лише PostgreSQL) та заміри.
+"""
+import statistics
+import time
+
+from sqlalchemy import func, select, text
+
+from app.database import AsyncSessionLocal, SessionLocal, engine
+from app.models import Base, Contact, User
+
+
+def seed_contacts(email: str, contacts: int) -> int:
+    """
+    Створює користувача з N контактами через generate_series, якщо їх ще немає.
+
+    Імена містять фрагменти md5, щоб текст контактів був різноманітним, як у реальних записниках.
+
+    :param email: Email користувача бенчмарку
+    :param contacts: Потрібна кількість контактів
+    :return: ID користувача
+    """
+    Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        user = db.scalar(select(User).filter(User.email == email))
+        if user is None:
+            user = User(email=email, password="-", is_verified=True)
+            db.add(user)
+            db.commit()
+        existing = db.scalar(select(func.count()).select_from(Contact).filter(Contact.user_id == user.id))
+        if existing < contacts:
+            db.execute(text("""
+                INSERT INTO contacts (first_name, last_name, email, phone_number, birthday, user_id)
+                SELECT initcap(substr(md5(g::text), 1, 8)), initcap(substr(md5(g::text), 9, 8)),
+                       'bench-' || :user_id || '-' || g || '@example.com', '+380000000000',
+                       DATE '1940-01-01' + (g::bigint * 7919 % 25000)::int, :user_id
+                FROM generate_series(:start, :stop) AS g
+            """), {"user_id": user.id, "start": existing + 1, "stop": contacts})
+            db.commit()
+            db.execute(text("ANALYZE contacts"))
+            db.commit()
+        return user.id
+
+
+async def measure(label: str, call, repeats: int):
+    """
+    Виконує call(db) repeats разів у нових сесіях і друкує медіанний час.
+
+    :param label: Підпис рядка результату
+    :param call: Корутинна функція, що приймає AsyncSession і повертає рядки
+    :param repeats: Кількість повторів
+    """
+    timings = []
+    for _ in range(repeats):
+        async with AsyncSessionLocal() as db:
+            started = time.perf_counter()
+            rows = await call(db)
+            timings.append(time.perf_counter() - started)
+    print(f"{label:<32} {statistics.median(timings) * 1000:9.2f} ms  ({len(rows)} rows)")
@@ -0,0 +1,49 @@
+import os
+import tempfile
+
+import pytest
+from faker import Faker
+
+# TestClient виконує кожен запит у власному event loop, тому з'єднання
+# асинхронного рушія не повинні переживати запит (див. app/database.py).
+os.environ.setdefault("DB_NULL_POOL", "true")
+# Мінімальна вартість bcrypt: тести перевіряють логіку, а не стійкість хешів.
+# Змінна успадковується процесами пулу хешування (див. app/services/password_hasher.py)
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+# Аватари зберігаються у тимчасовому каталозі замість Cloudinary
+os.environ.setdefault("AVATAR_STORAGE", "local")
+os.environ.setdefault("AVATAR_LOCAL_DIR", tempfile.mkdtemp(prefix="avatars-"))
+# Завантаження, що чекають на обробку, теж у тимчасовому каталозі, щоб тести бачили їх видалення
+os.environ.setdefault("AVATAR_UPLOAD_DIR", tempfile.mkdtemp(prefix="uploads-"))
+
+PASSWORD = "12345678"
+
+fake = Faker()
+
+
+@pytest.fixture
+def register_user():
+    """
+    Фабрика користувачів: реєструє нового користувача й входить під ним.
+
+    :return: Функція (email=None) -> заголовки Authorization з токеном користувача
+    """
+    # Застосунок імпортується лише тут: модульні тести не повинні підключатися до бази
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    client = TestClient(app)
+
+    def register(email: str = None) -> dict:
+        email = email or fake.unique.email()
+        client.post("/api/v1/auth/signup", json={"email": email, "password": PASSWORD})
+        response = client.post("/api/v1/auth/login", data={"username": email, "password": PASSWORD})
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+    return register
+
+
+@pytest.fixture
+def auth_headers(register_user) -> dict:
+    """Заголовки авторизації щойно зареєстрованого користувача."""
+    return register_user()
@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+from faker import Faker
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.database import ASYNC_DATABASE_URL, DB_POOL_SIZE, DB_MAX_OVERFLOW, get_db
+from app.main import app
+from app.models import User
+from app.services import password_hasher
+
+fake = Faker()
+
+PARALLEL_LOGINS = 500
+
+
+async def run_parallel_logins(email: str, password: str):
+    # Окремий рушій із робочим пулом, створений у поточному event loop
+    engine = create_async_engine(ASYNC_DATABASE_URL, pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW,
+                                 pool_timeout=60)
+    session_factory = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
+    checked_out = {"now": 0, "peak": 0}
+
+    @event.listens_for(engine.sync_engine, "checkout")
+    def on_checkout(*args):
+        checked_out["now"] += 1
+        checked_out["peak"] = max(checked_out["peak"], checked_out["now"])
+
+    @event.listens_for(engine.sync_engine, "checkin")
+    def on_checkin(*args):
+        checked_out["now"] -= 1
+
+    async def override_get_db():
+        async with session_factory() as db:
+            yield db
+
+    async with session_factory() as db:
+        db.add(User(email=email, password=password_hasher.pwd_context.hash(password), is_verified=True))
+        await db.commit()
+
+    app.dependency_overrides[get_db] = override_get_db
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = await asyncio.gather(*(
+                client.post("/api/v1/auth/login", data={"username": email, "password": password})
+                for _ in range(PARALLEL_LOGINS)
+            ))
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        await engine.dispose()
+    return responses, checked_out
+
+
+def test_parallel_logins_use_request_scoped_sessions(monkeypatch):
+    # Тест вимірює сесії, тож усі входи мають дочекатися черги хешування
+    monkeypatch.setattr(password_hasher.pool, "queue_size", PARALLEL_LOGINS)
+    email = fake.unique.email()
+    password = "stress-pass-123"
+
+    responses, checked_out = asyncio.run(run_parallel_logins(email, password))
+
+    assert [r.status_code for r in responses] == [200] * PARALLEL_LOGINS
+    assert all("access_token" in r.json() for r in responses)
+    # Запити отримували власні з'єднання паралельно, а не чергувались за одною сесією
+    assert checked_out["peak"] > 1
+    assert checked_out["peak"] <= DB_POOL_SIZE + DB_MAX_OVERFLOW
+    assert checked_out["now"] == 0
@@ -1,5 +1,9 @@
 from fastapi.testclient import TestClient
+from passlib.hash import bcrypt
+from app.database import SessionLocal
 from app.main import app
+from app.models import User
+from app.services import password_hasher
 from faker import Faker
 
 fake = Faker()
@@ -38,4 +42,29 @@ def test_login_success():
     })
     assert response.status_code == 200
     token_data = response.json()
-    assert "access_token" in token_data
\ No newline at end of file
+    assert "access_token" in token_data
+
+def test_login_rehashes_password_with_outdated_cost():
+    email = fake.unique.email()
+    rounds = password_hasher.BCRYPT_ROUNDS + 1
+    with SessionLocal() as db:
+        db.add(User(email=email, password=bcrypt.using(rounds=rounds).hash("12345678"), is_verified=True))
+        db.commit()
+
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": "12345678"})
+    assert response.status_code == 200
+    with SessionLocal() as db:
+        hashed = db.query(User.password).filter(User.email == email).scalar()
+    assert hashed.startswith(f"$2b${password_hasher.BCRYPT_ROUNDS:02d}$")
+    assert client.post("/api/v1/auth/login", data={"username": email, "password": "12345678"}).status_code == 200
+
+
+def test_login_fails_fast_when_hashing_queue_is_full(monkeypatch):
+    monkeypatch.setattr(password_hasher.pool, "pending",
+                        password_hasher.PASSWORD_WORKERS + password_hasher.PASSWORD_QUEUE_SIZE)
+    response = client.post("/api/v1/auth/login", data={
+        "username": "contactuser@example.com",
+        "password": "12345678"
+    })
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
@@ -0,0 +1,185 @@
+import asyncio
+import io
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+from PIL import Image
+
+from app.core.redis import redis_client
+from app.database import SessionLocal
+from app.main import app
+from app.models import AvatarAsset, User
+from app.services import avatar_pipeline, avatar_storage, rate_limiter
+
+client = TestClient(app)
+
+fake = Faker()
+
+AVATAR_URL = "/api/v1/users/avatar"
+
+
+@pytest.fixture
+def signup_and_login(register_user):
+    def register() -> dict:
+        email = fake.unique.email()
+        headers = register_user(email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        # ID користувачів повторюються після перестворення тестової бази, а Redis спільний
+        redis_client.delete(rate_limiter.rate_limit_key(f"POST {AVATAR_URL}", user_id))
+        return headers
+
+    return register
+
+
+def jpeg(width: int, height: int, color="navy") -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), color).save(buffer, "JPEG")
+    return buffer.getvalue()
+
+
+def upload(headers, data: bytes, filename="avatar.jpg"):
+    return client.post(AVATAR_URL, headers=headers, files={"file": (filename, data, "image/jpeg")})
+
+
+def test_avatar_is_processed_in_background_and_served_as_webp(signup_and_login):
+    headers = signup_and_login()
+    # Унікальне зображення: інакше повторний запуск на тій самій базі взяв би наявний запис
+    response = upload(headers, jpeg(1600, 900, fake.color()))
+    assert response.status_code == 202
+    job = response.json()
+    assert job["status"] == "pending"
+
+    # TestClient виконує фонові завдання до повернення відповіді
+    job = client.get(f"{AVATAR_URL}/jobs/{job['id']}", headers=headers).json()
+    assert job["status"] == "done"
+    assert sorted(job["thumbnails"]) == ["128", "64"]
+    assert client.get("/api/v1/users/me", headers=headers).json()["avatar_url"] == job["avatar_url"]
+
+    avatar = client.get(job["avatar_url"])
+    assert avatar.headers["content-type"] == "image/webp"
+    with Image.open(io.BytesIO(avatar.content)) as image:
+        assert image.size == (512, 288)
+    with Image.open(io.BytesIO(client.get(job["thumbnails"]["64"]).content)) as image:
+        assert image.size == (64, 36)
+    # Тимчасова копія завантаження видаляється після обробки
+    assert list(Path(avatar_pipeline.AVATAR_UPLOAD_DIR).iterdir()) == []
+
+
+def test_invalid_image_fails_the_job(signup_and_login):
+    headers = signup_and_login()
+    job = upload(headers, b"definitely not an image", "avatar.txt").json()
+    job = client.get(f"{AVATAR_URL}/jobs/{job['id']}", headers=headers).json()
+    assert job["status"] == "failed"
+    assert job["error"].startswith("Invalid image")
+    assert client.get("/api/v1/users/me", headers=headers).json()["avatar_url"] is None
+
+
+def test_oversized_upload_is_rejected(monkeypatch, signup_and_login):
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_MAX_BYTES", 1024)
+    headers = signup_and_login()
+    response = upload(headers, jpeg(1600, 900))
+    assert response.status_code == 413
+
+
+def test_request_over_body_limit_is_rejected_before_form_parsing(signup_and_login):
+    response = upload(signup_and_login(), b"\0" * (avatar_pipeline.AVATAR_MAX_REQUEST_BYTES + 1))
+    assert response.status_code == 413
+    assert response.json()["detail"].startswith("Request body must not exceed")
+
+
+def test_jobs_are_visible_only_to_their_owner(signup_and_login):
+    headers = signup_and_login()
+    job = upload(headers, jpeg(100, 100)).json()
+    assert client.get(f"{AVATAR_URL}/jobs/{job['id']}", headers=signup_and_login()).status_code == 404
+
+
+def test_upload_is_refused_while_processing_queue_is_full(monkeypatch, signup_and_login):
+    monkeypatch.setattr(avatar_pipeline.pool, "pending",
+                        avatar_pipeline.AVATAR_WORKERS + avatar_pipeline.AVATAR_QUEUE_SIZE)
+    response = upload(signup_and_login(), jpeg(100, 100))
+    assert response.status_code == 503
+
+
+def finished_job(headers, data: bytes) -> dict:
+    job = upload(headers, data).json()
+    return client.get(f"{AVATAR_URL}/jobs/{job['id']}", headers=headers).json()
+
+
+def asset_of(headers) -> AvatarAsset:
+    email = client.get("/api/v1/users/me", headers=headers).json()["email"]
+    with SessionLocal() as db:
+        return db.query(AvatarAsset).join(User, User.avatar_digest == AvatarAsset.digest) \
+            .filter(User.email == email).one()
+
+
+def test_same_image_is_rendered_and_stored_once(monkeypatch, signup_and_login):
+    submitted = []
+    submit = avatar_pipeline.pool.submit
+
+    async def counting_submit(function, *args):
+        submitted.append(function)
+        return await submit(function, *args)
+
+    monkeypatch.setattr(avatar_pipeline.pool, "submit", counting_submit)
+    data = jpeg(300, 200, fake.color())
+    first, second = signup_and_login(), signup_and_login()
+
+    first_job = finished_job(first, data)
+    second_job = finished_job(second, data)
+    assert second_job["status"] == "done"
+    assert second_job["avatar_url"] == first_job["avatar_url"]
+    assert second_job["thumbnails"] == first_job["thumbnails"]
+    assert len(submitted) == 1
+    assert asset_of(second).refcount == 2
+
+
+def test_asset_with_missing_files_is_rendered_again(signup_and_login):
+    data = jpeg(300, 200, fake.color())
+    first_job = finished_job(signup_and_login(), data)
+    asset_dir = Path(avatar_storage.AVATAR_LOCAL_DIR)
+    for url in (first_job["avatar_url"], *first_job["thumbnails"].values()):
+        (asset_dir / url.removeprefix(avatar_storage.AVATAR_LOCAL_URL + "/")).unlink()
+
+    second_job = finished_job(signup_and_login(), data)
+    assert second_job["avatar_url"] == first_job["avatar_url"]
+    assert client.get(second_job["avatar_url"]).status_code == 200
+    assert client.get(second_job["thumbnails"]["64"]).status_code == 200
+
+
+def test_replaced_avatar_is_deleted_after_grace_period(signup_and_login):
+    headers = signup_and_login()
+    old_job = finished_job(headers, jpeg(300, 200, fake.color()))
+    old = asset_of(headers)
+    finished_job(headers, jpeg(300, 200, fake.color()))
+
+    with SessionLocal() as db:
+        released = db.get(AvatarAsset, old.digest)
+        assert released.refcount == 0
+        assert released.released_at is not None
+    old_path = Path(avatar_storage.AVATAR_LOCAL_DIR) / avatar_pipeline.asset_key(old.digest, avatar_pipeline.AVATAR_SIZE)
+    assert old_path.exists()
+
+    # Протягом AVATAR_GC_GRACE аватар лишається: користувач може повернути його
+    asyncio.run(avatar_pipeline.sweep_released_assets())
+    assert client.get(old_job["avatar_url"]).status_code == 200
+
+    later = datetime.now(timezone.utc) + timedelta(seconds=avatar_pipeline.AVATAR_GC_GRACE + 1)
+    assert asyncio.run(avatar_pipeline.sweep_released_assets(later)) >= 1
+    with SessionLocal() as db:
+        assert db.get(AvatarAsset, old.digest) is None
+    assert not old_path.exists()
+    assert asset_of(headers).refcount == 1
+
+
+def test_served_avatars_are_cached_as_immutable(signup_and_login):
+    job = finished_job(signup_and_login(), jpeg(300, 200, fake.color()))
+    avatar = client.get(job["avatar_url"])
+    assert avatar.headers["cache-control"] == "public, max-age=31536000, immutable"
+    assert avatar.headers["etag"] == f'"{Path(job["avatar_url"]).stem}"'
+
+    revalidated = client.get(job["avatar_url"], headers={"If-None-Match": avatar.headers["etag"]})
+    assert revalidated.status_code == 304
@@ -0,0 +1,133 @@
+import asyncio
+import json
+from datetime import date, timedelta
+
+import fakeredis
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.core import redis
+from app.core.redis import redis_client
+from app.database import SessionLocal
+from app import crud
+from app.main import app
+from app.models import User
+from app.services import birthday_cache
+from app.services.scheduler import refresh_cached_birthdays, seconds_until_midnight
+
+client = TestClient(app)
+
+fake = Faker()
+
+URL = "/api/v1/contacts/contacts/upcoming-birthdays"
+
+
+@pytest.fixture
+def signup_and_login(register_user):
+    def register() -> tuple:
+        email = fake.unique.email()
+        headers = register_user(email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        # ID користувачів повторюються після перестворення тестової бази, а Redis спільний
+        asyncio.run(birthday_cache.invalidate(user_id))
+        return headers, user_id
+
+    return register
+
+
+def contact_payload(name, birthday):
+    return {"first_name": name, "last_name": "Cache", "email": fake.unique.email(),
+            "phone_number": "+123456789", "birthday": birthday.replace(year=1992).isoformat()}
+
+
+def test_upcoming_birthdays_are_served_from_redis(signup_and_login):
+    headers, user_id = signup_and_login()
+    today = date.today()
+    client.post("/api/v1/contacts/contacts/", json=contact_payload("first", today), headers=headers)
+
+    assert [c["first_name"] for c in client.get(URL, headers=headers).json()] == ["first"]
+    key = birthday_cache.cache_key(user_id, today)
+    assert json.loads(redis_client.hget(key, "7"))[0]["first_name"] == "first"
+    assert 0 < redis_client.ttl(key) <= seconds_until_midnight() + birthday_cache.EXPIRE_GRACE.total_seconds() + 1
+
+    # Повторне читання не звертається до бази: віддається збережений список
+    redis_client.hset(key, "7", json.dumps([]))
+    assert client.get(URL, headers=headers).json() == []
+
+
+def test_contact_changes_invalidate_cache(signup_and_login):
+    headers, user_id = signup_and_login()
+    today = date.today()
+    assert client.get(URL, headers=headers).json() == []
+
+    created = client.post("/api/v1/contacts/contacts/", json=contact_payload("created", today),
+                          headers=headers).json()
+    assert [c["first_name"] for c in client.get(URL, headers=headers).json()] == ["created"]
+
+    client.put(f"/api/v1/contacts/contacts/{created['id']}", headers=headers,
+               json=contact_payload("updated", today + timedelta(days=30)))
+    assert client.get(URL, headers=headers).json() == []
+
+    client.put(f"/api/v1/contacts/contacts/{created['id']}", headers=headers,
+               json=contact_payload("updated", today))
+    assert [c["first_name"] for c in client.get(URL, headers=headers).json()] == ["updated"]
+
+    client.delete(f"/api/v1/contacts/contacts/{created['id']}", headers=headers)
+    assert client.get(URL, headers=headers).json() == []
+
+
+def test_list_read_before_a_concurrent_write_is_not_cached(monkeypatch, signup_and_login):
+    headers, user_id = signup_and_login()
+    client.post("/api/v1/contacts/contacts/", json=contact_payload("stale", date.today()), headers=headers)
+    get_upcoming_birthdays = crud.get_upcoming_birthdays
+
+    async def read_then_concurrent_write(*args):
+        contacts = await get_upcoming_birthdays(*args)
+        # Інший запит змінює контакти, поки цей ще не записав список у кеш
+        await birthday_cache.invalidate(user_id)
+        return contacts
+
+    monkeypatch.setattr(crud, "get_upcoming_birthdays", read_then_concurrent_write)
+    assert [c["first_name"] for c in client.get(URL, headers=headers).json()] == ["stale"]
+    assert redis_client.hget(birthday_cache.cache_key(user_id, date.today()), "7") is None
+
+    monkeypatch.setattr(crud, "get_upcoming_birthdays", get_upcoming_birthdays)
+    client.get(URL, headers=headers)
+    assert redis_client.hget(birthday_cache.cache_key(user_id, date.today()), "7") is not None
+
+
+def test_daily_refresh_rebuilds_yesterdays_windows(signup_and_login):
+    headers, user_id = signup_and_login()
+    day = date.today() + timedelta(days=10)
+    client.post("/api/v1/contacts/contacts/", json=contact_payload("soon", day + timedelta(days=2)),
+                headers=headers)
+    asyncio.run(birthday_cache.store(user_id, 3, [], asyncio.run(birthday_cache.generation(user_id)),
+                                     day - timedelta(days=1)))
+    redis_client.delete(birthday_cache.refresh_lock_key(day))
+
+    assert asyncio.run(refresh_cached_birthdays(day)) >= 1
+    assert [c["first_name"] for c in asyncio.run(birthday_cache.get(user_id, 3, day))] == ["soon"]
+    # Друге оновлення того ж дня (інший воркер) нічого не робить
+    assert asyncio.run(refresh_cached_birthdays(day)) == 0
+    # Блокування не потрапляє до списку кешованих вікон, навіть коли оновлюють минулий день
+    assert all(isinstance(user, int) for user, _ in asyncio.run(birthday_cache.cached_windows(day)))
+
+
+def test_requests_are_served_from_database_while_redis_is_down(monkeypatch, signup_and_login):
+    headers, user_id = signup_and_login()
+    client.post("/api/v1/contacts/contacts/", json=contact_payload("offline", date.today()), headers=headers)
+
+    server = fakeredis.FakeServer()
+    server.connected = False
+    monkeypatch.setattr(redis, "get_async_redis",
+                        lambda: fakeredis.FakeAsyncRedis(server=server, decode_responses=True))
+    monkeypatch.setattr(redis, "breaker", redis.CircuitBreaker(failure_threshold=2, reset_timeout=30))
+
+    for _ in range(3):
+        response = client.get(URL, headers=headers)
+        assert [c["first_name"] for c in response.json()] == ["offline"]
+        assert client.get("/api/v1/users/me", headers=headers).status_code == 200
+    # Після кількох помилок запобіжник відкритий і Redis більше не чекають
+    assert redis.breaker.is_open
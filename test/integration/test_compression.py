@@ -0,0 +1,65 @@
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+CONTACTS_URL = "/api/v1/contacts/contacts/"
+
+
+def add_contacts(headers, count: int):
+    for _ in range(count):
+        client.post(CONTACTS_URL, headers=headers, json={
+            "first_name": fake.first_name(), "last_name": fake.last_name(), "email": fake.unique.email(),
+            "phone_number": fake.phone_number(), "birthday": fake.date_of_birth().isoformat(),
+        })
+
+
+def test_contact_list_is_compressed_for_clients_that_accept_it(auth_headers):
+    add_contacts(auth_headers, 30)
+
+    plain = client.get(CONTACTS_URL, headers={**auth_headers, "Accept-Encoding": "identity"}, params={"limit": 30})
+    assert "content-encoding" not in plain.headers
+    for encoding in ("br", "gzip"):
+        response = client.get(CONTACTS_URL, headers={**auth_headers, "Accept-Encoding": encoding}, params={"limit": 30})
+        assert response.headers["content-encoding"] == encoding
+        # Стиснуте представлення має власний сильний ETag
+        assert response.headers["etag"] == f'{plain.headers["etag"][:-1]}-{encoding}"'
+        assert response.content == plain.content
+        assert int(response.headers["content-length"]) < len(plain.content)
+        revalidated = client.get(CONTACTS_URL, params={"limit": 30}, headers={
+            **auth_headers, "Accept-Encoding": encoding, "If-None-Match": response.headers["etag"]})
+        assert revalidated.status_code == 304
+        assert revalidated.headers["etag"] == response.headers["etag"]
+
+
+def test_if_match_accepts_etag_of_compressed_response(auth_headers):
+    contact = client.post(CONTACTS_URL, headers=auth_headers, json={
+        "first_name": "Zipped", "last_name": "Etag", "email": fake.unique.email(),
+        "phone_number": "+123456789", "birthday": "1990-01-01",
+    })
+    url = f"{CONTACTS_URL}{contact.json()['id']}"
+    gzip_etag = f'{client.get(url, headers=auth_headers).headers["etag"][:-1]}-gzip"'
+
+    headers = {**auth_headers, "If-Match": gzip_etag}
+    assert client.patch(url, headers=headers, json={"last_name": "Once"}).status_code == 200
+    # Та сама версія вже застаріла, з суфіксом чи без
+    assert client.patch(url, headers=headers, json={"last_name": "Twice"}).status_code == 412
+
+
+def test_small_responses_are_sent_as_is(auth_headers):
+    response = client.get("/api/v1/users/me", headers={**auth_headers, "Accept-Encoding": "br, gzip"})
+    assert response.status_code == 200
+    assert "content-encoding" not in response.headers
+
+
+def test_export_stream_is_compressed(auth_headers):
+    add_contacts(auth_headers, 5)
+    plain = client.get(f"{CONTACTS_URL}export", headers={**auth_headers, "Accept-Encoding": "identity"})
+    response = client.get(f"{CONTACTS_URL}export", headers={**auth_headers, "Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == plain.content
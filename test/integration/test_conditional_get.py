@@ -0,0 +1,78 @@
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+COLLECTION = "/api/v1/contacts/contacts/"
+
+
+@pytest.fixture
+def auth_headers(auth_headers):
+    # Перший запит кешує користувача в Redis, далі get_current_user не звертається до бази
+    client.get(COLLECTION, headers=auth_headers)
+    return auth_headers
+
+
+def create_contact(headers, first_name):
+    return client.post(COLLECTION, headers=headers, json={
+        "first_name": first_name, "last_name": "Etag", "email": fake.unique.email(),
+        "phone_number": "+123456789", "birthday": "1990-01-01",
+    }).json()
+
+
+def revalidate(headers, url, etag, **params):
+    return client.get(url, headers={**headers, "If-None-Match": etag}, params=params)
+
+
+def test_single_contact_not_modified_until_changed(auth_headers):
+    url = f"{COLLECTION}{create_contact(auth_headers, 'Single')['id']}"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    cached = revalidate(auth_headers, url, etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["etag"] == etag
+    assert revalidate(auth_headers, url, f'W/{etag}, "other"').status_code == 304
+
+    client.patch(url, headers=auth_headers, json={"first_name": "Changed"})
+    changed = revalidate(auth_headers, url, etag)
+    assert changed.status_code == 200
+    assert changed.json()["first_name"] == "Changed"
+    assert changed.headers["etag"] != etag
+
+
+def test_list_revalidation_uses_one_aggregate_query(auth_headers):
+    contacts = [create_contact(auth_headers, f"List{n}") for n in range(3)]
+    page = client.get(COLLECTION, headers=auth_headers, params={"limit": 2})
+    etag = page.headers["etag"]
+
+    before = REGISTRY.get_sample_value("db_queries_total", {"route": COLLECTION})
+    cached = revalidate(auth_headers, COLLECTION, etag, limit=2)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["x-next-cursor"] == page.headers["x-next-cursor"]
+    assert REGISTRY.get_sample_value("db_queries_total", {"route": COLLECTION}) - before == 1
+
+    # Будь-яка зміна на сторінці дає новий ETag
+    client.patch(f"{COLLECTION}{contacts[0]['id']}", headers=auth_headers, json={"last_name": "Updated"})
+    updated = revalidate(auth_headers, COLLECTION, etag, limit=2)
+    assert updated.status_code == 200
+    assert updated.json()[0]["last_name"] == "Updated"
+
+    etag = updated.headers["etag"]
+    client.delete(f"{COLLECTION}{contacts[1]['id']}", headers=auth_headers)
+    after_delete = revalidate(auth_headers, COLLECTION, etag, limit=2)
+    assert after_delete.status_code == 200
+    assert [contact["id"] for contact in after_delete.json()] == [contacts[0]["id"], contacts[2]["id"]]
+
+    # Зміна поза сторінкою не впливає на її ETag
+    etag = after_delete.headers["etag"]
+    create_contact(auth_headers, "Later")
+    assert revalidate(auth_headers, COLLECTION, etag, limit=2).status_code == 304
+    assert revalidate(auth_headers, COLLECTION, etag, limit=3).status_code == 200
@@ -0,0 +1,81 @@
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+URL = "/api/v1/contacts/contacts/batch"
+
+
+def contact_data(first_name, email=None):
+    return {"first_name": first_name, "last_name": "Batch", "email": email or fake.unique.email(),
+            "phone_number": "+123456789", "birthday": "1990-01-01"}
+
+
+def create_contact(headers, first_name):
+    return client.post("/api/v1/contacts/contacts/", headers=headers, json=contact_data(first_name)).json()
+
+
+def test_batch_applies_operations_and_reports_each_result(auth_headers):
+    kept, renamed, removed = (create_contact(auth_headers, name) for name in ("Kept", "Renamed", "Removed"))
+    new_email = fake.unique.email()
+
+    response = client.post(URL, headers=auth_headers, json=[
+        {"op": "create", "contact": contact_data("New", new_email)},
+        {"op": "create", "contact": contact_data("Clash", renamed["email"])},
+        {"op": "update", "id": renamed["id"], "contact": contact_data("Updated", renamed["email"])},
+        {"op": "update", "id": 999999, "contact": contact_data("Ghost")},
+        {"op": "delete", "id": removed["id"]},
+        {"op": "delete", "id": removed["id"]},
+        # Email видаленого в цьому ж пакеті контакту вже вільний
+        {"op": "update", "id": kept["id"], "contact": contact_data("Kept", removed["email"])},
+        {"op": "update", "id": renamed["id"], "contact": contact_data("Twice")},
+        {"op": "create", "contact": contact_data("Clash", new_email)},
+    ])
+
+    assert response.status_code == 200
+    results = response.json()
+    assert [result["index"] for result in results] == list(range(9))
+    assert [result["status"] for result in results] == [201, 400, 200, 404, 200, 400, 200, 400, 400]
+    assert results[0]["contact"]["email"] == new_email
+    assert results[0]["id"] == results[0]["contact"]["id"]
+    assert results[2]["contact"]["first_name"] == "Updated"
+    assert results[6]["contact"]["email"] == removed["email"]
+
+    contacts = {contact["id"]: contact for contact in
+                client.get("/api/v1/contacts/contacts/", headers=auth_headers).json()}
+    assert set(contacts) == {kept["id"], renamed["id"], results[0]["id"]}
+    assert contacts[renamed["id"]]["first_name"] == "Updated"
+    assert contacts[kept["id"]]["email"] == removed["email"]
+
+
+def test_batch_update_rejects_email_of_another_contact(auth_headers):
+    first, second = create_contact(auth_headers, "First"), create_contact(auth_headers, "Second")
+    results = client.post(URL, headers=auth_headers, json=[
+        {"op": "update", "id": first["id"], "contact": contact_data("First", second["email"])},
+    ]).json()
+    assert results[0]["status"] == 400
+    stored = client.get(f"/api/v1/contacts/contacts/{first['id']}", headers=auth_headers).json()
+    assert stored["email"] == first["email"]
+
+
+def test_batch_cannot_touch_other_users_contacts(register_user):
+    owner, intruder = register_user(), register_user()
+    contact = create_contact(owner, "Private")
+    results = client.post(URL, headers=intruder, json=[
+        {"op": "update", "id": contact["id"], "contact": contact_data("Hacked")},
+        {"op": "delete", "id": contact["id"]},
+    ]).json()
+    assert [result["status"] for result in results] == [404, 400]
+    assert client.get(f"/api/v1/contacts/contacts/{contact['id']}", headers=owner).json()["first_name"] == "Private"
+
+
+def test_batch_validation(auth_headers):
+    missing_id = [{"op": "update", "contact": contact_data("NoId")}]
+    assert client.post(URL, headers=auth_headers, json=missing_id).status_code == 422
+    assert client.post(URL, headers=auth_headers, json=[{"op": "create"}]).status_code == 422
+    assert client.post(URL, headers=auth_headers, json=[{"op": "delete", "id": 1}] * 1001).status_code == 422
+    assert client.post(URL, headers=auth_headers, json=[]).json() == []
@@ -0,0 +1,82 @@
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+URL = "/api/v1/contacts/contacts/"
+CHANGES_URL = "/api/v1/contacts/contacts/changes"
+
+
+def contact_data(**fields):
+    return {"first_name": "Sync", "last_name": "Client", "email": fake.unique.email(),
+            "phone_number": "+380501112233", "birthday": "1990-05-17", **fields}
+
+
+def create_contacts(headers, count):
+    return [client.post(URL, headers=headers, json=contact_data()).json() for _ in range(count)]
+
+
+def sync(headers, since=None, limit=100):
+    params = {"limit": limit} if since is None else {"since": since, "limit": limit}
+    response = client.get(CHANGES_URL, headers=headers, params=params)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_sync_returns_only_changes_since_token(auth_headers):
+    contacts = create_contacts(auth_headers, 5)
+
+    initial = sync(auth_headers)
+    assert [change["id"] for change in initial["changes"]] == [contact["id"] for contact in contacts]
+    assert initial["changes"][0]["contact"] == contacts[0]
+    assert initial["has_more"] is False
+
+    edited = client.patch(f"{URL}{contacts[1]['id']}", headers=auth_headers, json={"first_name": "Edited"}).json()
+    assert client.delete(f"{URL}{contacts[3]['id']}", headers=auth_headers).status_code == 200
+    created = client.post(URL, headers=auth_headers, json=contact_data()).json()
+
+    delta = sync(auth_headers, initial["sync_token"])
+    assert [(change["id"], change["deleted"]) for change in delta["changes"]] == \
+        [(edited["id"], False), (contacts[3]["id"], True), (created["id"], False)]
+    assert delta["changes"][0]["contact"]["first_name"] == "Edited"
+    assert delta["changes"][1]["contact"] is None
+
+    idle = sync(auth_headers, delta["sync_token"])
+    assert idle == {"changes": [], "sync_token": delta["sync_token"], "has_more": False}
+
+
+def test_sync_pages_with_keyset_tokens(auth_headers):
+    contacts = create_contacts(auth_headers, 5)
+
+    seen, token = [], None
+    while True:
+        page = sync(auth_headers, token, limit=2)
+        seen += [change["id"] for change in page["changes"]]
+        token = page["sync_token"]
+        if not page["has_more"]:
+            break
+    assert seen == [contact["id"] for contact in contacts]
+
+
+def test_deleted_contact_is_a_tombstone(auth_headers):
+    contact = create_contacts(auth_headers, 1)[0]
+    assert client.delete(f"{URL}{contact['id']}", headers=auth_headers).status_code == 200
+
+    assert client.get(f"{URL}{contact['id']}", headers=auth_headers).status_code == 404
+    assert client.delete(f"{URL}{contact['id']}", headers=auth_headers).status_code == 404
+    assert client.get(URL, headers=auth_headers).json() == []
+    # Надгробок не займає email
+    assert client.post(URL, headers=auth_headers, json=contact_data(email=contact["email"])).status_code == 201
+    # Перша синхронізація не передає надгробків
+    assert [change["deleted"] for change in sync(auth_headers)["changes"]] == [False]
+
+
+def test_sync_is_per_user_and_rejects_bad_tokens(auth_headers, register_user):
+    other = register_user()
+    create_contacts(other, 2)
+    assert sync(auth_headers)["changes"] == []
+    assert client.get(CHANGES_URL, headers=auth_headers, params={"since": "not-a-token"}).status_code == 400
@@ -0,0 +1,64 @@
+import csv
+import io
+import json
+
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+URL = "/api/v1/contacts/contacts/export"
+
+
+def create_contacts(headers):
+    contacts = [
+        {"first_name": "Ivan", "last_name": "Franko", "email": fake.unique.email(),
+         "phone_number": "+380501112233", "birthday": "1856-08-27", "additional_info": None},
+        {"first_name": "Lesya", "last_name": "Ukrainka, poet", "email": fake.unique.email(),
+         "phone_number": "+380501112244", "birthday": "1871-02-25", "additional_info": "line one\nline; two"},
+    ]
+    for contact in contacts:
+        contact["id"] = client.post("/api/v1/contacts/contacts/", headers=headers, json=contact).json()["id"]
+    return contacts
+
+
+def test_export_csv_and_ndjson_round_trip(auth_headers):
+    contacts = create_contacts(auth_headers)
+
+    response = client.get(URL, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.headers["content-disposition"] == 'attachment; filename="contacts.csv"'
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["email"] for row in rows] == [contact["email"] for contact in contacts]
+    assert rows[1]["last_name"] == "Ukrainka, poet"
+    assert rows[1]["additional_info"] == "line one\nline; two"
+
+    response = client.get(URL, headers=auth_headers, params={"format": "ndjson"})
+    exported = [json.loads(line) for line in response.text.splitlines()]
+    assert exported == [{key: contact[key] for key in exported[0]} for contact in contacts]
+
+
+def test_export_vcard(auth_headers):
+    create_contacts(auth_headers)
+
+    response = client.get(URL, headers=auth_headers, params={"format": "vcf"})
+    assert response.headers["content-type"].startswith("text/vcard")
+    cards = response.text.split("END:VCARD\r\n")[:-1]
+    assert len(cards) == 2
+    assert "N:Franko;Ivan;;;\r\n" in cards[0]
+    assert "BDAY:1856-08-27\r\n" in cards[0]
+    assert "NOTE" not in cards[0]
+    assert "N:Ukrainka\\, poet;Lesya;;;\r\n" in cards[1]
+    assert "NOTE:line one\\nline\\; two\r\n" in cards[1]
+
+
+def test_export_empty_and_unknown_format(auth_headers):
+    assert client.get(URL, headers=auth_headers).text.strip() == \
+        "id,first_name,last_name,email,phone_number,birthday,additional_info"
+    assert client.get(URL, headers=auth_headers, params={"format": "ndjson"}).text == ""
+    assert client.get(URL, headers=auth_headers, params={"format": "xml"}).status_code == 422
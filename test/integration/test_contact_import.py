@@ -0,0 +1,73 @@
+import json
+
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+URL = "/api/v1/contacts/contacts/import"
+
+
+def list_emails(headers):
+    response = client.get("/api/v1/contacts/contacts/", headers=headers, params={"limit": 100})
+    return sorted(contact["email"] for contact in response.json())
+
+
+def test_import_csv_reports_invalid_and_duplicate_rows(auth_headers):
+    existing, first, second = fake.unique.email(), fake.unique.email(), fake.unique.email()
+    client.post("/api/v1/contacts/contacts/", headers=auth_headers, json={
+        "first_name": "Old", "last_name": "Contact", "email": existing,
+        "phone_number": "+123456789", "birthday": "1990-01-01",
+    })
+    csv_file = "\n".join([
+        "first_name,last_name,email,phone_number,birthday,additional_info",
+        f"Ivan,Franko,{first},+380501112233,1856-08-27,",
+        "Lesya,Ukrainka,not-an-email,+380501112233,1871-02-25,poet",
+        f"Taras,Shevchenko,{second},+380501112233,1814-03-09,\"multi\nline\"",
+        f"Copy,Franko,{first},+380501112233,1856-08-27,",
+        f"Old,Contact,{existing},+123456789,1990-01-01,",
+    ])
+    response = client.post(URL, headers=auth_headers, files={"file": ("contacts.csv", csv_file, "text/csv")})
+
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] == 2
+    assert report["failed"] == 3
+    assert [(error["line"], error["email"]) for error in report["errors"]] == [
+        (3, "not-an-email"), (6, first), (7, existing),
+    ]
+    assert report["errors"][0]["detail"].startswith("email:")
+    assert list_emails(auth_headers) == sorted([existing, first, second])
+
+
+def test_import_ndjson(auth_headers):
+    emails = [fake.unique.email() for _ in range(3)]
+    lines = [json.dumps({"first_name": f"Name{i}", "last_name": "Json", "email": email,
+                         "phone_number": "+123456789", "birthday": "2000-05-0" + str(i + 1)})
+             for i, email in enumerate(emails)]
+    lines.insert(1, "{broken")
+    lines.insert(2, "")
+    lines.append(json.dumps({"first_name": "NoEmail"}))
+    response = client.post(URL, headers=auth_headers, files={"file": ("contacts.ndjson", "\n".join(lines))})
+
+    report = response.json()
+    assert report["imported"] == 3
+    assert [error["line"] for error in report["errors"]] == [2, 6]
+    assert report["errors"][0]["detail"].startswith("Invalid JSON")
+    assert list_emails(auth_headers) == sorted(emails)
+
+
+def test_import_rejects_unreadable_files(auth_headers):
+    missing_columns = client.post(URL, headers=auth_headers, files={"file": ("c.csv", "first_name,email\nA,a@b.com")})
+    assert missing_columns.status_code == 400
+    assert "birthday" in missing_columns.json()["detail"]
+
+    not_utf8 = client.post(URL, headers=auth_headers, params={"format": "ndjson"},
+                           files={"file": ("c.txt", "\xff\xfe".encode("latin-1"))})
+    assert not_utf8.status_code == 400
+    assert client.post(URL, headers=auth_headers, params={"format": "xml"},
+                       files={"file": ("c.xml", "<a/>")}).status_code == 422
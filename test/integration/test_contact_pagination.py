@@ -0,0 +1,60 @@
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+
+def get_token(email: str):
+    password = "12345678"
+    client.post("/api/v1/auth/signup", json={"email": email, "password": password})
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    return response.json()["access_token"]
+
+
+def create_contacts(headers, count):
+    ids = []
+    for i in range(count):
+        response = client.post("/api/v1/contacts/contacts/", headers=headers, json={
+            "first_name": f"Page{i}",
+            "last_name": "Doe",
+            "email": fake.unique.email(),
+            "phone_number": "+123456789",
+            "birthday": "1990-01-01",
+        })
+        ids.append(response.json()["id"])
+    return ids
+
+
+def test_cursor_pagination_walks_all_contacts_in_order():
+    headers = {"Authorization": f"Bearer {get_token(fake.unique.email())}"}
+    created_ids = create_contacts(headers, 5)
+
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2} if cursor is None else {"limit": 2, "cursor": cursor}
+        response = client.get("/api/v1/contacts/contacts/", headers=headers, params=params)
+        assert response.status_code == 200
+        seen.extend(contact["id"] for contact in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+
+    assert seen == sorted(created_ids)
+
+
+def test_offset_pages_are_ordered_by_id():
+    headers = {"Authorization": f"Bearer {get_token(fake.unique.email())}"}
+    created_ids = create_contacts(headers, 3)
+
+    response = client.get("/api/v1/contacts/contacts/", headers=headers, params={"skip": 1, "limit": 2})
+    assert [contact["id"] for contact in response.json()] == sorted(created_ids)[1:3]
+
+
+def test_invalid_cursor_is_rejected():
+    headers = {"Authorization": f"Bearer {get_token(fake.unique.email())}"}
+    response = client.get("/api/v1/contacts/contacts/", headers=headers, params={"cursor": "not-a-cursor"})
+    assert response.status_code == 400
@@ -0,0 +1,70 @@
+from faker import Faker
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.database import async_engine
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+COLLECTION = "/api/v1/contacts/contacts/"
+
+
+def create_contact(headers):
+    return client.post(COLLECTION, headers=headers, json={
+        "first_name": "Patch", "last_name": "Me", "email": fake.unique.email(),
+        "phone_number": "+123456789", "birthday": "1990-01-01", "additional_info": "keep",
+    }).json()
+
+
+def test_patch_updates_only_sent_fields(auth_headers):
+    contact = create_contact(auth_headers)
+    url = f"{COLLECTION}{contact['id']}"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+    assert etag == f'"{contact["id"]}-1"'
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        response = client.patch(url, headers=auth_headers, json={"phone_number": "+380000000000"})
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+    assert response.status_code == 200
+    assert response.json() == {**contact, "phone_number": "+380000000000"}
+    assert response.headers["etag"] == f'"{contact["id"]}-2"'
+    # На PostgreSQL запиту передує CTE з номером зміни (UPDATE users)
+    update = next(statement for statement in statements if "UPDATE contacts" in statement)
+    update = update[update.index("UPDATE contacts"):]
+    assert "phone_number=" in update and "first_name=" not in update and "additional_info=" not in update
+
+    cleared = client.patch(url, headers=auth_headers, json={"additional_info": None})
+    assert cleared.json()["additional_info"] is None
+    assert client.patch(url, headers=auth_headers, json={"first_name": None}).status_code == 422
+
+
+def test_if_match_guards_concurrent_updates(auth_headers):
+    contact = create_contact(auth_headers)
+    url = f"{COLLECTION}{contact['id']}"
+    etag = client.get(url, headers=auth_headers).headers["etag"]
+
+    first = client.patch(url, headers={**auth_headers, "If-Match": etag}, json={"first_name": "First"})
+    assert first.status_code == 200
+    # Другий клієнт досі має стару версію
+    stale = client.patch(url, headers={**auth_headers, "If-Match": etag}, json={"first_name": "Second"})
+    assert stale.status_code == 412
+    stale_put = client.put(url, headers={**auth_headers, "If-Match": etag},
+                           json={**contact, "first_name": "Second"})
+    assert stale_put.status_code == 412
+    assert client.get(url, headers=auth_headers).json()["first_name"] == "First"
+
+    fresh = client.patch(url, headers={**auth_headers, "If-Match": first.headers["etag"]}, json={"last_name": "New"})
+    assert fresh.status_code == 200
+    unconditional = client.patch(url, headers={**auth_headers, "If-Match": "*"}, json={})
+    assert unconditional.headers["etag"] == fresh.headers["etag"]
+    assert client.patch(url, headers={**auth_headers, "If-Match": etag}, json={}).status_code == 412
+    assert client.patch(f"{COLLECTION}999999", headers={**auth_headers, "If-Match": etag},
+                        json={"first_name": "Ghost"}).status_code == 404
@@ -1,7 +1,11 @@
+import json
+from datetime import date
+
 from faker import Faker
 from fastapi.testclient import TestClient
 
 from app.main import app
+from app.schemas import ContactResponse
 
 client = TestClient(app)
 
@@ -50,6 +54,31 @@ def test_search_contact():
     results = response.json()
     assert any("John" in contact["first_name"] for contact in results)
 
+def test_list_endpoints_encode_like_response_model():
+    user_email, password = fake.unique.email(), "12345678"
+    client.post("/api/v1/auth/signup", json={"email": user_email, "password": password})
+    token = client.post("/api/v1/auth/login", data={"username": user_email, "password": password}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    contact_email = fake.unique.email()
+    created = client.post("/api/v1/contacts/contacts/", headers=headers, json={
+        "first_name": "Олена", "last_name": "Доу", "email": contact_email, "phone_number": "+123456789",
+        # 1992 високосний, тож дата існує навіть 29 лютого
+        "birthday": date.today().replace(year=1992).isoformat(),
+    }).json()
+    # Саме такі байти давав response_model зі стандартним JSONResponse
+    expected = json.dumps([ContactResponse.model_validate(created).model_dump(mode="json")],
+                          ensure_ascii=False, separators=(",", ":")).encode()
+
+    for url in ("/api/v1/contacts/contacts/", f"/api/v1/contacts/contacts/search?q={contact_email}",
+                "/api/v1/contacts/contacts/upcoming-birthdays", "/api/v1/contacts/contacts/upcoming-birthdays"):
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.content == expected
+
+    schema = app.openapi()["paths"]["/api/v1/contacts/contacts/search"]["get"]["responses"]["200"]
+    assert schema["content"]["application/json"]["schema"]["items"] == {"$ref": "#/components/schemas/ContactResponse"}
+
 def test_update_contact():
     token = get_token()
     contact = client.get(f"/api/v1/contacts/contacts/search?email={email}",
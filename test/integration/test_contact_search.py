@@ -0,0 +1,58 @@
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+
+def create_contact(headers, first_name, last_name, email):
+    response = client.post("/api/v1/contacts/contacts/", headers=headers, json={
+        "first_name": first_name,
+        "last_name": last_name,
+        "email": email,
+        "phone_number": "+123456789",
+        "birthday": "1990-01-01",
+    })
+    return response.json()["id"]
+
+
+def search(headers, **params):
+    response = client.get("/api/v1/contacts/contacts/search", headers=headers, params=params)
+    assert response.status_code == 200
+    return [contact["id"] for contact in response.json()]
+
+
+def test_search_q_matches_any_field_case_insensitively(auth_headers):
+    by_name = create_contact(auth_headers, "Oksana", "Melnyk", fake.unique.email())
+    by_email = create_contact(auth_headers, "Taras", "Bondar", f"oksana.{fake.unique.user_name()}@example.com")
+    create_contact(auth_headers, "Ivan", "Shevchenko", fake.unique.email())
+
+    assert sorted(search(auth_headers, q="OKSANA")) == sorted([by_name, by_email])
+    assert search(auth_headers, q="melnyk") == [by_name]
+
+
+def test_search_prefix_mode_matches_word_starts_only(auth_headers):
+    starts = create_contact(auth_headers, "Andrii", "Koval", fake.unique.email())
+    create_contact(auth_headers, "Mandrii", "Petrenko", fake.unique.email())
+
+    assert search(auth_headers, q="andr", prefix=True) == [starts]
+    assert search(auth_headers, q="kov", prefix=True) == [starts]
+
+
+def test_search_limit_and_wildcards(auth_headers):
+    for i in range(3):
+        create_contact(auth_headers, "Limit", f"Case{i}", fake.unique.email())
+
+    assert len(search(auth_headers, q="limit", limit=2)) == 2
+    # Символи шаблону LIKE у запиті шукаються буквально
+    assert search(auth_headers, q="%") == []
+
+
+def test_search_rejects_blank_q(auth_headers):
+    create_contact(auth_headers, "Blank", "Query", fake.unique.email())
+
+    response = client.get("/api/v1/contacts/contacts/search", headers=auth_headers, params={"q": "   "})
+    assert response.status_code == 422
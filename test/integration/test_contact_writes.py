@@ -0,0 +1,71 @@
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from app.main import app
+
+client = TestClient(app)
+
+fake = Faker()
+
+COLLECTION = "/api/v1/contacts/contacts/"
+ITEM = "/api/v1/contacts/contacts/{contact_id:int}"
+
+
+@pytest.fixture
+def auth_headers(auth_headers):
+    # Перший запит кешує користувача в Redis, далі get_current_user не звертається до бази
+    client.get(COLLECTION, headers=auth_headers)
+    return auth_headers
+
+
+def contact_data(first_name, email):
+    return {"first_name": first_name, "last_name": "Writes", "email": email,
+            "phone_number": "+123456789", "birthday": "1990-01-01"}
+
+
+def queries(route, request):
+    before = REGISTRY.get_sample_value("db_queries_total", {"route": route}) or 0
+    response = request()
+    return response, REGISTRY.get_sample_value("db_queries_total", {"route": route}) - before
+
+
+def test_each_write_is_a_single_statement(auth_headers):
+    email = fake.unique.email()
+
+    created, count = queries(COLLECTION, lambda: client.post(COLLECTION, headers=auth_headers,
+                                                             json=contact_data("One", email)))
+    assert created.status_code == 201
+    assert count == 1
+    url = f"{COLLECTION}{created.json()['id']}"
+
+    updated, count = queries(ITEM, lambda: client.put(url, headers=auth_headers, json=contact_data("Two", email)))
+    assert updated.json()["first_name"] == "Two"
+    assert count == 1
+
+    deleted, count = queries(ITEM, lambda: client.delete(url, headers=auth_headers))
+    assert deleted.status_code == 200
+    assert count == 1
+
+    missing, count = queries(ITEM, lambda: client.put(url, headers=auth_headers, json=contact_data("Three", email)))
+    assert missing.status_code == 404
+    assert count == 1
+
+
+def test_email_is_unique_per_user(auth_headers, register_user):
+    other_user = register_user()
+    email, other_email = fake.unique.email(), fake.unique.email()
+    first = client.post(COLLECTION, headers=auth_headers, json=contact_data("First", email)).json()
+    client.post(COLLECTION, headers=auth_headers, json=contact_data("Second", other_email))
+
+    duplicate, count = queries(COLLECTION, lambda: client.post(COLLECTION, headers=auth_headers,
+                                                               json=contact_data("Copy", email)))
+    assert duplicate.status_code == 400
+    assert count == 1
+    # Інший користувач може мати контакт з тим самим email
+    assert client.post(COLLECTION, headers=other_user, json=contact_data("Theirs", email)).status_code == 201
+
+    clash = client.put(f"{COLLECTION}{first['id']}", headers=auth_headers, json=contact_data("First", other_email))
+    assert clash.status_code == 400
+    assert client.get(f"{COLLECTION}{first['id']}", headers=auth_headers).json()["email"] == email
@@ -0,0 +1,170 @@
+import asyncio
+import json
+import socket
+import time
+import uuid
+
+import fakeredis
+import pytest
+from aiosmtpd.controller import Controller
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app.core import redis
+from app.core.redis import redis_client
+from app.main import app
+from app.services import mail_queue
+from app.services.mail_worker import MailWorker, MAIL_BACKOFF_BASE
+
+client = TestClient(app)
+
+fake = Faker()
+
+
+class Recorder:
+    """SMTP-сервер для тестів: запам'ятовує листи; перші reject_first відхиляє тимчасовою помилкою."""
+
+    def __init__(self, reject_first: int = 0):
+        self.messages = []
+        self.peers = set()
+        self.reject_first = reject_first
+
+    async def handle_DATA(self, server, session, envelope):
+        if self.reject_first:
+            self.reject_first -= 1
+            return "451 4.3.0 Try again later"
+        self.messages.append(envelope)
+        self.peers.add(session.peer)
+        return "250 OK"
+
+
+@pytest.fixture
+def smtp_server(request):
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    handler = Recorder(getattr(request, "param", 0))
+    controller = Controller(handler, hostname="127.0.0.1", port=port)
+    controller.start()
+    # Інші тести теж ставлять листи в чергу; тут потрібні лише власні
+    redis_client.delete(mail_queue.QUEUE_KEY, mail_queue.RETRY_KEY)
+    yield handler, port
+    controller.stop()
+
+
+def queued_messages(recipient: str) -> list:
+    return [message for message in map(json.loads, redis_client.lrange(mail_queue.QUEUE_KEY, 0, -1))
+            if message["to"] == recipient]
+
+
+def run_worker(port: int, *steps):
+    async def scenario():
+        worker = MailWorker("127.0.0.1", port, username=None, start_tls=False, worker_id=uuid.uuid4().hex)
+        try:
+            return [await step(worker) for step in steps]
+        finally:
+            await worker.close()
+            await worker.redis.aclose()
+
+    return asyncio.run(scenario())
+
+
+def test_signup_queues_verification_email():
+    email = fake.unique.email()
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "12345678"})
+    [message] = queued_messages(email)
+    assert message["subject"] == "Verify your email"
+    assert "/verify-email/" in message["body"]
+
+
+def test_repeated_reset_requests_queue_one_email():
+    email = fake.unique.email()
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "12345678"})
+    redis_client.delete(mail_queue.dedupe_key("reset", email))
+    for _ in range(3):
+        assert client.post("/api/v1/auth/request-password-reset", json={"email": email}).status_code == 200
+    assert [m["subject"] for m in queued_messages(email)] == ["Verify your email", "Password Reset"]
+    assert 0 < redis_client.ttl(mail_queue.dedupe_key("reset", email)) <= mail_queue.RESET_DEDUPE_TTL
+
+
+
+def test_signup_fails_with_503_when_email_cannot_be_queued(monkeypatch):
+    email = fake.unique.email()
+    server = fakeredis.FakeServer()
+    server.connected = False
+    with monkeypatch.context() as patch:
+        patch.setattr(redis, "get_async_redis", lambda: fakeredis.FakeAsyncRedis(server=server))
+        # Відкритий запобіжник не повинен приховувати втрату листа
+        patch.setattr(redis, "breaker", redis.CircuitBreaker(failure_threshold=1, reset_timeout=30))
+        redis.breaker.record_failure()
+        response = client.post("/api/v1/auth/signup", json={"email": email, "password": "12345678"})
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == str(mail_queue.RETRY_AFTER)
+
+    # Обліковий запис без листа не лишився, тож реєстрацію можна повторити
+    assert client.post("/api/v1/auth/signup", json={"email": email, "password": "12345678"}).status_code == 201
+    assert len(queued_messages(email)) == 1
+
+def test_worker_sends_batch_over_one_connection(smtp_server):
+    handler, port = smtp_server
+    recipients = [fake.unique.email() for _ in range(20)]
+    for recipient in recipients:
+        asyncio.run(mail_queue.enqueue(recipient, "Hello", "Body"))
+
+    [sent] = run_worker(port, lambda worker: worker.process_batch(timeout=1))
+    assert sent == 20
+    assert [envelope.rcpt_tos[0] for envelope in handler.messages] == recipients
+    assert len(handler.peers) == 1
+    assert redis_client.llen(mail_queue.QUEUE_KEY) == 0
+
+
+@pytest.mark.parametrize("smtp_server", [1], indirect=True)
+def test_failed_delivery_is_retried_with_backoff(smtp_server):
+    handler, port = smtp_server
+    recipient = fake.unique.email()
+    asyncio.run(mail_queue.enqueue(recipient, "Hello", "Body"))
+
+    [sent] = run_worker(port, lambda worker: worker.process_batch(timeout=1))
+    assert sent == 0
+    [(raw, retry_at)] = redis_client.zrange(mail_queue.RETRY_KEY, 0, -1, withscores=True)
+    assert json.loads(raw)["attempts"] == 1
+    assert 0 < retry_at - time.time() <= MAIL_BACKOFF_BASE
+
+    # Час повторної спроби настав
+    redis_client.zadd(mail_queue.RETRY_KEY, {raw: 0})
+    promoted, sent = run_worker(port, lambda worker: worker.promote_due_retries(),
+                                lambda worker: worker.process_batch(timeout=1))
+    assert (promoted, sent) == (1, 1)
+    assert [envelope.rcpt_tos[0] for envelope in handler.messages] == [recipient]
+
+
+def test_messages_of_crashed_worker_are_requeued(smtp_server):
+    _, port = smtp_server
+    raw = json.dumps({"id": "lost", "to": "lost@example.com", "subject": "s", "body": "b", "attempts": 0})
+
+    async def crash_and_recover(worker):
+        await worker.redis.rpush(worker.processing_key, raw)
+        return await worker.recover()
+
+    assert run_worker(port, crash_and_recover) == [1]
+    assert redis_client.lrange(mail_queue.QUEUE_KEY, 0, -1) == [raw]
+
+
+def test_malformed_entries_are_moved_to_dead_letters(smtp_server):
+    handler, port = smtp_server
+    recipient = fake.unique.email()
+    redis_client.delete(mail_queue.DEAD_KEY)
+    broken = ["{not json", json.dumps({"id": "no-recipient", "subject": "s", "body": "b", "attempts": 0}),
+              json.dumps(["to", "subject"])]
+    redis_client.rpush(mail_queue.QUEUE_KEY, *broken)
+    asyncio.run(mail_queue.enqueue(recipient, "Hello", "Body"))
+
+    async def process_and_inspect(worker):
+        sent = await worker.process_batch(timeout=1)
+        return sent, await worker.redis.llen(worker.processing_key)
+
+    [(sent, processing)] = run_worker(port, process_and_inspect)
+    # Зіпсовані записи не зупинили пачку й не лишилися в обробці
+    assert (sent, processing) == (1, 0)
+    assert [envelope.rcpt_tos[0] for envelope in handler.messages] == [recipient]
+    assert redis_client.lrange(mail_queue.DEAD_KEY, 0, -1) == broken
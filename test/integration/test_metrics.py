@@ -0,0 +1,56 @@
+import asyncio
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app.core.metrics import InstrumentedAsyncQueuePool
+from app.database import ASYNC_DATABASE_URL
+from app.main import app
+
+client = TestClient(app)
+
+
+def get_token():
+    email = "contactuser@example.com"
+    password = "12345678"
+    client.post("/api/v1/auth/signup", json={"email": email, "password": password})
+    response = client.post("/api/v1/auth/login", data={"username": email, "password": password})
+    return response.json()["access_token"]
+
+
+def test_metrics_report_queries_per_route():
+    route = "/api/v1/contacts/contacts/"
+    headers = {"Authorization": f"Bearer {get_token()}"}
+    before = REGISTRY.get_sample_value("db_queries_total", {"route": route}) or 0
+
+    assert client.get(route, headers=headers).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert f'db_queries_total{{route="{route}"}}' in response.text
+    assert REGISTRY.get_sample_value("db_queries_total", {"route": route}) > before
+
+
+def test_pool_metrics_track_checkouts_and_wait_time():
+    # Окремий рушій не підключається через instrument_engine: той перепризначив би
+    # глобальні gauge пулу з рушія застосунку на цей
+    async def use_pool():
+        engine = create_async_engine(ASYNC_DATABASE_URL, poolclass=InstrumentedAsyncQueuePool,
+                                     pool_size=2, max_overflow=1)
+        pool = engine.sync_engine.pool
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+                checked_out = pool.checkedout()
+            return checked_out, pool.checkedout()
+        finally:
+            await engine.dispose()
+
+    waits_before = REGISTRY.get_sample_value("db_pool_wait_seconds_count") or 0
+    during, after = asyncio.run(use_pool())
+
+    assert (during, after) == (1, 0)
+    assert REGISTRY.get_sample_value("db_pool_wait_seconds_count") == waits_before + 1
@@ -0,0 +1,75 @@
+import asyncio
+from datetime import date
+
+import pytest
+from faker import Faker
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import crud
+from app.database import async_engine
+from app.main import app  # noqa: F401 - створює таблиці
+from app.models import User
+from app.schemas import ContactCreate
+
+fake = Faker()
+
+pytestmark = pytest.mark.skipif(async_engine.dialect.name != "postgresql",
+                                reason="EXPLAIN plans are checked on PostgreSQL only")
+
+
+async def run_crud_queries(db: AsyncSession, user_id: int):
+    contact_data = ContactCreate(first_name="Plan", last_name="Check", email=fake.unique.email(),
+                                 phone_number="+123456789", birthday=date(1990, 1, 1))
+    contact = await crud.create_contact(db, contact_data, user_id)
+    await crud.get_contacts(db, 0, 10, user_id)
+    await crud.get_contacts(db, 0, 10, user_id, after_id=contact.id)
+    await crud.get_contacts_fingerprint(db, 0, 10, user_id, after_id=contact.id)
+    await crud.get_contact(db, contact.id, user_id)
+    await crud.search_contacts(db, "Plan", "Check", "example", user_id)
+    await crud.search_contacts(db, None, None, None, user_id, q="plan check", limit=20)
+    await crud.search_contacts(db, None, None, None, user_id, q="che", prefix=True, limit=20)
+    await crud.get_upcoming_birthdays(db, user_id)
+    await crud.get_upcoming_birthdays(db, user_id, 7, today=date(2025, 12, 28))
+    await crud.update_contact(db, contact.id, contact_data, user_id)
+    await crud.delete_contact(db, contact.id, user_id)
+    await crud.get_contact_changes(db, user_id)
+    await crud.get_contact_changes(db, user_id, since=(1, contact.id), limit=50)
+
+
+async def explain_crud_queries():
+    captured = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+
+    async with async_engine.connect() as conn:
+        # Без послідовного сканування план матиме Seq Scan лише там, де жоден індекс не підходить
+        await conn.execute(text("SET enable_seqscan = off"))
+        await conn.commit()
+        db = AsyncSession(bind=conn, expire_on_commit=False)
+        user = User(email=fake.unique.email(), password="-", is_verified=True)
+        db.add(user)
+        await db.commit()
+
+        event.listen(async_engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            await run_crud_queries(db, user.id)
+        finally:
+            event.remove(async_engine.sync_engine, "before_cursor_execute", capture)
+
+        plans = {}
+        for statement, parameters in captured:
+            if statement.lstrip().split()[0].upper() in ("SELECT", "UPDATE", "DELETE", "WITH"):
+                result = await conn.exec_driver_sql("EXPLAIN " + statement, parameters)
+                plans[statement] = "\n".join(row[0] for row in result)
+        await db.close()
+    return plans
+
+
+def test_crud_queries_do_not_use_sequential_scans():
+    plans = asyncio.run(explain_crud_queries())
+
+    assert len(plans) >= 6
+    for statement, plan in plans.items():
+        assert "Seq Scan" not in plan, f"{statement}\n{plan}"
@@ -0,0 +1,58 @@
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+from app.core.redis import redis_client
+from app.database import SessionLocal
+from app.main import app
+from app.models import User
+from app.services import rate_limiter
+
+client = TestClient(app)
+
+fake = Faker()
+
+ME_URL = "/api/v1/users/me"
+
+
+@pytest.fixture
+def signup_and_login(register_user):
+    def register() -> dict:
+        email = fake.unique.email()
+        headers = register_user(email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        # ID користувачів повторюються після перестворення тестової бази, а Redis спільний
+        redis_client.delete(rate_limiter.rate_limit_key(f"GET {ME_URL}", user_id))
+        return headers
+
+    return register
+
+
+def test_users_me_is_limited_per_authenticated_user(signup_and_login):
+    headers, other = signup_and_login(), signup_and_login()
+
+    for remaining in range(rate_limiter.RATE_LIMIT - 1, -1, -1):
+        response = client.get(ME_URL, headers=headers)
+        assert response.status_code == 200
+        assert response.headers["x-ratelimit-limit"] == str(rate_limiter.RATE_LIMIT)
+        assert response.headers["x-ratelimit-remaining"] == str(remaining)
+    response = client.get(ME_URL, headers=headers)
+    assert response.status_code == 429
+    assert response.headers["x-ratelimit-remaining"] == "0"
+    assert 0 < int(response.headers["retry-after"]) <= rate_limiter.WINDOW_SIZE // rate_limiter.RATE_LIMIT + 1
+
+    # Лічильник належить користувачу з токена, а не параметру запиту
+    assert client.get(ME_URL, headers=other).status_code == 200
+    assert client.get(ME_URL, headers=headers, params={"user_id": 0}).status_code == 429
+
+
+def test_limit_falls_back_to_local_counters_without_redis(monkeypatch, signup_and_login):
+    headers = signup_and_login()
+
+    async def redis_down(operation, default=None):
+        return default
+
+    monkeypatch.setattr(rate_limiter.redis, "execute", redis_down)
+    monkeypatch.setattr(rate_limiter, "_local_hits", type(rate_limiter._local_hits)())
+    statuses = [client.get(ME_URL, headers=headers).status_code for _ in range(rate_limiter.RATE_LIMIT + 1)]
+    assert statuses == [200] * rate_limiter.RATE_LIMIT + [429]
@@ -0,0 +1,68 @@
+import asyncio
+from datetime import date
+
+from faker import Faker
+from fastapi.testclient import TestClient
+
+from app import crud
+from app.database import AsyncSessionLocal
+from app.main import app
+from app.models import User
+from app.schemas import ContactCreate
+
+client = TestClient(app)
+
+fake = Faker()
+
+BIRTHDAYS = {
+    "december": date(1985, 12, 30),
+    "january": date(2000, 1, 2),
+    "june": date(1990, 6, 15),
+    "leapling": date(1992, 2, 29),
+    "march": date(1970, 3, 1),
+}
+
+
+async def upcoming_names(windows):
+    async with AsyncSessionLocal() as db:
+        user = User(email=fake.unique.email(), password="-", is_verified=True)
+        db.add(user)
+        await db.commit()
+        for name, birthday in BIRTHDAYS.items():
+            await crud.create_contact(db, ContactCreate(first_name=name, last_name="Birthday",
+                                                        email=fake.unique.email(), phone_number="+123456789",
+                                                        birthday=birthday), user.id)
+        results = []
+        for today, days in windows:
+            contacts = await crud.get_upcoming_birthdays(db, user.id, days, today=today)
+            results.append([contact.first_name for contact in contacts])
+        return results
+
+
+def test_upcoming_birthdays_windows():
+    in_june, year_end, before_feb29, full_year = asyncio.run(upcoming_names([
+        (date(2025, 6, 10), 7),
+        (date(2025, 12, 28), 7),
+        (date(2025, 2, 25), 3),
+        (date(2025, 3, 1), 366),
+    ]))
+
+    # Рік народження не має значення
+    assert in_june == ["june"]
+    # Вікно через Новий рік, від найближчого
+    assert year_end == ["december", "january"]
+    # У невисокосний рік 29 лютого святкується 28 лютого
+    assert before_feb29 == ["leapling"]
+    assert full_year == ["march", "june", "december", "january", "leapling"]
+
+
+def test_upcoming_birthdays_days_parameter():
+    email = fake.unique.email()
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "12345678"})
+    token = client.post("/api/v1/auth/login", data={"username": email, "password": "12345678"}).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/v1/contacts/contacts/upcoming-birthdays", headers=headers,
+                      params={"days": 30}).status_code == 200
+    assert client.get("/api/v1/contacts/contacts/upcoming-birthdays", headers=headers,
+                      params={"days": 400}).status_code == 422
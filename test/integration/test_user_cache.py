@@ -0,0 +1,162 @@
+import asyncio
+import time
+
+import pytest
+from faker import Faker
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.core.redis import redis_client
+from app.database import SessionLocal, async_engine
+from app.main import app
+from app.models import User
+from app.schemas import UserResponse
+from app.services import rate_limiter, token_cache, user_cache
+from app.services import auth_service as auth_service_module
+from app.services.auth_service import AuthService
+
+client = TestClient(app)
+
+fake = Faker()
+auth_service = AuthService()
+
+ME_URL = "/api/v1/users/me"
+
+
+@pytest.fixture
+def signup_and_login(register_user):
+    def register() -> tuple:
+        email = fake.unique.email()
+        headers = register_user(email)
+        with SessionLocal() as db:
+            user_id = db.query(User.id).filter(User.email == email).scalar()
+        # ID користувачів повторюються після перестворення тестової бази, а Redis спільний
+        redis_client.delete(rate_limiter.rate_limit_key(f"GET {ME_URL}", user_id))
+        return email, headers
+
+    return register
+
+
+def count_statements(call):
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        result = call()
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    return result, len(statements)
+
+
+def test_repeated_requests_are_served_from_process_memory(signup_and_login):
+    email, headers = signup_and_login()
+    assert client.get(ME_URL, headers=headers).status_code == 200
+    assert redis_client.get(user_cache.cache_key(email)) is not None
+
+    # Другий рівень більше не потрібен: запис лежить у пам'яті процесу
+    redis_client.delete(user_cache.cache_key(email))
+    response, statements = count_statements(lambda: client.get(ME_URL, headers=headers))
+    assert response.json()["email"] == email
+    assert statements == 0
+    assert redis_client.get(user_cache.cache_key(email)) is None
+
+
+def test_verify_email_invalidates_cached_user(signup_and_login):
+    email, headers = signup_and_login()
+    assert client.get(ME_URL, headers=headers).json()["is_verified"] is False
+
+    token = auth_service.create_access_token({"sub": email})
+    assert client.get(f"/api/v1/auth/verify-email/{token}").status_code == 200
+    assert client.get(ME_URL, headers=headers).json()["is_verified"] is True
+
+
+def test_unknown_user_is_cached_until_signup():
+    email = fake.unique.email()
+    headers = {"Authorization": f"Bearer {auth_service.create_access_token({'sub': email})}"}
+
+    assert client.get(ME_URL, headers=headers).status_code == 401
+    response, statements = count_statements(lambda: client.get(ME_URL, headers=headers))
+    assert response.status_code == 401
+    assert statements == 0
+    assert redis_client.get(user_cache.cache_key(email)) == "null"
+
+    client.post("/api/v1/auth/signup", json={"email": email, "password": "12345678"})
+    with SessionLocal() as db:
+        user_id = db.query(User.id).filter(User.email == email).scalar()
+    redis_client.delete(rate_limiter.rate_limit_key(f"GET {ME_URL}", user_id))
+    assert client.get(ME_URL, headers=headers).json()["email"] == email
+
+
+def test_invalidation_reaches_other_processes_through_pubsub():
+    email = fake.unique.email()
+
+    async def scenario():
+        listener = asyncio.create_task(user_cache.listen_for_invalidations())
+        try:
+            await user_cache.store(email, UserResponse(id=1, email=email, is_verified=False),
+                                   await user_cache.lookup(email))
+            deadline = time.monotonic() + 5
+            while not redis_client.pubsub_numsub(user_cache.INVALIDATE_CHANNEL)[0][1]:
+                await asyncio.sleep(0.05)
+            # Повідомлення від іншого процесу: власний локальний запис ще на місці
+            redis_client.publish(user_cache.INVALIDATE_CHANNEL, email)
+            while email in user_cache._local and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+        finally:
+            listener.cancel()
+            redis_client.delete(user_cache.cache_key(email))
+
+    asyncio.run(scenario())
+    assert email not in user_cache._local
+
+
+def test_embedded_claims_skip_user_lookup(monkeypatch, signup_and_login):
+    monkeypatch.setattr(auth_service_module, "EMBED_USER_CLAIMS", True)
+    email, headers = signup_and_login()
+    claims = auth_service_module.jwt.get_unverified_claims(headers["Authorization"].split()[1])
+    assert claims["id"] > 0 and claims["is_verified"] is False
+
+    statements = []
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        assert client.get("/api/v1/contacts/contacts/", headers=headers).json() == []
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+    assert statements and not any("FROM users" in statement for statement in statements)
+    assert email not in user_cache._local
+
+
+def test_user_lookup_without_embedded_claims_checks_token_once(monkeypatch, signup_and_login):
+    _, headers = signup_and_login()
+    decoded = []
+    decode = token_cache.decode
+
+    def counting_decode(token, *args):
+        decoded.append(token)
+        return decode(token, *args)
+
+    monkeypatch.setattr(token_cache, "decode", counting_decode)
+    assert client.get("/api/v1/contacts/contacts/", headers=headers).status_code == 200
+    assert len(decoded) == 1
+
+
+def test_snapshot_read_before_invalidation_is_not_cached():
+    email = fake.unique.email()
+    stale = UserResponse(id=1, email=email, is_verified=False)
+
+    async def scenario():
+        miss = await user_cache.lookup(email)
+        # verify_email фіксується й інвалідує кеш, поки цей запит ще читав базу
+        await user_cache.invalidate(email)
+        assert not await user_cache.store(email, stale, miss)
+        assert await user_cache.store(email, stale.model_copy(update={"is_verified": True}),
+                                      await user_cache.lookup(email))
+
+    try:
+        asyncio.run(scenario())
+        assert '"is_verified":true' in redis_client.get(user_cache.cache_key(email))
+        assert user_cache._local[email][1].is_verified
+    finally:
+        redis_client.delete(user_cache.cache_key(email))
+        asyncio.run(user_cache.invalidate(email))
@@ -1,14 +1,14 @@
+import asyncio
 import os
 
 import faker
 import pytest
 from cloudinary.provisioning import delete_user
 
-from app.database import get_db
+from app.database import AsyncSessionLocal
 from app.services.auth_service import AuthService, SECRET_KEY
 from jose import jwt, JWSError
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
 
 auth_service = AuthService()
 
@@ -41,15 +41,18 @@ def test_access_token_expiry():
     assert "exp" in decoded
 
 def test_register_duplicate_user():
-    db: Session = next(get_db())
     email = faker.Faker().email()
     user_data = type("UserData", (), {"email": email, "password": "12345678"})()
 
-    # Створюємо користувача
-    auth_service.register_user(user_data, db)
+    async def register_twice():
+        async with AsyncSessionLocal() as db:
+            # Створюємо користувача
+            await auth_service.register_user(user_data, db)
 
-    # Повторна реєстрація має викликати HTTPException
-    with pytest.raises(Exception) as exc:
-        auth_service.register_user(user_data, db)
+            # Повторна реєстрація має викликати HTTPException
+            with pytest.raises(Exception) as exc:
+                await auth_service.register_user(user_data, db)
+            return exc
 
+    exc = asyncio.run(register_twice())
     assert "already exists" in str(exc.value)
\ No newline at end of file
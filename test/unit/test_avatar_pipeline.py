@@ -0,0 +1,92 @@
+import asyncio
+import hashlib
+import io
+
+import pytest
+from fastapi import HTTPException, UploadFile
+from PIL import Image
+
+from app.services import avatar_pipeline
+
+
+def encode(image: Image.Image, format: str, **params) -> bytes:
+    buffer = io.BytesIO()
+    image.save(buffer, format, **params)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def saved(tmp_path):
+    """Записує вміст у файл: render_avatar читає завантаження з диска."""
+    def save(data: bytes) -> str:
+        path = tmp_path / f"upload-{len(list(tmp_path.iterdir()))}"
+        path.write_bytes(data)
+        return str(path)
+    return save
+
+
+def spool(data: bytes) -> tuple:
+    return asyncio.run(avatar_pipeline.spool_upload(UploadFile(io.BytesIO(data))))
+
+
+def test_render_produces_webp_avatar_and_thumbnails(saved):
+    renditions = avatar_pipeline.render_avatar(saved(encode(Image.new("RGB", (1600, 1200), "red"), "JPEG")))
+
+    assert sorted(renditions) == sorted((avatar_pipeline.AVATAR_SIZE, *avatar_pipeline.AVATAR_THUMBNAIL_SIZES))
+    for size, data in renditions.items():
+        with Image.open(io.BytesIO(data)) as image:
+            assert image.format == "WEBP"
+            assert max(image.size) == size
+
+
+def test_render_applies_exif_orientation_and_keeps_transparency(saved):
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Повернуто на 90°
+    portrait = avatar_pipeline.render_avatar(saved(encode(Image.new("RGB", (800, 400)), "JPEG", exif=exif)))
+    with Image.open(io.BytesIO(portrait[avatar_pipeline.AVATAR_SIZE])) as image:
+        assert image.size == (256, 512)
+
+    transparent = avatar_pipeline.render_avatar(saved(encode(Image.new("RGBA", (300, 300), (0, 0, 0, 0)), "PNG")))
+    with Image.open(io.BytesIO(transparent[64])) as image:
+        assert image.mode == "RGBA"
+
+
+@pytest.mark.parametrize("data", [
+    b"not an image",
+    encode(Image.new("RGB", (10, 10)), "BMP"),
+])
+def test_render_rejects_unsupported_files(data, saved):
+    with pytest.raises(avatar_pipeline.InvalidImage):
+        avatar_pipeline.render_avatar(saved(data))
+
+
+def test_render_rejects_decompression_bombs(monkeypatch, saved):
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_MAX_PIXELS", 1000)
+    with pytest.raises(avatar_pipeline.InvalidImage):
+        avatar_pipeline.render_avatar(saved(encode(Image.new("RGB", (100, 100)), "PNG")))
+
+
+def test_upload_digest_covers_content_and_rendering_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_UPLOAD_DIR", str(tmp_path))
+    data = encode(Image.new("RGB", (300, 300), "red"), "PNG")
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_CHUNK_SIZE", 100)
+    path, digest = spool(data)
+    with open(path, "rb") as spooled:
+        assert spooled.read() == data
+    assert digest != hashlib.sha256(data).hexdigest()
+
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_CHUNK_SIZE", 64 * 1024)
+    assert spool(data)[1] == digest
+
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_WEBP_QUALITY", 90)
+    assert spool(data)[1] != digest
+
+
+def test_oversized_upload_leaves_no_spooled_file(monkeypatch, tmp_path):
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_UPLOAD_DIR", str(tmp_path))
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_MAX_BYTES", 1000)
+    monkeypatch.setattr(avatar_pipeline, "AVATAR_CHUNK_SIZE", 100)
+    with pytest.raises(HTTPException) as error:
+        spool(b"x" * 1001)
+    assert error.value.status_code == 413
+    assert list(tmp_path.iterdir()) == []
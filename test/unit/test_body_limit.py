@@ -0,0 +1,51 @@
+from fastapi import FastAPI, File, UploadFile
+from fastapi.testclient import TestClient
+
+from app.core.body_limit import BodySizeLimitMiddleware
+
+received = []
+
+app = FastAPI()
+app.add_middleware(BodySizeLimitMiddleware, limits={"/upload": 1000})
+
+
+@app.post("/upload")
+async def upload(file: UploadFile = File(...)):
+    received.append(await file.read())
+    return {"size": len(received[-1])}
+
+
+@app.post("/unlimited")
+async def unlimited(file: UploadFile = File(...)):
+    return {"size": len(await file.read())}
+
+
+client = TestClient(app)
+
+
+def test_small_body_passes_through():
+    assert client.post("/upload", files={"file": ("a.bin", b"x" * 100)}).json() == {"size": 100}
+
+
+def test_declared_oversized_body_is_rejected_before_parsing():
+    received.clear()
+    response = client.post("/upload", files={"file": ("a.bin", b"x" * 2000)})
+    assert response.status_code == 413
+    assert response.json()["detail"] == "Request body must not exceed 1000 bytes"
+    assert received == []
+
+
+def test_chunked_body_is_cut_off_while_reading():
+    received.clear()
+    boundary = "limit"
+    parts = [f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"a.bin\"\r\n\r\n".encode(),
+             *[b"x" * 500] * 4, f"\r\n--{boundary}--\r\n".encode()]
+    # Тіло з генератора надсилається без Content-Length
+    response = client.post("/upload", content=iter(parts),
+                           headers={"Content-Type": f"multipart/form-data; boundary={boundary}"})
+    assert response.status_code == 413
+    assert received == []
+
+
+def test_other_paths_are_not_limited():
+    assert client.post("/unlimited", files={"file": ("a.bin", b"x" * 2000)}).json() == {"size": 2000}
@@ -0,0 +1,114 @@
+import asyncio
+import gzip
+import zlib
+
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from app.core.compression import CompressionMiddleware, negotiate
+from app.core.etag import not_modified
+
+TEXT = "Contact, Contact, Contact\n" * 200
+CHUNKS = [f"line {i}\n".encode() * 50 for i in range(3)]
+
+
+async def stream():
+    for chunk in CHUNKS:
+        yield chunk
+
+
+def versioned(request):
+    if not_modified(request.headers.get("if-none-match"), '"v1"'):
+        return Response(status_code=304, headers={"ETag": '"v1"'})
+    return PlainTextResponse(TEXT, headers={"ETag": '"v1"'})
+
+
+app = Starlette(routes=[
+    Route("/versioned", versioned),
+    Route("/text", lambda request: PlainTextResponse(TEXT)),
+    Route("/small", lambda request: PlainTextResponse("ok")),
+    Route("/image", lambda request: Response(b"\0" * 4096, media_type="image/webp")),
+    Route("/encoded", lambda request: Response(gzip.compress(TEXT.encode()), media_type="text/plain",
+                                               headers={"Content-Encoding": "gzip"})),
+    Route("/stream", lambda request: StreamingResponse(stream(), media_type="text/csv")),
+])
+client = TestClient(CompressionMiddleware(app, minimum_size=1024))
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, br;q=0", None),
+    ("*", "br"),
+    ("*;q=0.1, br;q=0", "gzip"),
+    ("identity", None),
+    ("", None),
+])
+def test_negotiate_respects_quality_values(header, expected):
+    assert negotiate(header) == expected
+
+
+@pytest.mark.parametrize("encoding", ["br", "gzip"])
+def test_large_responses_are_compressed(encoding):
+    response = client.get("/text", headers={"Accept-Encoding": encoding})
+    assert response.headers["content-encoding"] == encoding
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert int(response.headers["content-length"]) < len(TEXT) / 10
+    assert response.text == TEXT
+
+
+@pytest.mark.parametrize("path, encoding", [("/small", None), ("/image", None), ("/encoded", "gzip")])
+def test_small_binary_and_encoded_responses_pass_through(path, encoding):
+    response = client.get(path, headers={"Accept-Encoding": "br, gzip"})
+    assert response.headers.get("content-encoding") == encoding
+    assert "vary" not in response.headers
+
+
+def test_streaming_response_is_compressed_chunk_by_chunk():
+    messages = []
+
+    async def receive():
+        # Клієнт не від'єднується, доки потік не завершиться
+        await asyncio.Event().wait()
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": "/stream", "raw_path": b"/stream", "query_string": b"",
+             "headers": [(b"accept-encoding", b"gzip")], "http_version": "1.1", "scheme": "http",
+             "server": ("test", 80), "root_path": ""}
+    asyncio.run(CompressionMiddleware(app)(scope, receive, send))
+
+    start, *bodies = messages
+    headers = dict(start["headers"])
+    assert headers[b"content-encoding"] == b"gzip"
+    assert b"content-length" not in headers
+    # Кожна частина розпаковується одразу, не чекаючи кінця потоку
+    decompressor = zlib.decompressobj(zlib.MAX_WBITS | 16)
+    received = [decompressor.decompress(message["body"]) for message in bodies]
+    assert received[:len(CHUNKS)] == CHUNKS
+    assert b"".join(received) == b"".join(CHUNKS)
+    assert bodies[-1]["more_body"] is False
+
+
+def test_brotli_stream_round_trips():
+    response = client.get("/stream", headers={"Accept-Encoding": "br"})
+    assert response.headers["content-encoding"] == "br"
+    assert response.content == b"".join(CHUNKS)
+
+
+def test_not_modified_keeps_the_etag_the_client_revalidates():
+    compressed = client.get("/versioned", headers={"Accept-Encoding": "gzip"})
+    assert compressed.headers["etag"] == '"v1-gzip"'
+
+    cached = client.get("/versioned", headers={"Accept-Encoding": "gzip", "If-None-Match": '"v1-gzip"'})
+    assert cached.status_code == 304
+    assert cached.headers["etag"] == '"v1-gzip"'
+    assert "Accept-Encoding" in cached.headers["vary"]
+    # Клієнт, що кешував нестиснуту відповідь, отримує свій тег
+    plain = client.get("/versioned", headers={"Accept-Encoding": "gzip", "If-None-Match": '"v1"'})
+    assert (plain.status_code, plain.headers["etag"]) == (304, '"v1"')
@@ -0,0 +1,31 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+from passlib.context import CryptContext
+
+from app.services import password_hasher
+
+
+def test_hash_and_verify_run_in_worker_processes():
+    hashed = asyncio.run(password_hasher.hash_password("secret123"))
+    assert hashed.startswith(f"$2b${password_hasher.BCRYPT_ROUNDS:02d}$")
+    assert asyncio.run(password_hasher.verify_password("secret123", hashed)) == (True, None)
+    assert asyncio.run(password_hasher.verify_password("wrong", hashed)) == (False, None)
+
+
+def test_hash_with_other_cost_is_upgraded():
+    rounds = password_hasher.BCRYPT_ROUNDS + 1
+    outdated = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash("secret123")
+    verified, new_hash = asyncio.run(password_hasher.verify_password("secret123", outdated))
+    assert verified
+    assert new_hash.startswith(f"$2b${password_hasher.BCRYPT_ROUNDS:02d}$")
+
+
+def test_full_queue_fails_fast(monkeypatch):
+    monkeypatch.setattr(password_hasher.pool, "pending",
+                        password_hasher.PASSWORD_WORKERS + password_hasher.PASSWORD_QUEUE_SIZE)
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(password_hasher.hash_password("secret123"))
+    assert error.value.status_code == 503
+    assert error.value.headers["Retry-After"] == "1"
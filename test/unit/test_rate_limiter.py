@@ -0,0 +1,36 @@
+import asyncio
+import uuid
+from collections import OrderedDict
+
+from app.core.redis import redis_client
+from app.services import rate_limiter
+
+
+def test_gcra_allows_limit_then_rejects_until_interval_passes():
+    key = f"test:{uuid.uuid4().hex}"
+    try:
+        results = [asyncio.run(rate_limiter._hit_redis(key, 3, 60)) for _ in range(4)]
+        assert [allowed for allowed, *_ in results] == [True, True, True, False]
+        assert [remaining for _, remaining, *_ in results] == [2, 1, 0, 0]
+        # Наступна спроба можлива через період / ліміт, повне відновлення — через вікно
+        _, _, reset, retry_after = results[-1]
+        assert 19 < retry_after <= 20
+        assert 59 < reset <= 60
+        assert 0 < redis_client.pttl(key) <= 60000
+    finally:
+        redis_client.delete(key)
+
+
+def test_local_counters_are_bounded_and_evict_least_recently_used(monkeypatch):
+    monkeypatch.setattr(rate_limiter, "_local_hits", OrderedDict())
+    monkeypatch.setattr(rate_limiter, "LOCAL_MAX_KEYS", 2)
+
+    assert rate_limiter._hit_local("a", 2, 60)[:2] == (True, 1)
+    assert rate_limiter._hit_local("a", 2, 60)[:2] == (True, 0)
+    assert rate_limiter._hit_local("a", 2, 60)[0] is False
+    rate_limiter._hit_local("b", 2, 60)
+    rate_limiter._hit_local("a", 2, 60)
+    rate_limiter._hit_local("c", 2, 60)
+
+    assert list(rate_limiter._local_hits) == ["a", "c"]
+    assert all(len(hits) <= 2 for hits in rate_limiter._local_hits.values())
@@ -0,0 +1,66 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from app.core import redis
+
+
+@pytest.fixture
+def server(monkeypatch):
+    server = fakeredis.FakeServer()
+    client = fakeredis.FakeAsyncRedis(server=server, decode_responses=True)
+    monkeypatch.setattr(redis, "get_async_redis", lambda: client)
+    monkeypatch.setattr(redis, "breaker", redis.CircuitBreaker(failure_threshold=2, reset_timeout=30))
+    return server
+
+
+def test_pipeline_returns_results_in_order(server):
+    results = asyncio.run(redis.pipeline(lambda pipe: pipe.set("a", 1).incr("a").get("a")))
+    assert results == [True, 2, "2"]
+
+
+def test_breaker_opens_after_consecutive_failures(server):
+    server.connected = False
+    calls = []
+
+    async def operation(client):
+        calls.append(client)
+        return await client.get("a")
+
+    assert asyncio.run(redis.execute(operation, default="fallback")) == "fallback"
+    assert asyncio.run(redis.execute(operation, default="fallback")) == "fallback"
+    assert redis.breaker.is_open
+
+    # Відкритий запобіжник не звертається до Redis зовсім
+    server.connected = True
+    assert asyncio.run(redis.execute(operation, default="fallback")) == "fallback"
+    assert len(calls) == 2
+
+
+def test_breaker_closes_after_successful_probe(server, monkeypatch):
+    server.connected = False
+    for _ in range(2):
+        asyncio.run(redis.execute(lambda client: client.get("a")))
+    assert redis.breaker.is_open
+
+    server.connected = True
+    monkeypatch.setattr(redis.breaker, "opened_at", redis.breaker.opened_at - 30)
+    assert redis.breaker.allow()
+    # Поки пробна команда виконується, решта запитів і далі обходить Redis
+    assert not redis.breaker.allow()
+
+    redis.breaker.opened_at -= 30
+    assert asyncio.run(redis.execute(lambda client: client.set("a", 1))) is True
+    assert not redis.breaker.is_open
+    assert redis.breaker.failures == 0
+
+
+def test_script_is_loaded_once_and_reloaded_after_flush(server):
+    incr = redis.script("return redis.call('INCR', KEYS[1])")
+    run = lambda: asyncio.run(redis.execute(lambda client: incr(keys=["n"], client=client)))
+
+    assert run() == 1
+    assert run() == 2
+    asyncio.run(redis.execute(lambda client: client.script_flush()))
+    assert run() == 3
@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+
+import pytest
+from jose import JWTError
+
+from app.services import token_cache
+from app.services.auth_service import AuthService, SECRET_KEY, ALGORITHM
+
+auth_service = AuthService()
+
+
+def test_verified_token_is_decoded_once(monkeypatch):
+    token = auth_service.create_access_token({"sub": "cached@example.com"})
+    assert token_cache.decode(token, SECRET_KEY, [ALGORITHM])["sub"] == "cached@example.com"
+
+    def fail(*args, **kwargs):
+        raise AssertionError("token decoded again")
+
+    monkeypatch.setattr(token_cache.jwt, "decode", fail)
+    assert token_cache.decode(token, SECRET_KEY, [ALGORITHM])["sub"] == "cached@example.com"
+
+
+def test_cached_token_expires_with_its_exp():
+    token = auth_service.create_access_token({"sub": "expiring@example.com"}, timedelta(seconds=1))
+    claims = token_cache.decode(token, SECRET_KEY, [ALGORITHM])
+    expires_at, _ = token_cache._tokens[token_cache.token_digest(token)]
+    assert expires_at == claims["exp"]
+
+    # python-jose порівнює exp із поточним часом у цілих секундах
+    time.sleep(claims["exp"] - time.time() + 1.1)
+    with pytest.raises(JWTError):
+        token_cache.decode(token, SECRET_KEY, [ALGORITHM])
+    assert token_cache.token_digest(token) not in token_cache._tokens
+
+
+def test_invalid_tokens_are_not_cached():
+    token = auth_service.create_access_token({"sub": "forged@example.com"})
+    with pytest.raises(JWTError):
+        token_cache.decode(token, "wrong-secret", [ALGORITHM])
+    assert token_cache.token_digest(token) not in token_cache._tokens
+
+
+def test_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(token_cache, "MAX_SIZE", 2)
+    monkeypatch.setattr(token_cache, "_tokens", type(token_cache._tokens)())
+    tokens = [auth_service.create_access_token({"sub": f"user{i}@example.com"}) for i in range(3)]
+    for token in tokens:
+        token_cache.decode(token, SECRET_KEY, [ALGORITHM])
+    assert list(token_cache._tokens) == [token_cache.token_digest(token) for token in tokens[1:]]